@@ -1,246 +1,18 @@
+import argparse
+import asyncio
+import csv
 import json
-from abc import ABC, abstractmethod
-from datetime import datetime, time
+import sys
+from datetime import datetime
 
-
-class DataHandler(ABC):
-    @abstractmethod
-    def save_data(self, data, filename):
-        pass
-    
-    @abstractmethod
-    def load_data(self, filename):
-        pass
-
-
-class JSONDataHandler(DataHandler):
-    def save_data(self, data, filename):
-        with open(filename, 'w') as file:
-            json.dump(data, file, indent=4)
-            
-    def load_data(self, filename):
-        try:
-            with open(filename, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return None
-
-
-class Movie:
-    def __init__(self, title, duration, genre):
-        self.__title = title
-        self.__duration = duration
-        self.__genre = genre
-        
-    @property
-    def title(self):
-        return self.__title
-        
-    @title.setter
-    def title(self, value):
-        if not value:
-            raise ValueError("Pavadinimas negali būti tuščias")
-        self.__title = value
-        
-    @property
-    def duration(self):
-        return self.__duration
-        
-    @duration.setter
-    def duration(self, value):
-        if value <= 0:
-            raise ValueError("Trukmė turi būti teigiamas skaičius")
-        self.__duration = value
-        
-    @property
-    def genre(self):
-        return self.__genre
-        
-    @genre.setter
-    def genre(self, value):
-        self.__genre = value
-        
-    def to_dict(self):
-        return {
-            'title': self.__title,
-            'duration': self.__duration,
-            'genre': self.__genre
-        }
-        
-    @classmethod
-    def from_dict(cls, data):
-        return cls(data['title'], data['duration'], data['genre'])
-
-
-class CinemaHall:
-    def __init__(self, hall_number, capacity):
-        self.hall_number = hall_number
-        self.capacity = capacity
-        
-    def to_dict(self):
-        return {
-            'hall_number': self.hall_number,
-            'capacity': self.capacity
-        }
-        
-    @classmethod
-    def from_dict(cls, data):
-        return cls(data['hall_number'], data['capacity'])
-
-
-class Screening:
-    def __init__(self, movie, screening_time, hall):
-        self.movie = movie  
-        self.screening_time = screening_time
-        self.hall = hall
-        self.available_seats = hall.capacity
-        self.tickets_sold = 0
-        
-    def to_dict(self):
-        return {
-            'movie': self.movie.to_dict(),
-            'screening_time': self.screening_time.strftime("%Y-%m-%d %H:%M"),
-            'hall': self.hall.to_dict(),
-            'available_seats': self.available_seats,
-            'tickets_sold': self.tickets_sold
-        }
-        
-    @classmethod
-    def from_dict(cls, data):
-        movie = Movie.from_dict(data['movie'])
-        hall = CinemaHall.from_dict(data['hall'])
-        screening_time = datetime.strptime(data['screening_time'], "%Y-%m-%d %H:%M")
-        screening = cls(movie, screening_time, hall)
-        screening.available_seats = data['available_seats']
-        screening.tickets_sold = data['tickets_sold']
-        return screening
-
-
-class Ticket:
-    def __init__(self, screening, seat_number, price):
-        self.screening = screening  
-        self.seat_number = seat_number
-        self.price = price
-        
-    def to_dict(self):
-        return {
-            'screening': self.screening.to_dict(),
-            'seat_number': self.seat_number,
-            'price': self.price
-        }
-        
-    @classmethod
-    def from_dict(cls, data):
-        screening = Screening.from_dict(data['screening'])
-        return cls(screening, data['seat_number'], data['price'])
-
-
-class CinemaManager:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.movies = []
-            cls._instance.screenings = []
-            cls._instance.halls = []
-            cls._instance.tickets = []
-            cls._instance.data_handler = JSONDataHandler()
-            cls._instance.initialize_sample_data()
-            cls._instance.load_data()
-        return cls._instance
-    
-    def initialize_sample_data(self):
-        if not self.movies:
-            self.movies.extend([
-                Movie("The Matrix", 120, "Sci-Fi"),
-                Movie("Inception", 150, "Thriller"),
-                Movie("The Shawshank Redemption", 142, "Drama")
-            ])
-        
-        if not self.halls:
-            self.halls.extend([
-                CinemaHall(1, 50),
-                CinemaHall(2, 100)
-            ])
-    
-    def calculate_ticket_price(self, screening):
-        base_price = 8
-        
-        popular_movies = ["The Matrix", "Inception", "Avatar"]
-        if screening.movie.title in popular_movies:
-            base_price += 3
-            
-        if screening.screening_time.time() > time(18, 0):
-            base_price += 2
-            
-        if screening.hall.capacity > 80:
-            base_price += 1
-            
-        return base_price
-    
-    def get_available_seats(self, screening):
-        all_seats = [f"{row}{seat}" for row in "ABCDEFGHIJ"[:10] 
-                    for seat in range(1, 11)][:screening.hall.capacity]
-        sold_seats = [t.seat_number for t in self.tickets 
-                     if t.screening == screening]
-        return [seat for seat in all_seats if seat not in sold_seats]
-    
-    def add_movie(self, title, duration, genre):
-        movie = Movie(title, duration, genre)
-        self.movies.append(movie)
-        return movie
-        
-    def add_hall(self, hall_number, capacity):
-        hall = CinemaHall(hall_number, capacity)
-        self.halls.append(hall)
-        return hall
-        
-    def add_screening(self, movie_title, screening_time, hall_number):
-        movie = next((m for m in self.movies if m.title == movie_title), None)
-        hall = next((h for h in self.halls if h.hall_number == hall_number), None)
-        
-        if not movie or not hall:
-            return None
-            
-        screening = Screening(movie, screening_time, hall)
-        self.screenings.append(screening)
-        return screening
-        
-    def buy_ticket(self, screening_id, seat_number):
-        if screening_id < 0 or screening_id >= len(self.screenings):
-            return None
-            
-        screening = self.screenings[screening_id]
-        
-        if seat_number not in self.get_available_seats(screening):
-            return None
-            
-        price = self.calculate_ticket_price(screening)
-        ticket = Ticket(screening, seat_number, price)
-        self.tickets.append(ticket)
-        screening.available_seats -= 1
-        screening.tickets_sold += 1
-        return ticket
-        
-    def save_data(self, filename='cinema_data.json'):
-        data = {
-            'movies': [m.to_dict() for m in self.movies],
-            'halls': [h.to_dict() for h in self.halls],
-            'screenings': [s.to_dict() for s in self.screenings],
-            'tickets': [t.to_dict() for t in self.tickets]
-        }
-        self.data_handler.save_data(data, filename)
-        print(f"Duomenys sėkmingai išsaugoti į {filename}")
-        
-    def load_data(self, filename='cinema_data.json'):
-        data = self.data_handler.load_data(filename)
-        if data:
-            self.movies = [Movie.from_dict(m) for m in data.get('movies', [])]
-            self.halls = [CinemaHall.from_dict(h) for h in data.get('halls', [])]
-            self.screenings = [Screening.from_dict(s) for s in data.get('screenings', [])]
-            self.tickets = [Ticket.from_dict(t) for t in data.get('tickets', [])]
-            print(f"Duomenys sėkmingai įkelti iš {filename}")
+from models import TIME_FORMAT
+from analytics import SalesAnalytics
+from main import (IMPORT_KINDS, BinarySnapshotHandler, CinemaManager, display_halls,
+                  display_movies, display_report, display_screenings, display_seat_map,
+                  import_files, profile_call)
+from service import load_test, serve
+from sharding import ShardedCinema, display_sharded_screenings
+from benchmarks import compare_benchmarks, memory_benchmark, run_benchmarks, shard_benchmark
 
 
 def display_menu():
@@ -255,53 +27,207 @@ def display_menu():
     print("8. Peržiūrėti salės planą")
     print("9. Išsaugoti duomenis")
     print("10. Įkelti duomenis")
+    print("11. Našumo statistika")
+    print("12. Grąžinti bilietą")
+    print("13. Pakeisti bilieto vietą")
     print("0. Išeiti")
 
-def display_movies(cinema):
-    print("\n=== FILMŲ SĄRAŠAS ===")
-    for i, movie in enumerate(cinema.movies, 1):
-        print(f"{i}. {movie.title} ({movie.duration} min.) - {movie.genre}")
-
-def display_halls(cinema):
-    print("\n=== SALĖS ===")
-    for hall in cinema.halls:
-        print(f"Salė {hall.hall_number}: {hall.capacity} vietų")
 
-def display_screenings(cinema):
-    print("\n=== SEANSAI ===")
-    for i, screening in enumerate(cinema.screenings, 1):
-        price = cinema.calculate_ticket_price(screening)
-        print(f"{i}. {screening.movie.title} | {screening.screening_time} | "
-              f"Salė {screening.hall.hall_number} | Kaina: {price}€ | "
-              f"Laisvos vietos: {screening.available_seats}/{screening.hall.capacity}")
-
-def display_seat_map(cinema, screening_id):
-    if screening_id < 0 or screening_id >= len(cinema.screenings):
-        print("Neteisingas seanso ID!")
-        return
-        
-    screening = cinema.screenings[screening_id]
-    available_seats = cinema.get_available_seats(screening)
-    
-    print(f"\n=== SALĖS {screening.hall.hall_number} PLANAS ===")
-    print("Filmas:", screening.movie.title)
-    print("Laikas:", screening.screening_time)
-    print("\n  " + " ".join(f"{i:2}" for i in range(1, 11)))
+def main():
+    parser = argparse.ArgumentParser(description="Kino teatro valdymo sistema")
+    parser.add_argument('--db', help="SQLite duomenų bazės failas")
+    parser.add_argument('--pricing', help="Kainodaros taisyklių JSON failas")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Įjungti operacijų skaitiklius ir trukmės histogramas")
+    parser.add_argument('--autosave', type=float, metavar='SEK',
+                        help="Automatiškai išsaugoti pakeitimus po nurodytos ramybės pertraukos")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="Naudoti dvejetainę momentinę kopiją greitam paleidimui")
+    parser.add_argument('--compact-tickets', action='store_true',
+                        help="Laikyti bilietų istoriją kompaktiškoje masyvų saugykloje")
+    commands = parser.add_subparsers(dest='command')
+    serve_parser = commands.add_parser('serve', help="Paleisti HTTP/JSON bilietų paslaugą")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    load_parser = commands.add_parser('loadgen', help="Apkrovos testas HTTP paslaugai")
+    load_parser.add_argument('--host', default='127.0.0.1')
+    load_parser.add_argument('--port', type=int,
+                             help="Esamos paslaugos prievadas (be jo paleidžiama vietinė)")
+    load_parser.add_argument('--requests', type=int, default=2000)
+    load_parser.add_argument('--concurrency', type=int, default=20)
+    report_parser = commands.add_parser('report', help="Pardavimų ataskaita")
+    report_parser.add_argument('--by', choices=SalesAnalytics.DIMENSIONS, default='movie')
+    report_parser.add_argument('--top', type=int, default=5,
+                               help="Kiek pelningiausių seansų parodyti")
+    bench_parser = commands.add_parser('bench', help="Bilietų sistemos našumo matavimas")
+    bench_parser.add_argument('--halls', type=int, default=10)
+    bench_parser.add_argument('--movies', type=int, default=50)
+    bench_parser.add_argument('--screenings', type=int, default=1000)
+    bench_parser.add_argument('--tickets', type=int, default=100000)
+    bench_parser.add_argument('--operations', type=int, default=1000)
+    bench_parser.add_argument('--seed', type=int, default=0)
+    bench_parser.add_argument('--threads', type=int, default=4,
+                              help="Gijų skaičius lygiagrečių pardavimų matavimui")
+    bench_parser.add_argument('--output', help="Rezultatų JSON failas")
+    compare_parser = commands.add_parser('bench-compare', help="Palyginti du matavimų failus")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="Leistinas sulėtėjimas (0.10 = 10 %%)")
+    profile_parser = commands.add_parser('profile', help="Profiliuoti vieną operaciją su cProfile")
+    profile_parser.add_argument('operation', choices=('load_data', 'save_data', 'snapshot',
+                                                      'list_screenings', 'rebuild_occupancy'))
+    profile_parser.add_argument('--limit', type=int, default=25)
+    memory_parser = commands.add_parser('memory-bench', help="Bilietų istorijos atminties matavimas")
+    memory_parser.add_argument('--tickets', type=int, default=1000000)
+    memory_parser.add_argument('--sample', type=int, default=100000,
+                               help="Senojo formato imtis (rezultatas ekstrapoliuojamas)")
+    import_parser = commands.add_parser('import', help="Masinis duomenų importas iš CSV/JSONL")
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('--type', choices=IMPORT_KINDS,
+                               help="Įrašų tipas, jei faile nėra stulpelio type "
+                                    "(kitaip nustatomas pagal failo pavadinimą)")
+    import_parser.add_argument('--strict', action='store_true',
+                               help="Nieko neimportuoti, jei yra klaidingų eilučių")
+    import_parser.add_argument('--errors', help="Klaidų ataskaitos CSV failas")
+    shards_parser = commands.add_parser('shards', help="Seansų sąrašas iš pagal sales padalintų procesų")
+    shards_parser.add_argument('--workers', type=int, default=2)
+    shards_parser.add_argument('--date', help="Diena (YYYY-MM-DD)")
+    shard_bench_parser = commands.add_parser('shard-bench',
+                                             help="Pralaidumo matavimas su skirtingu procesų skaičiumi")
+    shard_bench_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    shard_bench_parser.add_argument('--halls', type=int, default=16)
+    shard_bench_parser.add_argument('--screenings', type=int, default=1600)
+    shard_bench_parser.add_argument('--orders', type=int, default=100000)
+    shard_bench_parser.add_argument('--batch', type=int, default=1000)
+    shard_bench_parser.add_argument('--seed', type=int, default=0)
+    shard_bench_parser.add_argument('--output', help="Rezultatų JSON failas")
+    args = parser.parse_args()
     
-    for row in "ABCDEFGHIJ"[:10]:
-        print(f"{row}: ", end="")
-        for seat in range(1, 11):
-            seat_code = f"{row}{seat}"
-            if seat_code in available_seats:
-                print("O ", end="")
-            else:
-                print("X ", end="")
-        print()
+    if args.command == 'shard-bench':
+        result = shard_benchmark(args.workers, args.halls, screenings=args.screenings,
+                                 orders=args.orders, batch=args.batch, seed=args.seed)
+        print(f"Procesoriai: {result['meta']['cpus']}")
+        for stats in result['results'].values():
+            print(f"Procesai: {stats['workers']:>3}  {stats['orders_per_second']:>10.0f} užs./s  "
+                  f"pagreitis: {stats['speedup']:.2f}x")
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(result, file, indent=4)
+            print(f"Rezultatai išsaugoti į {args.output}")
+        return
+    if args.command == 'shards':
+        try:
+            day = datetime.strptime(args.date, "%Y-%m-%d") if args.date else None
+        except ValueError:
+            print("Neteisingas datos formatas!")
+            return
+        coordinator = ShardedCinema(workers=args.workers).start()
+        try:
+            display_sharded_screenings(coordinator, day)
+        finally:
+            coordinator.close()
+        return
+    if args.command == 'bench':
+        result = run_benchmarks(args.halls, args.movies, args.screenings, args.tickets,
+                                args.operations, args.seed, args.threads)
+        for name, stats in result['results'].items():
+            print(f"{name:<24} p50: {stats['p50_us']:>10.1f} µs  p99: {stats['p99_us']:>10.1f} µs  "
+                  f"{stats['ops_per_second']:>10.0f} op/s")
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(result, file, indent=4)
+            print(f"Rezultatai išsaugoti į {args.output}")
+        return
+    if args.command == 'bench-compare':
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        scale = ('halls', 'movies', 'screenings', 'tickets', 'operations', 'seed')
+        if any(baseline['meta'].get(key) != current['meta'].get(key) for key in scale):
+            print("Dėmesio: matavimai atlikti su skirtingais apkrovos parametrais")
+        rows = compare_benchmarks(baseline, current, args.threshold)
+        for row in rows:
+            mark = "REGRESIJA" if row['regression'] else "gerai"
+            print(f"{row['name']:<24} {row['baseline']:>10.1f} -> {row['current']:>10.1f} µs "
+                  f"({row['change']:+.1%}) {mark}")
+        if any(row['regression'] for row in rows):
+            sys.exit(1)
+        return
+    if args.command == 'memory-bench':
+        result = memory_benchmark(args.tickets, args.sample)
+        for name, label in (('legacy', "Senasis formatas"), ('objects', "Objektai su __slots__"),
+                            ('store', "Masyvų saugykla")):
+            size = result[name]
+            print(f"{label}: {size / 2 ** 20:.1f} MB "
+                  f"({size / max(result['tickets'], 1):.0f} B/bilietui)")
+        return
     
-    print("\nO - laisva, X - užimta")
-
-def main():
+    if args.snapshot:
+        CinemaManager.default_handler = BinarySnapshotHandler
     cinema = CinemaManager()
+    if args.compact_tickets:
+        cinema.use_ticket_store()
+    if args.db:
+        cinema.open_database(args.db)
+    if args.pricing:
+        cinema.load_pricing(args.pricing)
+    if args.metrics:
+        cinema.enable_metrics()
+    cinema.preload()
+    if args.autosave:
+        cinema.start_autosave(args.autosave)
+        
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(cinema, args.host, args.port))
+        except KeyboardInterrupt:
+            print("Paslauga sustabdyta")
+        cinema.stop_autosave()
+        return
+    if args.command == 'loadgen':
+        result = asyncio.run(load_test(cinema, args.host, args.port,
+                                       args.requests, args.concurrency))
+        print(f"Užklausos: {result['requests']} per {result['seconds']:.2f} s")
+        print(f"Pralaidumas: {result['requests_per_second']:.0f} užkl./s")
+        print(f"p50: {result['p50_ms']:.2f} ms, p99: {result['p99_ms']:.2f} ms")
+        print(f"Atsakymų kodai: {result['statuses']}")
+        return
+    if args.command == 'profile':
+        arguments = [cinema.data_file] if args.operation in ('load_data', 'save_data') else []
+        _, report = profile_call(getattr(cinema, args.operation), *arguments, limit=args.limit)
+        print(report)
+        return
+    if args.command == 'import':
+        try:
+            result = import_files(cinema, args.files, args.type, args.strict)
+        except (OSError, ValueError) as error:
+            print(f"Importas nepavyko: {error}")
+            return
+        finally:
+            cinema.stop_autosave()
+        imported = result['imported']
+        print(f"Importuota: {imported['movies']} filmų, {imported['halls']} salių, "
+              f"{imported['screenings']} seansų, {imported['tickets']} bilietų")
+        print(f"Eilutės: {result['rows']} per {result['seconds']:.2f} s "
+              f"({result['rows_per_second']:.0f} eil./s)")
+        for filename, line, message in result['errors'][:20]:
+            print(f"{filename}:{line}: {message}")
+        if len(result['errors']) > 20:
+            print(f"... ir dar {len(result['errors']) - 20} klaidų")
+        if result['errors'] and args.strict:
+            print("Importas atšauktas dėl klaidingų eilučių")
+        if args.errors:
+            with open(args.errors, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(('file', 'line', 'error'))
+                writer.writerows(result['errors'])
+            print(f"Klaidų ataskaita išsaugota į {args.errors}")
+        return
+    if args.command == 'report':
+        display_report(cinema.enable_analytics(), args.by, args.top)
+        return
     
     while True:
         display_menu()
@@ -314,7 +240,11 @@ def main():
             display_halls(cinema)
             
         elif choice == "3":
-            display_screenings(cinema)
+            day = input("Diena (YYYY-MM-DD, Enter - visi seansai): ").strip()
+            try:
+                display_screenings(cinema, datetime.strptime(day, "%Y-%m-%d") if day else None)
+            except ValueError:
+                print("Neteisingas datos formatas! Naudokite YYYY-MM-DD")
             
         elif choice == "4":
             title = input("Filmo pavadinimas: ")
@@ -326,8 +256,13 @@ def main():
         elif choice == "5":
             hall_number = input("Salės numeris: ")
             capacity = int(input("Vietų skaičius: "))
-            cinema.add_hall(hall_number, capacity)
-            print(f"Salė {hall_number} su {capacity} vietų sėkmingai pridėta!")
+            layout = input("Salės planas (eilės per '/', pvz. OOO.OOO/HHO.OXX; "
+                           "Enter - standartinis): ").strip()
+            try:
+                cinema.add_hall(hall_number, capacity, layout or None)
+                print(f"Salė {hall_number} su {capacity} vietų sėkmingai pridėta!")
+            except ValueError as error:
+                print(f"Nepavyko pridėti salės: {error}")
             
         elif choice == "6":
             display_movies(cinema)
@@ -338,9 +273,12 @@ def main():
             
             screening_time = input("Seanso laikas (YYYY-MM-DD HH:MM): ")
             try:
-                screening_time = datetime.strptime(screening_time, "%Y-%m-%d %H:%M")
-                cinema.add_screening(movie_title, screening_time, hall_number)
-                print("Seansas sėkmingai sukurtas!")
+                screening_time = datetime.strptime(screening_time, TIME_FORMAT)
+                if cinema.add_screening(movie_title, screening_time, hall_number):
+                    print("Seansas sėkmingai sukurtas!")
+                else:
+                    print("Nepavyko sukurti seanso - filmas ar salė nerasti "
+                          "arba salė tuo metu užimta!")
             except ValueError:
                 print("Neteisingas datos formatas! Naudokite YYYY-MM-DD HH:MM")
                 
@@ -352,14 +290,38 @@ def main():
                     raise ValueError
                 
                 display_seat_map(cinema, screening_id)
-                seat_number = input("Pasirinkite vietą (pvz., A5): ").upper()
+                seat_number = input("Pasirinkite vietą (pvz., A5), kelias vietas (A5 A6) "
+                                    "arba žmonių skaičių (pvz., 4): ").upper()
+                seats = seat_number.replace(",", " ").split()
+                screening = cinema.screenings[screening_id]
                 
-                ticket = cinema.buy_ticket(screening_id, seat_number)
-                if ticket:
-                    print(f"\nBilietas į {ticket.screening.movie.title} "
-                          f"vietoje {seat_number} nupirktas už {ticket.price}€!")
+                if seat_number.isdigit():
+                    hold = cinema.hold_seats(screening, party_size=int(seat_number))
                 else:
-                    print("Nepavyko nusipirkti bilieto - vieta užimta arba neteisinga!")
+                    hold = cinema.hold_seats(screening, seats=seats)
+                if hold is None:
+                    print("Nepavyko rezervuoti - vietos užimtos arba neteisingos!")
+                else:
+                    total = cinema.calculate_ticket_price(screening) * len(hold.seats)
+                    print(f"\nVietos {', '.join(hold.seats)} rezervuotos {hold.remaining():.0f} s. "
+                          f"Suma: {total}€")
+                    if input("Patvirtinti pirkimą? (t/n): ").strip().lower() != "t":
+                        cinema.release_hold(hold.id)
+                        print("Rezervacija atšaukta.")
+                    else:
+                        tickets = cinema.confirm_hold(hold.id)
+                        if not tickets:
+                            print("Rezervacijos laikas baigėsi - bilietai nenupirkti!")
+                        elif len(tickets) == 1:
+                            print(f"\nBilietas į {screening.movie.title} vietoje "
+                                  f"{tickets[0].seat_number} nupirktas už {tickets[0].price}€! "
+                                  f"Bilieto ID: {tickets[0].id}")
+                        else:
+                            seat_list = ", ".join(t.seat_number for t in tickets)
+                            total = sum(t.price for t in tickets)
+                            print(f"\nNupirkta {len(tickets)} bilietų į {screening.movie.title} "
+                                  f"(vietos {seat_list}) už {total}€! "
+                                  f"Bilietų ID: {', '.join(str(t.id) for t in tickets)}")
             except (ValueError, IndexError):
                 print("Neteisingas seanso ID!")
                 
@@ -377,7 +339,40 @@ def main():
         elif choice == "10":
             cinema.load_data()
             
+        elif choice == "11":
+            if cinema.metrics is None:
+                print("Statistika išjungta. Paleiskite programą su --metrics")
+            else:
+                print(cinema.metrics.to_prometheus())
+                
+        elif choice == "12":
+            try:
+                ticket = cinema.cancel_ticket(int(input("Bilieto ID: ")))
+                if ticket is None:
+                    print("Bilietas nerastas!")
+                else:
+                    print(f"Bilietas {ticket.id} ({ticket.screening.movie.title}, vieta "
+                          f"{ticket.seat_number}) grąžintas. Grąžinama suma: {ticket.price}€")
+            except ValueError:
+                print("Neteisingas bilieto ID!")
+                
+        elif choice == "13":
+            try:
+                ticket = cinema.get_ticket(int(input("Bilieto ID: ")))
+                if ticket is None:
+                    print("Bilietas nerastas!")
+                else:
+                    display_seat_map(cinema, cinema.screening_position(ticket.screening))
+                    seat_number = input(f"Nauja vieta (dabar {ticket.seat_number}): ").strip().upper()
+                    if cinema.exchange_ticket(ticket.id, seat_number) is None:
+                        print("Vieta užimta arba neteisinga!")
+                    else:
+                        print(f"Bilieto {ticket.id} vieta pakeista į {seat_number}")
+            except ValueError:
+                print("Neteisingas bilieto ID!")
+                
         elif choice == "0":
+            cinema.stop_autosave()
             print("Programa baigia darbą. Iki!")
             break
             
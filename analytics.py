@@ -0,0 +1,167 @@
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from models import TIME_FORMAT, TicketStore, hall_key
+
+
+class SalesAnalytics:
+    DIMENSIONS = ('movie', 'hall', 'day', 'hour')
+    
+    def __init__(self, cinema=None):
+        self.lock = threading.Lock()
+        self.clear()
+        if cinema is not None:
+            self.rebuild(cinema)
+            
+    def clear(self):
+        self.screenings = []
+        self.positions = {}
+        self.labels = {'movie': [], 'hall': [], 'day': [], 'hour': list(range(24))}
+        self.codes = {'movie': {}, 'hall': {}, 'day': {}}
+        self.columns = {'movie': array('I'), 'hall': array('I'), 'day': array('I'),
+                        'hour': array('I')}
+        self.capacity = array('q')
+        self.sold = array('q')
+        self.revenue = array('d')
+        
+    def code(self, dimension, label):
+        codes = self.codes[dimension]
+        if label not in codes:
+            codes[label] = len(self.labels[dimension])
+            self.labels[dimension].append(label)
+        return codes[label]
+        
+    def add_screening(self, screening):
+        with self.lock:
+            return self.register(screening)
+            
+    def register(self, screening):
+        position = self.positions.get(screening)
+        if position is not None:
+            return position
+        position = self.positions[screening] = len(self.screenings)
+        self.screenings.append(screening)
+        self.columns['movie'].append(self.code('movie', screening.movie.title))
+        self.columns['hall'].append(self.code('hall', hall_key(screening.hall.hall_number)))
+        self.columns['day'].append(self.code('day', screening.screening_time.date().isoformat()))
+        self.columns['hour'].append(screening.screening_time.hour)
+        self.capacity.append(len(screening.seat_codes))
+        self.sold.append(0)
+        self.revenue.append(0.0)
+        return position
+        
+    def sale(self, screening, price, tickets=1):
+        with self.lock:
+            position = self.register(screening)
+            self.sold[position] += tickets
+            self.revenue[position] += price * tickets
+            
+    def rebuild(self, cinema):
+        with self.lock:
+            self.clear()
+            for screening in cinema.screenings:
+                self.register(screening)
+            if cinema.data_handler.live:
+                totals = cinema.data_handler.sales_totals(cinema.data_file)
+                for screening in self.screenings:
+                    sold, revenue = totals.get(screening.id, (0, 0.0))
+                    self.sold[self.positions[screening]] = sold
+                    self.revenue[self.positions[screening]] = revenue or 0.0
+            elif isinstance(cinema.tickets, TicketStore):
+                self.load_store(cinema.tickets)
+            else:
+                for ticket in cinema.tickets:
+                    position = self.positions.get(ticket.screening)
+                    if position is not None:
+                        self.sold[position] += 1
+                        self.revenue[position] += ticket.price
+                        
+    def load_store(self, store):
+        mapping = [self.positions.get(s, -1) for s in store.screenings]
+        prices = [float(price) for _, price in store.prices]
+        if np is None:
+            for number, price in zip(store.screening_column, store.price_column):
+                position = mapping[number]
+                if position >= 0:
+                    self.sold[position] += 1
+                    self.revenue[position] += prices[price]
+            return
+        if not len(store):
+            return
+        positions = np.asarray(mapping, dtype=np.int64)[
+            np.frombuffer(store.screening_column, dtype=np.uint32)]
+        weights = np.asarray(prices)[np.frombuffer(store.price_column, dtype=np.uint16)]
+        known = positions >= 0
+        sold = np.bincount(positions[known], minlength=len(self.screenings))
+        revenue = np.bincount(positions[known], weights=weights[known],
+                              minlength=len(self.screenings))
+        self.sold = array('q', sold.astype(np.int64).tobytes())
+        self.revenue = array('d', revenue.tobytes())
+        
+    def group(self, dimension):
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Nežinoma analizės dimensija: {dimension}")
+        with self.lock:
+            labels = self.labels[dimension]
+            if np is not None:
+                codes = np.frombuffer(self.columns[dimension], dtype=np.uint32)
+                width = len(labels)
+                counts = np.bincount(codes, minlength=width)
+                sold = np.bincount(codes, weights=np.frombuffer(self.sold, dtype=np.int64),
+                                   minlength=width)
+                revenue = np.bincount(codes, weights=np.frombuffer(self.revenue),
+                                      minlength=width)
+                capacity = np.bincount(codes, weights=np.frombuffer(self.capacity, dtype=np.int64),
+                                       minlength=width)
+                totals = zip(counts.tolist(), sold.tolist(), revenue.tolist(), capacity.tolist())
+            else:
+                width = len(labels)
+                counts, sold, revenue, capacity = [0] * width, [0] * width, [0.0] * width, [0] * width
+                for code, tickets, income, seats in zip(self.columns[dimension], self.sold,
+                                                        self.revenue, self.capacity):
+                    counts[code] += 1
+                    sold[code] += tickets
+                    revenue[code] += income
+                    capacity[code] += seats
+                totals = zip(counts, sold, revenue, capacity)
+            rows = [{
+                dimension: label,
+                'screenings': int(screenings),
+                'tickets': int(tickets),
+                'revenue': float(income),
+                'capacity': int(seats),
+                'occupancy': tickets / seats if seats else 0.0
+            } for label, (screenings, tickets, income, seats) in zip(labels, totals) if screenings]
+        return sorted(rows, key=lambda row: row[dimension])
+        
+    def top_screenings(self, limit=10, by='revenue'):
+        if by not in ('revenue', 'tickets', 'occupancy'):
+            raise ValueError(f"Nežinomas rikiavimo kriterijus: {by}")
+        with self.lock:
+            if by == 'revenue':
+                values = self.revenue
+            elif by == 'tickets':
+                values = self.sold
+            else:
+                values = [sold / seats if seats else 0.0
+                          for sold, seats in zip(self.sold, self.capacity)]
+            if np is not None and len(values) > limit:
+                values = np.asarray(values)
+                best = np.argpartition(-values, limit)[:limit]
+                order = sorted(best.tolist(), key=lambda i: (-values[i], i))
+            else:
+                order = sorted(range(len(values)), key=lambda i: (-values[i], i))[:limit]
+            return [{
+                'id': self.screenings[i].id,
+                'movie': self.screenings[i].movie.title,
+                'hall': self.screenings[i].hall.hall_number,
+                'screening_time': self.screenings[i].screening_time.strftime(TIME_FORMAT),
+                'tickets': int(self.sold[i]),
+                'revenue': float(self.revenue[i]),
+                'occupancy': self.sold[i] / self.capacity[i] if self.capacity[i] else 0.0
+            } for i in order]
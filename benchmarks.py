@@ -0,0 +1,262 @@
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timedelta
+from time import perf_counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from models import TIME_FORMAT, CinemaHall, Movie, Screening, Ticket, TicketStore
+from main import CinemaManager, JSONDataHandler, display_seat_map
+from service import percentile
+from sharding import ShardedCinema
+
+
+BENCHMARK_GENRES = ("Drama", "Sci-Fi", "Action", "Comedy", "Animation", "Thriller")
+
+
+def generate_cinema(halls=10, movies=50, screenings=1000, tickets=100000, seed=0,
+                    data_file=None):
+    rng = random.Random(seed)
+    cinema = CinemaManager.create(data_file, JSONDataHandler(), sample_data=False)
+    if data_file is None:
+        cinema.loaded = True
+    for number in range(movies):
+        cinema.add_movie(f"Movie {number + 1}", rng.randint(80, 180), rng.choice(BENCHMARK_GENRES))
+    for number in range(halls):
+        cinema.add_hall(number + 1, rng.choice((50, 100, 150, 200)))
+    start = datetime(2024, 1, 1, 9, 0)
+    for number in range(screenings):
+        hall = cinema.halls[number % halls]
+        cinema.add_screening(rng.choice(cinema.movies).title,
+                             start + timedelta(hours=4 * (number // halls)), hall.hall_number)
+    free = [(screening, seat) for screening in cinema.screenings for seat in screening.seat_codes]
+    for screening, seat in rng.sample(free, min(tickets, len(free))):
+        cinema.book_seat(screening, seat)
+    return cinema
+
+
+def time_calls(call, arguments):
+    timings = []
+    for argument in arguments:
+        started = perf_counter()
+        call(argument)
+        timings.append(perf_counter() - started)
+    total = sum(timings)
+    timings.sort()
+    return {
+        'calls': len(timings),
+        'total_s': total,
+        'mean_us': total / len(timings) * 1e6 if timings else 0.0,
+        'p50_us': percentile(timings, 0.50) * 1e6,
+        'p99_us': percentile(timings, 0.99) * 1e6,
+        'ops_per_second': len(timings) / total if total else 0.0
+    }
+
+
+def time_threaded_calls(call, arguments, threads=4):
+    timings = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    
+    def run(number):
+        barrier.wait()
+        for argument in arguments[number::threads]:
+            started = perf_counter()
+            call(argument)
+            timings[number].append(perf_counter() - started)
+            
+    workers = [threading.Thread(target=run, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - started
+    merged = sorted(timing for thread_timings in timings for timing in thread_timings)
+    return {
+        'calls': len(merged),
+        'threads': threads,
+        'total_s': elapsed,
+        'mean_us': sum(merged) / len(merged) * 1e6 if merged else 0.0,
+        'p50_us': percentile(merged, 0.50) * 1e6,
+        'p99_us': percentile(merged, 0.99) * 1e6,
+        'ops_per_second': len(merged) / elapsed if elapsed else 0.0
+    }
+
+
+def run_benchmarks(halls=10, movies=50, screenings=1000, tickets=100000,
+                   operations=1000, seed=0, threads=4):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='cinema-bench-')
+    filename = os.path.join(directory, 'benchmark.json')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            started = perf_counter()
+            cinema = generate_cinema(halls, movies, screenings, tickets, seed, filename)
+            setup = perf_counter() - started
+            positions = [rng.randrange(len(cinema.screenings)) for _ in range(operations)]
+            free = [(position, seat) for position, screening in enumerate(cinema.screenings)
+                    for seat in screening.free_seats()]
+            purchases = rng.sample(free, min(operations, len(cinema.screenings) * 10))
+            last = cinema.screenings[-1].screening_time + timedelta(days=1)
+            hall_numbers = [hall.hall_number for hall in cinema.halls]
+            new_screenings = [(rng.choice(cinema.movies).title,
+                               last + timedelta(hours=4 * (i // halls)), hall_numbers[i % halls])
+                              for i in range(operations)]
+            persistence = max(1, min(5, operations // 100))
+            taken = set(purchases)
+            contended = rng.sample([purchase for purchase in free if purchase not in taken],
+                                   min(operations, len(free) - len(taken)))
+            
+            results = {
+                'buy_ticket': time_calls(lambda p: cinema.buy_ticket(*p), purchases),
+                'threaded_buy_ticket': time_threaded_calls(lambda p: cinema.buy_ticket(*p),
+                                                           contended, threads),
+                'get_available_seats': time_calls(
+                    lambda p: cinema.get_available_seats(cinema.screenings[p]), positions),
+                'calculate_ticket_price': time_calls(
+                    lambda p: cinema.calculate_ticket_price(cinema.screenings[p]), positions),
+                'add_screening': time_calls(lambda s: cinema.add_screening(*s), new_screenings),
+                'display_seat_map': time_calls(lambda p: display_seat_map(cinema, p), positions),
+                'save_data': time_calls(lambda _: cinema.persist(filename, force=True),
+                                        range(persistence)),
+                'load_data': time_calls(lambda _: cinema.load_data(filename), range(persistence))
+            }
+            output.truncate(0)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        'meta': {
+            'halls': halls, 'movies': movies, 'screenings': screenings, 'tickets': tickets,
+            'operations': operations, 'seed': seed, 'threads': threads, 'setup_s': setup,
+            'python': sys.version.split()[0], 'numpy': np is not None,
+            'created': datetime.now().strftime(TIME_FORMAT)
+        },
+        'results': results
+    }
+
+
+def compare_benchmarks(baseline, current, threshold=0.10, metric='p50_us'):
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or not before[metric]:
+            continue
+        change = result[metric] / before[metric] - 1
+        rows.append({'name': name, 'baseline': before[metric], 'current': result[metric],
+                     'change': change, 'regression': change > threshold})
+    return rows
+
+
+def traced_size(build):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def memory_benchmark(tickets=1000000, sample=100000):
+    movie = Movie("Benchmark", 120, "Drama")
+    hall = CinemaHall(1, 100)
+    start = datetime(2024, 1, 1, 10, 0)
+    screenings = [Screening(movie, start + timedelta(hours=3 * i), hall)
+                  for i in range((tickets + hall.capacity - 1) // hall.capacity)]
+    prices = (8, 10, 11, 13)
+    
+    def sold(total):
+        for number in range(total):
+            screening = screenings[number // hall.capacity]
+            yield screening, screening.seat_codes[number % hall.capacity], prices[number % 4]
+            
+    def objects(total):
+        result = []
+        for ticket_id, (screening, seat, price) in enumerate(sold(total), 1):
+            ticket = Ticket(screening, seat, price)
+            ticket.id = ticket_id
+            result.append(ticket)
+        return result
+        
+    def store(total):
+        result = TicketStore()
+        for ticket_id, (screening, seat, price) in enumerate(sold(total), 1):
+            result.add(screening, seat, price, ticket_id)
+        return result
+    
+    sample = min(sample, tickets)
+    legacy_rows = [dict(t.to_dict(), id=t.id) for t in objects(sample)]
+    legacy = traced_size(lambda: [Ticket.from_dict(row) for row in legacy_rows])
+    return {
+        'tickets': tickets,
+        'legacy': legacy * tickets // sample if sample else 0,
+        'objects': traced_size(lambda: objects(tickets)),
+        'store': traced_size(lambda: store(tickets))
+    }
+
+
+def shard_benchmark(workers=(1, 2, 4), halls=16, movies=50, screenings=1600, tickets=0,
+                    orders=100000, batch=1000, seed=0):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='cinema-shards-')
+    filename = os.path.join(directory, 'benchmark.json')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cinema = generate_cinema(halls, movies, screenings, tickets, seed, filename)
+            cinema.persist(filename, force=True)
+        free = [(screening.id, seat) for screening in cinema.screenings
+                for seat in screening.free_seats()]
+        sample = rng.sample(free, min(orders, len(free)))
+        del cinema, free
+        
+        results = {}
+        for shards in workers:
+            run_file = os.path.join(directory, f'benchmark-{shards}.json')
+            shutil.copyfile(filename, run_file)
+            coordinator = ShardedCinema(run_file, shards, sample_data=False).start()
+            try:
+                started = perf_counter()
+                sold = 0
+                for first in range(0, len(sample), batch):
+                    sold += sum(ticket_id is not None
+                                for ticket_id in coordinator.buy_batch(sample[first:first + batch]))
+                elapsed = perf_counter() - started
+            finally:
+                coordinator.close()
+            results[str(shards)] = {
+                'workers': shards,
+                'orders': len(sample),
+                'sold': sold,
+                'seconds': elapsed,
+                'orders_per_second': len(sample) / elapsed if elapsed else 0.0
+            }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    sold = {result['sold'] for result in results.values()}
+    if len(sold) > 1:
+        raise ValueError(f"Paleidimai pardavė skirtingą bilietų kiekį: {sorted(sold)}")
+    base = results[str(workers[0])]['orders_per_second'] if workers else 0.0
+    for result in results.values():
+        result['speedup'] = result['orders_per_second'] / base if base else 0.0
+    return {
+        'meta': {
+            'halls': halls, 'movies': movies, 'screenings': screenings, 'tickets': tickets,
+            'orders': orders, 'batch': batch, 'seed': seed, 'cpus': os.cpu_count(),
+            'python': sys.version.split()[0],
+            'created': datetime.now().strftime(TIME_FORMAT)
+        },
+        'results': results
+    }
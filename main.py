@@ -0,0 +1,2358 @@
+import base64
+import contextlib
+import cProfile
+import csv
+import heapq
+import io
+import json
+import mmap
+import os
+import pstats
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import count
+from time import perf_counter
+
+from models import (TIME_FORMAT, CinemaHall, HallLayout, HallSchedule, Movie, Screening,
+                    ScreeningSchedule, Ticket, TicketStore, hall_key, row_label, screening_end)
+from analytics import SalesAnalytics
+
+
+FORMAT_VERSION = 2
+ENTITY_KINDS = ('movies', 'halls', 'screenings', 'tickets')
+
+
+def write_atomically(filename, write, mode='w'):
+    directory, name = os.path.split(os.path.abspath(filename))
+    descriptor, temporary = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, mode) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(filename):
+            shutil.copymode(filename, temporary)
+        else:
+            os.chmod(temporary, 0o644)
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class DataHandler(ABC):
+    live = False
+    
+    @abstractmethod
+    def save_data(self, data, filename):
+        pass
+    
+    @abstractmethod
+    def load_data(self, filename):
+        pass
+        
+    def append_record(self, op, record, filename):
+        return False
+        
+    def save_snapshot(self, snapshot, filename):
+        self.save_data(snapshot(), filename)
+
+
+class JSONDataHandler(DataHandler):
+    def save_data(self, data, filename):
+        write_atomically(filename, lambda file: json.dump(data, file, indent=4))
+            
+    def load_data(self, filename):
+        try:
+            with open(filename, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+
+class JournalDataHandler(DataHandler):
+    def __init__(self, snapshot_handler=None, sync_every=1, compact_every=1000):
+        self.snapshot_handler = snapshot_handler or JSONDataHandler()
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self.journal = None
+        self.journal_path = None
+        self.unsynced = 0
+        self.records = 0
+        self.lock = threading.RLock()
+        
+    @staticmethod
+    def journal_filename(filename):
+        return os.path.splitext(filename)[0] + '.journal'
+        
+    def open_journal(self, filename):
+        path = self.journal_filename(filename)
+        if self.journal_path != path:
+            self.close()
+            self.journal = open(path, 'a', encoding='utf-8')
+            self.journal_path = path
+        return self.journal
+        
+    def append_record(self, op, record, filename):
+        line = json.dumps(dict(record, op=op), separators=(',', ':')) + '\n'
+        with self.lock:
+            journal = self.open_journal(filename)
+            journal.write(line)
+            journal.flush()
+            self.unsynced += 1
+            self.records += 1
+            if self.sync_every and self.unsynced >= self.sync_every:
+                self.sync()
+            return self.records >= self.compact_every
+        
+    def sync(self):
+        with self.lock:
+            if self.journal and self.unsynced:
+                os.fsync(self.journal.fileno())
+                self.unsynced = 0
+            
+    def close(self):
+        with self.lock:
+            if self.journal:
+                self.sync()
+                self.journal.close()
+                self.journal = None
+                self.journal_path = None
+            
+    def save_data(self, data, filename):
+        with self.lock:
+            self.snapshot_handler.save_data(data, filename)
+            self.close()
+            open(self.journal_filename(filename), 'w').close()
+            self.records = 0
+            
+    def rotate_journal(self, filename):
+        path = self.journal_filename(filename)
+        rotated = path + '.old'
+        with self.lock:
+            self.close()
+            if os.path.exists(rotated) and os.path.exists(path):
+                with open(path, 'rb') as source, open(rotated, 'ab') as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(path)
+            elif os.path.exists(path):
+                os.replace(path, rotated)
+            open(path, 'w').close()
+            self.records = 0
+        return rotated
+            
+    def save_snapshot(self, snapshot, filename):
+        rotated = self.rotate_journal(filename)
+        self.snapshot_handler.save_data(snapshot(), filename)
+        if os.path.exists(rotated):
+            os.remove(rotated)
+            
+    def read_journal(self, filename):
+        path = self.journal_filename(filename)
+        lines = None
+        for journal in (path + '.old', path):
+            try:
+                with open(journal, 'r', encoding='utf-8') as file:
+                    lines = (lines or []) + file.readlines()
+            except FileNotFoundError:
+                continue
+        return lines
+        
+    def load_data(self, filename):
+        data = self.snapshot_handler.load_data(filename)
+        lines = self.read_journal(filename)
+        if lines is None:
+            return data
+            
+        if data is None:
+            data = {'version': FORMAT_VERSION, **{kind: [] for kind in ENTITY_KINDS}}
+        elif data.get('version', 1) == 1:
+            data = migrate_legacy_data(data)
+        self.records = replay_journal(data, lines)
+        return data
+
+
+class SQLiteDataHandler(DataHandler):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS movies (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            duration INTEGER NOT NULL,
+            genre TEXT
+        );
+        CREATE TABLE IF NOT EXISTS halls (
+            id INTEGER PRIMARY KEY,
+            hall_number NOT NULL,
+            capacity INTEGER NOT NULL,
+            layout TEXT
+        );
+        CREATE TABLE IF NOT EXISTS screenings (
+            id INTEGER PRIMARY KEY,
+            movie_id INTEGER NOT NULL REFERENCES movies (id),
+            screening_time TEXT NOT NULL,
+            hall_id INTEGER NOT NULL REFERENCES halls (id),
+            available_seats INTEGER NOT NULL,
+            tickets_sold INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY,
+            screening_id INTEGER NOT NULL REFERENCES screenings (id),
+            seat_number TEXT NOT NULL,
+            price REAL NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS tickets_seat ON tickets (screening_id, seat_number);
+        CREATE INDEX IF NOT EXISTS screenings_time ON screenings (screening_time);
+        CREATE INDEX IF NOT EXISTS screenings_hall ON screenings (hall_id);
+    """
+    INSERTS = {
+        'movies': "INSERT OR {} INTO movies VALUES (:id, :title, :duration, :genre)",
+        'halls': "INSERT OR {} INTO halls VALUES (:id, :hall_number, :capacity, :layout)",
+        'screenings': "INSERT OR {} INTO screenings VALUES "
+                      "(:id, :movie_id, :screening_time, :hall_id, :available_seats, :tickets_sold)",
+        'tickets': "INSERT OR {} INTO tickets VALUES (:id, :screening_id, :seat_number, :price)"
+    }
+    SELECTS = {
+        'movies': "SELECT id, title, duration, genre FROM movies ORDER BY id",
+        'halls': "SELECT id, hall_number, capacity, layout FROM halls ORDER BY id",
+        'screenings': "SELECT id, movie_id, screening_time, hall_id, available_seats, "
+                      "tickets_sold FROM screenings ORDER BY id",
+        'tickets': "SELECT id, screening_id, seat_number, price FROM tickets ORDER BY id"
+    }
+    
+    def __init__(self, live=False):
+        self.live = live
+        self.connections = {}
+        self.lock = threading.RLock()
+        
+    def connect(self, filename):
+        with self.lock:
+            connection = self.connections.get(filename)
+            if connection is None:
+                connection = sqlite3.connect(filename, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(self.SCHEMA)
+                columns = [row[1] for row in connection.execute("PRAGMA table_info(halls)")]
+                if 'layout' not in columns:
+                    connection.execute("ALTER TABLE halls ADD COLUMN layout TEXT")
+                self.connections[filename] = connection
+            return connection
+        
+    def close(self):
+        with self.lock:
+            for connection in self.connections.values():
+                connection.close()
+            self.connections.clear()
+        
+    def query(self, filename, sql, params=()):
+        with self.lock:
+            cursor = self.connect(filename).execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+            
+    @staticmethod
+    def to_row(kind, record):
+        if kind == 'halls':
+            layout = record.get('layout')
+            return dict(record, layout=json.dumps(layout) if layout else None)
+        return record
+        
+    @staticmethod
+    def from_row(kind, row):
+        if kind == 'halls':
+            layout = row.pop('layout')
+            if layout:
+                row['layout'] = json.loads(layout)
+        return row
+        
+    def save_data(self, data, filename):
+        if data.get('version', 1) == 1:
+            data = migrate_legacy_data(data)
+        connection = self.connect(filename)
+        with self.lock, connection:
+            if not self.live:
+                for kind in reversed(ENTITY_KINDS):
+                    connection.execute(f"DELETE FROM {kind}")
+            conflict = 'IGNORE' if self.live else 'REPLACE'
+            for kind in ENTITY_KINDS:
+                connection.executemany(self.INSERTS[kind].format(conflict),
+                                       (self.to_row(kind, record) for record in data[kind]))
+                
+    def load_data(self, filename):
+        data = {'version': FORMAT_VERSION}
+        for kind in ENTITY_KINDS:
+            if kind == 'tickets' and self.live:
+                data[kind] = []
+            else:
+                data[kind] = [self.from_row(kind, row)
+                              for row in self.query(filename, self.SELECTS[kind])]
+        if not any(data[kind] for kind in ENTITY_KINDS):
+            return None
+        return data
+        
+    def append_record(self, op, record, filename):
+        kind = JOURNAL_KINDS[op]
+        connection = self.connect(filename)
+        with self.lock, connection:
+            if op == 'cancel_tickets':
+                self.delete_tickets(connection, record['ids'])
+                return False
+            if op == 'exchange_ticket':
+                self.move_ticket(connection, record)
+                return False
+            for entry in journal_entries(op, record):
+                cursor = connection.execute(self.INSERTS[kind].format('IGNORE'),
+                                            self.to_row(kind, entry))
+                if kind == 'tickets' and cursor.rowcount:
+                    self.count_sale(connection, entry['screening_id'])
+        return False
+        
+    def count_sale(self, connection, screening_id, seats=1):
+        connection.execute(
+            "UPDATE screenings SET available_seats = available_seats - ?, "
+            "tickets_sold = tickets_sold + ? WHERE id = ?", (seats, seats, screening_id))
+        
+    def insert_ticket(self, record, filename):
+        ids = self.insert_tickets([record], filename)
+        return ids[0] if ids else None
+        
+    def insert_tickets(self, records, filename):
+        connection = self.connect(filename)
+        ids = []
+        with self.lock:
+            try:
+                with connection:
+                    for record in records:
+                        cursor = connection.execute(
+                            "INSERT INTO tickets (screening_id, seat_number, price) "
+                            "VALUES (:screening_id, :seat_number, :price)", record)
+                        ids.append(cursor.lastrowid)
+                    self.count_sale(connection, records[0]['screening_id'], len(records))
+            except sqlite3.IntegrityError:
+                return None
+        return ids
+        
+    def ticket_record(self, filename, where, params):
+        rows = self.query(filename, "SELECT id, screening_id, seat_number, price FROM tickets "
+                                    f"WHERE {where}", params)
+        return rows[0] if rows else None
+        
+    def delete_tickets(self, connection, ids):
+        records = []
+        for ticket_id in ids:
+            row = connection.execute("SELECT id, screening_id, seat_number, price FROM tickets "
+                                     "WHERE id = ?", (ticket_id,)).fetchone()
+            if row is None:
+                continue
+            connection.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+            self.count_sale(connection, row[1], -1)
+            records.append(dict(zip(('id', 'screening_id', 'seat_number', 'price'), row)))
+        return records
+        
+    def move_ticket(self, connection, record):
+        row = connection.execute("SELECT screening_id FROM tickets WHERE id = ?",
+                                 (record['id'],)).fetchone()
+        if row is None:
+            return False
+        connection.execute("UPDATE tickets SET screening_id = :screening_id, "
+                           "seat_number = :seat_number WHERE id = :id", record)
+        if row[0] != record['screening_id']:
+            self.count_sale(connection, row[0], -1)
+            self.count_sale(connection, record['screening_id'])
+        return True
+        
+    def cancel_tickets(self, ids, filename):
+        connection = self.connect(filename)
+        with self.lock, connection:
+            return self.delete_tickets(connection, ids)
+            
+    def screening_ticket_ids(self, screening_id, filename):
+        with self.lock:
+            cursor = self.connect(filename).execute(
+                "SELECT id FROM tickets WHERE screening_id = ?", (screening_id,))
+            return [row[0] for row in cursor]
+            
+    def exchange_ticket(self, record, filename):
+        connection = self.connect(filename)
+        with self.lock:
+            try:
+                with connection:
+                    return self.move_ticket(connection, record)
+            except sqlite3.IntegrityError:
+                return False
+        
+    def sold_seats(self, screening_id, filename):
+        with self.lock:
+            cursor = self.connect(filename).execute(
+                "SELECT seat_number FROM tickets WHERE screening_id = ?", (screening_id,))
+            return [row[0] for row in cursor]
+        
+    def sales_totals(self, filename):
+        with self.lock:
+            cursor = self.connect(filename).execute(
+                "SELECT screening_id, COUNT(*), SUM(price) FROM tickets GROUP BY screening_id")
+            return {row[0]: row[1:] for row in cursor}
+            
+    def screening_counters(self, filename, start=None, end=None):
+        sql = "SELECT id, available_seats, tickets_sold FROM screenings"
+        params = []
+        if start is not None or end is not None:
+            sql += " WHERE screening_time >= ? AND screening_time < ?"
+            params = [start.strftime(TIME_FORMAT) if start else "",
+                      end.strftime(TIME_FORMAT) if end else "9999"]
+        with self.lock:
+            cursor = self.connect(filename).execute(sql, params)
+            return {row[0]: row[1:] for row in cursor}
+
+
+JOURNAL_KINDS = {
+    'add_movie': 'movies',
+    'add_hall': 'halls',
+    'add_screening': 'screenings',
+    'buy_ticket': 'tickets',
+    'buy_tickets': 'tickets',
+    'cancel_tickets': 'tickets',
+    'exchange_ticket': 'tickets'
+}
+TICKET_CHANGES = ('cancel_tickets', 'exchange_ticket')
+
+
+def journal_entries(op, record):
+    return record['tickets'] if op == 'buy_tickets' else [record]
+
+
+def count_journal_sale(screenings, screening_id, seats=1):
+    screening = screenings.get(screening_id)
+    if screening is not None:
+        screening['available_seats'] -= seats
+        screening['tickets_sold'] += seats
+
+
+def replay_ticket_change(op, record, tickets, positions, screenings):
+    if op == 'exchange_ticket':
+        position = positions.get(record['id'])
+        if position is not None:
+            count_journal_sale(screenings, tickets[position]['screening_id'], -1)
+            count_journal_sale(screenings, record['screening_id'])
+            tickets[position] = record
+        return
+    for ticket_id in record['ids']:
+        position = positions.pop(ticket_id, None)
+        if position is None:
+            continue
+        count_journal_sale(screenings, tickets[position]['screening_id'], -1)
+        tickets[position] = None
+
+
+def replay_journal(data, lines):
+    known = {kind: {e['id'] for e in data[kind]} for kind in ENTITY_KINDS}
+    screenings = {s['id']: s for s in data['screenings']}
+    positions = None
+    applied = 0
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break
+        op = record.pop('op')
+        if op in TICKET_CHANGES:
+            if positions is None:
+                positions = {t['id']: i for i, t in enumerate(data['tickets'])}
+            replay_ticket_change(op, record, data['tickets'], positions, screenings)
+            applied += 1
+            continue
+        kind = JOURNAL_KINDS[op]
+        for entry in journal_entries(op, record):
+            if entry['id'] in known[kind]:
+                continue
+            known[kind].add(entry['id'])
+            data[kind].append(entry)
+            if kind == 'screenings':
+                screenings[entry['id']] = entry
+            elif kind == 'tickets':
+                count_journal_sale(screenings, entry['screening_id'])
+                if positions is not None:
+                    positions[entry['id']] = len(data['tickets']) - 1
+        applied += 1
+    if positions is not None:
+        data['tickets'] = [ticket for ticket in data['tickets'] if ticket is not None]
+    return applied
+
+
+SNAPSHOT_MAGIC = b'CINESNAP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EPOCH = datetime(1970, 1, 1)
+NO_STRING = 0xFFFFFFFF
+
+
+class SnapshotFile:
+    HEADER = struct.Struct('<8sHHQqIIIIQqI')
+    OFFSET = struct.Struct('<I')
+    MOVIE = struct.Struct('<iIiI')
+    HALL = struct.Struct('<iIiI')
+    SCREENING = struct.Struct('<iiiqiiQI')
+    TICKET = struct.Struct('<qiIdB')
+    
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.data_version, self.source_size, self.source_mtime,
+         self.source_crc, movies, halls, screenings, tickets, self.next_ticket_id,
+         strings) = self.HEADER.unpack_from(self.map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Netinkamas momentinės kopijos failas")
+        self.counts = {'movies': movies, 'halls': halls, 'screenings': screenings,
+                       'tickets': tickets}
+        self.string_offsets = self.HEADER.size
+        self.string_data = self.string_offsets + (strings + 1) * self.OFFSET.size
+        self.string_count = strings
+        offset = self.string_data + self.string_offset(strings)
+        self.sections = {}
+        for kind, record in (('movies', self.MOVIE), ('halls', self.HALL),
+                             ('screenings', self.SCREENING)):
+            self.sections[kind] = offset
+            offset += self.counts[kind] * record.size
+        self.occupancy_data = offset
+        if screenings:
+            last = self.SCREENING.unpack_from(
+                self.map, self.sections['screenings'] + (screenings - 1) * self.SCREENING.size)
+            offset += last[6] + last[7]
+        self.sections['tickets'] = offset
+        if self.sections['tickets'] + tickets * self.TICKET.size != len(self.map):
+            raise ValueError("Momentinės kopijos failas sugadintas")
+        self.strings = {}
+        
+    def string_offset(self, number):
+        return self.OFFSET.unpack_from(self.map, self.string_offsets + number * self.OFFSET.size)[0]
+        
+    def string(self, number):
+        if number == NO_STRING:
+            return None
+        if number not in self.strings:
+            start = self.string_data + self.string_offset(number)
+            end = self.string_data + self.string_offset(number + 1)
+            self.strings[number] = sys.intern(self.map[start:end].decode('utf-8'))
+        return self.strings[number]
+        
+    def records(self, kind, record):
+        start = self.sections[kind]
+        return (record.unpack_from(self.map, start + i * record.size)
+                for i in range(self.counts[kind]))
+        
+    def ticket(self, number):
+        ticket_id, screening_id, seat, price, whole = self.TICKET.unpack_from(
+            self.map, self.sections['tickets'] + number * self.TICKET.size)
+        return {'id': ticket_id, 'screening_id': screening_id, 'seat_number': self.string(seat),
+                'price': int(price) if whole else price}
+        
+    def data(self):
+        movies = [{'id': movie_id, 'title': self.string(title), 'duration': duration,
+                   'genre': self.string(genre)}
+                  for movie_id, title, duration, genre in self.records('movies', self.MOVIE)]
+        halls = []
+        for hall_id, number, capacity, layout in self.records('halls', self.HALL):
+            hall = {'id': hall_id, 'hall_number': json.loads(self.string(number)),
+                    'capacity': capacity}
+            if layout != NO_STRING:
+                hall['layout'] = json.loads(self.string(layout))
+            halls.append(hall)
+        screenings = []
+        occupancy = {}
+        for (screening_id, movie_id, hall_id, minutes, available, sold,
+             start, length) in self.records('screenings', self.SCREENING):
+            screenings.append({
+                'id': screening_id,
+                'movie_id': movie_id,
+                'screening_time': SNAPSHOT_EPOCH + timedelta(minutes=minutes),
+                'hall_id': hall_id,
+                'available_seats': available,
+                'tickets_sold': sold
+            })
+            start += self.occupancy_data
+            occupancy[screening_id] = self.map[start:start + length]
+        return {
+            'version': self.data_version,
+            'movies': movies,
+            'halls': halls,
+            'screenings': screenings,
+            'tickets': MappedTickets(self),
+            'occupancy': occupancy,
+            'next_ids': {'tickets': self.next_ticket_id}
+        }
+        
+    @classmethod
+    def write(cls, path, data, source):
+        strings = {}
+        
+        def string(value):
+            if value is None:
+                return NO_STRING
+            if value not in strings:
+                strings[value] = len(strings)
+            return strings[value]
+            
+        movies = b''.join(cls.MOVIE.pack(m['id'], string(m['title']), m['duration'],
+                                         string(m['genre'])) for m in data['movies'])
+        layouts = {}
+        hall_records = []
+        for hall in data['halls']:
+            layouts[hall['id']] = CinemaHall.from_record(hall).layout
+            layout = json.dumps(hall['layout']) if 'layout' in hall else None
+            hall_records.append(cls.HALL.pack(hall['id'], string(json.dumps(hall['hall_number'])),
+                                              hall['capacity'], string(layout)))
+        halls = b''.join(hall_records)
+        
+        screenings = {s['id']: s for s in data['screenings']
+                      if s['hall_id'] in layouts}
+        occupancy = {screening_id: bytearray(layouts[s['hall_id']].initial)
+                     for screening_id, s in screenings.items()}
+        tickets = bytearray()
+        next_ticket_id = 1
+        for ticket in data['tickets']:
+            screening = screenings.get(ticket['screening_id'])
+            if screening is None:
+                continue
+            seat = layouts[screening['hall_id']].index.get(ticket['seat_number'])
+            if seat is not None:
+                occupancy[ticket['screening_id']][seat] = 1
+            tickets += cls.TICKET.pack(ticket['id'], ticket['screening_id'],
+                                       string(ticket['seat_number']), ticket['price'],
+                                       isinstance(ticket['price'], int))
+            next_ticket_id = max(next_ticket_id, ticket['id'] + 1)
+            
+        screening_records = []
+        occupancy_data = bytearray()
+        for screening_id, screening in screenings.items():
+            screening_time = screening['screening_time']
+            if isinstance(screening_time, str):
+                screening_time = datetime.strptime(screening_time, TIME_FORMAT)
+            screening_records.append(cls.SCREENING.pack(
+                screening_id, screening['movie_id'], screening['hall_id'],
+                (screening_time - SNAPSHOT_EPOCH) // timedelta(minutes=1),
+                screening['available_seats'], screening['tickets_sold'],
+                len(occupancy_data), len(occupancy[screening_id])))
+            occupancy_data += occupancy[screening_id]
+            
+        encoded = [value.encode('utf-8') for value in strings]
+        offsets = array('I', [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        size, mtime, crc = source
+        header = cls.HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, data.get('version', FORMAT_VERSION),
+                                 size, mtime, crc, len(data['movies']), len(data['halls']),
+                                 len(screenings), len(tickets) // cls.TICKET.size,
+                                 next_ticket_id, len(encoded))
+        parts = (header, offsets.tobytes(), b''.join(encoded), movies, halls,
+                 b''.join(screening_records), occupancy_data, tickets)
+        write_atomically(path, lambda file: file.writelines(parts), 'wb')
+
+
+class MappedTickets:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        
+    def __len__(self):
+        return self.snapshot.counts['tickets']
+        
+    def __getitem__(self, number):
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("bilieto indeksas už ribų")
+        return self.snapshot.ticket(number)
+        
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.snapshot.ticket(number)
+            
+    def bind(self, screenings):
+        return TicketLog(self, screenings)
+
+
+class TicketLog:
+    def __init__(self, records, screenings):
+        self.records = records
+        self.screenings = screenings
+        self.size = len(records)
+        self.replaced = {}
+        self.added = []
+        
+    def __len__(self):
+        return self.size + len(self.added)
+        
+    def __iter__(self):
+        for position in range(self.size):
+            yield self.record(position)
+        yield from self.added
+        
+    def record(self, position):
+        ticket = self.replaced.get(position)
+        if ticket is None:
+            ticket = Ticket.from_record(self.records[position], self.screenings)
+        return ticket
+        
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if position >= self.size:
+            return self.added[position - self.size]
+        if position < 0:
+            raise IndexError("bilieto indeksas už ribų")
+        return self.record(position)
+        
+    def __setitem__(self, position, ticket):
+        if position >= self.size:
+            self.added[position - self.size] = ticket
+        else:
+            self.replaced[position] = ticket
+            
+    def pop(self):
+        if self.added:
+            return self.added.pop()
+        if not self.size:
+            raise IndexError("bilietų sąrašas tuščias")
+        self.size -= 1
+        ticket = self.record(self.size)
+        self.replaced.pop(self.size, None)
+        return ticket
+        
+    def append(self, ticket):
+        self.added.append(ticket)
+        
+    def extend(self, tickets):
+        self.added.extend(tickets)
+        
+    def copy(self):
+        log = TicketLog(self.records, self.screenings)
+        log.size = self.size
+        log.replaced = dict(self.replaced)
+        log.added = list(self.added)
+        return log
+
+
+def swap_remove(tickets, position):
+    last = tickets.pop()
+    if position < len(tickets):
+        tickets[position] = last
+        return last
+    return None
+
+
+class BinarySnapshotHandler(DataHandler):
+    def __init__(self, source_handler=None):
+        self.source_handler = source_handler or JSONDataHandler()
+        
+    @staticmethod
+    def snapshot_filename(filename):
+        return os.path.splitext(filename)[0] + '.snap'
+        
+    def source_files(self, filename):
+        files = [filename]
+        if isinstance(self.source_handler, JournalDataHandler):
+            files.append(self.source_handler.journal_filename(filename))
+        return [path for path in files if os.path.exists(path)]
+        
+    def source_stamp(self, filename):
+        stats = [os.stat(path) for path in self.source_files(filename)]
+        return sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)
+        
+    def source_checksum(self, filename):
+        crc = 0
+        for path in self.source_files(filename):
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 20), b''):
+                    crc = zlib.crc32(chunk, crc)
+        return crc
+        
+    def open_snapshot(self, filename):
+        try:
+            snapshot = SnapshotFile(self.snapshot_filename(filename))
+        except (OSError, ValueError, struct.error):
+            return None
+        if snapshot.data_version != FORMAT_VERSION:
+            return None
+        if (snapshot.source_size, snapshot.source_mtime) == self.source_stamp(filename):
+            return snapshot
+        if snapshot.source_crc == self.source_checksum(filename):
+            return snapshot
+        return None
+        
+    def write_snapshot(self, data, filename):
+        if data.get('version', 1) == 1:
+            data = migrate_legacy_data(data)
+        if data['version'] != FORMAT_VERSION:
+            return
+        source = self.source_stamp(filename) + (self.source_checksum(filename),)
+        try:
+            SnapshotFile.write(self.snapshot_filename(filename), data, source)
+        except OSError as error:
+            print(f"Nepavyko įrašyti momentinės kopijos: {error}", file=sys.stderr)
+        
+    def save_data(self, data, filename):
+        self.source_handler.save_data(data, filename)
+        self.write_snapshot(data, filename)
+        
+    def save_snapshot(self, snapshot, filename):
+        saved = []
+        self.source_handler.save_snapshot(lambda: saved.append(snapshot()) or saved[0], filename)
+        if saved:
+            self.write_snapshot(saved[0], filename)
+            
+    def append_record(self, op, record, filename):
+        return self.source_handler.append_record(op, record, filename)
+        
+    def load_data(self, filename):
+        if not os.path.exists(filename):
+            return self.source_handler.load_data(filename)
+        snapshot = self.open_snapshot(filename)
+        if snapshot is None:
+            data = self.source_handler.load_data(filename)
+            if not data:
+                return data
+            self.write_snapshot(data, filename)
+            snapshot = self.open_snapshot(filename)
+            if snapshot is None:
+                return data
+        return snapshot.data()
+
+
+DEFAULT_PRICING_RULES = {
+    'base_price': 8,
+    'rules': [
+        {'type': 'movie', 'titles': ["The Matrix", "Inception", "Avatar"], 'amount': 3},
+        {'type': 'time', 'after': "18:00", 'amount': 2},
+        {'type': 'hall', 'capacity_above': 80, 'amount': 1}
+    ]
+}
+
+
+def parse_time(value):
+    return datetime.strptime(value, "%H:%M").time() if value else None
+
+
+class PricingEngine:
+    def __init__(self, config=None):
+        self.cache = {}
+        self.load(config or DEFAULT_PRICING_RULES)
+        
+    @classmethod
+    def from_file(cls, filename):
+        with open(filename, 'r', encoding='utf-8') as file:
+            return cls(json.load(file))
+        
+    def load(self, config):
+        self.base_price = config.get('base_price', 0)
+        self.movie_amounts = {}
+        self.hall_amounts = {}
+        self.rules = []
+        self.occupancies = []
+        self.demand_amounts = []
+        for rule in config.get('rules', []):
+            self.compile_rule(rule)
+        self.cache.clear()
+        
+    @property
+    def uses_demand(self):
+        return bool(self.occupancies)
+        
+    def compile_rule(self, rule):
+        kind = rule.get('type')
+        amount = rule.get('amount', 0)
+        if kind == 'movie':
+            for title in rule['titles']:
+                self.movie_amounts[title] = self.movie_amounts.get(title, 0) + amount
+        elif kind == 'hall' and 'halls' in rule:
+            for hall_number in rule['halls']:
+                key = hall_key(hall_number)
+                self.hall_amounts[key] = self.hall_amounts.get(key, 0) + amount
+        elif kind == 'hall':
+            capacity_above = rule['capacity_above']
+            self.rules.append(lambda s: amount if s.hall.capacity > capacity_above else 0)
+        elif kind == 'time':
+            after, before = parse_time(rule.get('after')), parse_time(rule.get('before'))
+            
+            def time_rule(screening):
+                start = screening.screening_time.time()
+                if (after is None or start > after) and (before is None or start < before):
+                    return amount
+                return 0
+                
+            self.rules.append(time_rule)
+        elif kind == 'weekday':
+            days = frozenset(rule['days'])
+            self.rules.append(lambda s: amount if s.screening_time.weekday() in days else 0)
+        elif kind == 'demand':
+            thresholds = sorted((t['occupancy'], t['amount']) for t in rule['thresholds'])
+            self.occupancies = [occupancy for occupancy, _ in thresholds]
+            self.demand_amounts = [uplift for _, uplift in thresholds]
+        else:
+            raise ValueError(f"Nežinoma kainodaros taisyklė: {kind}")
+            
+    def evaluate(self, screening):
+        price = (self.base_price
+                 + self.movie_amounts.get(screening.movie.title, 0)
+                 + self.hall_amounts.get(hall_key(screening.hall.hall_number), 0))
+        for rule in self.rules:
+            price += rule(screening)
+        if self.occupancies and screening.hall.capacity:
+            level = bisect_right(self.occupancies, screening.tickets_sold / screening.hall.capacity)
+            if level:
+                price += self.demand_amounts[level - 1]
+        return price
+        
+    def price(self, screening):
+        price = self.cache.get(screening)
+        if price is None:
+            price = self.cache[screening] = self.evaluate(screening)
+        return price
+        
+    def prices(self, screenings):
+        cache = self.cache
+        prices = []
+        for screening in screenings:
+            price = cache.get(screening)
+            if price is None:
+                price = cache[screening] = self.evaluate(screening)
+            prices.append(price)
+        return prices
+        
+    def invalidate(self, screening=None):
+        if screening is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(screening, None)
+            
+    def sale_made(self, screening):
+        if self.occupancies:
+            self.cache.pop(screening, None)
+
+
+class AutoSaver:
+    def __init__(self, cinema, interval=1.0, max_delay=10.0):
+        self.cinema = cinema
+        self.interval = interval
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        self.first_change = None
+        self.last_change = None
+        self.compacting = False
+        self.stopped = False
+        self.saves = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        
+    def changed(self):
+        with self.condition:
+            self.last_change = perf_counter()
+            if self.first_change is None:
+                self.first_change = self.last_change
+            self.condition.notify()
+            
+    def compact(self):
+        with self.condition:
+            self.compacting = True
+            self.condition.notify()
+            
+    def run(self):
+        while True:
+            with self.condition:
+                while self.first_change is None and not self.compacting and not self.stopped:
+                    self.condition.wait()
+                while not self.stopped and not self.compacting:
+                    deadline = min(self.last_change + self.interval,
+                                   self.first_change + self.max_delay)
+                    remaining = deadline - perf_counter()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if self.stopped:
+                    return
+                force, self.compacting = self.compacting, False
+                self.first_change = self.last_change = None
+            if self.cinema.persist(self.cinema.data_file, force):
+                self.saves += 1
+                
+    def stop(self, flush=True):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join()
+        if flush and self.cinema.persist(self.cinema.data_file):
+            self.saves += 1
+
+
+class SeatHold:
+    __slots__ = ('id', 'screening', 'seats', 'expires')
+    
+    def __init__(self, hold_id, screening, seats, expires):
+        self.id = hold_id
+        self.screening = screening
+        self.seats = seats
+        self.expires = expires
+        
+    def remaining(self):
+        return max(0.0, self.expires - perf_counter())
+
+
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+        
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+            
+    def count(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+            
+    def observe(self, name, labels, seconds):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+            histogram['buckets'][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            
+    def wrap(self, call, metric, labels, classify=None):
+        def instrumented(*args, **kwargs):
+            started = perf_counter()
+            try:
+                result = call(*args, **kwargs)
+            except Exception as error:
+                self.observe(f"{metric}_seconds", labels, perf_counter() - started)
+                self.count(f"{metric}s_total", dict(labels, outcome='error'))
+                self.count("cinema_failures_total",
+                           dict(labels, reason=type(error).__name__))
+                raise
+            self.observe(f"{metric}_seconds", labels, perf_counter() - started)
+            if classify and result is None:
+                self.count(f"{metric}s_total", dict(labels, outcome='failed'))
+                self.count("cinema_failures_total",
+                           dict(labels, reason=classify(*args, **kwargs)))
+            else:
+                self.count(f"{metric}s_total", dict(labels, outcome='ok'))
+            return result
+        instrumented.__wrapped__ = call
+        return instrumented
+        
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'histograms': [{'name': name, 'labels': dict(labels),
+                                'buckets': dict(zip([*map(str, LATENCY_BUCKETS), '+Inf'],
+                                                    h['buckets'])),
+                                'sum': h['sum'], 'count': h['count']}
+                               for (name, labels), h in sorted(self.histograms.items())]
+            }
+            
+    def to_prometheus(self):
+        def label_text(labels, **extra):
+            pairs = [*labels, *extra.items()]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+            
+        lines = []
+        with self.lock:
+            declared = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in declared:
+                    declared.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{label_text(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in declared:
+                    declared.add(name)
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip([*map(str, LATENCY_BUCKETS), '+Inf'],
+                                        histogram['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{label_text(labels, le=bound)} {cumulative}")
+                lines.append(f"{name}_sum{label_text(labels)} {histogram['sum']:.9f}")
+                lines.append(f"{name}_count{label_text(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def seat_failure(screening, seat_number):
+    if screening is None:
+        return 'invalid_screening'
+    index = screening.seat_index.get(seat_number)
+    if index is None:
+        return 'invalid_seat'
+    if screening.occupancy[index] == HallLayout.BLOCKED_SEAT:
+        return 'blocked_seat'
+    if screening.occupancy[index] == HallLayout.HELD_SEAT:
+        return 'seat_held'
+    return 'seat_taken'
+
+
+def seats_failure(screening, seats=None, party_size=None, split=False):
+    if screening is None:
+        return 'invalid_screening'
+    if seats is None:
+        return 'no_block' if party_size and party_size > 0 else 'invalid_request'
+    if not seats or len(set(seats)) != len(seats):
+        return 'invalid_request'
+    for seat in seats:
+        if not screening.is_seat_free(seat):
+            return seat_failure(screening, seat)
+    return 'conflict'
+
+
+def failure_classifiers(cinema):
+    def position(screening_id):
+        if 0 <= screening_id < len(cinema.screenings):
+            return cinema.screenings[screening_id]
+        return None
+        
+    def add_screening(movie_title, screening_time, hall_number):
+        if not cinema.get_movie(movie_title):
+            return 'unknown_movie'
+        if not cinema.get_hall(hall_number):
+            return 'unknown_hall'
+        return 'schedule_conflict'
+        
+    def exchange_ticket(ticket_id, seat_number, screening=None):
+        ticket = cinema.get_ticket(ticket_id)
+        if ticket is None:
+            return 'unknown_ticket'
+        return seat_failure(screening or ticket.screening, seat_number)
+        
+    return {
+        'buy_ticket': lambda screening_id, seat_number: seat_failure(position(screening_id),
+                                                                     seat_number),
+        'book_seat': seat_failure,
+        'buy_tickets': lambda screening_id, *args, **kwargs: seats_failure(
+            position(screening_id), *args, **kwargs),
+        'book_seats': seats_failure,
+        'hold_seats': seats_failure,
+        'confirm_hold': lambda hold_id: 'hold_expired',
+        'cancel_ticket': lambda ticket_id: 'unknown_ticket',
+        'exchange_ticket': exchange_ticket,
+        'add_screening': add_screening
+    }
+
+
+INSTRUMENTED_OPERATIONS = ('buy_ticket', 'book_seat', 'buy_tickets', 'book_seats',
+                           'hold_seats', 'confirm_hold',
+                           'cancel_ticket', 'cancel_tickets', 'exchange_ticket',
+                           'get_available_seats', 'list_screenings', 'calculate_ticket_price',
+                           'add_movie', 'add_hall', 'add_screening', 'save_data', 'load_data')
+INSTRUMENTED_IO = ('save_data', 'load_data', 'append_record', 'save_snapshot')
+
+
+def profile_call(call, *args, limit=25, **kwargs):
+    profiler = cProfile.Profile()
+    result = profiler.runcall(call, *args, **kwargs)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(limit)
+    return result, report.getvalue()
+
+
+class CinemaManager:
+    _instance = None
+    _lock = threading.Lock()
+    default_handler = JSONDataHandler
+    
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls.create()
+        return cls._instance
+        
+    @classmethod
+    def create(cls, data_file='cinema_data.json', data_handler=None, catalog=None,
+               sample_data=True, preload=False):
+        instance = super().__new__(cls)
+        instance.loaded = True
+        instance.loading = True
+        instance.load_lock = threading.RLock()
+        instance.dirty_lock = threading.Lock()
+        instance.save_lock = threading.Lock()
+        instance.revision = 0
+        instance.saved_revision = 0
+        instance.changed = {}
+        instance.autosaver = None
+        instance.compactor = None
+        instance.metrics = None
+        instance.holds = {}
+        instance.hold_heap = []
+        instance.hold_ids = count(1)
+        instance.hold_lock = threading.Lock()
+        instance.hold_ttl = 300
+        instance.ticket_lock = threading.Lock()
+        instance.ticket_index = None
+        instance.seat_tickets = None
+        instance.catalog = catalog
+        instance.movies = []
+        instance.screenings = []
+        instance.halls = []
+        instance.tickets = []
+        instance.next_ids = {kind: count(1) for kind in ENTITY_KINDS}
+        instance.data_handler = data_handler or cls.default_handler()
+        instance.data_file = data_file
+        instance.sample_data = sample_data
+        instance.cleaning_minutes = 0
+        instance.pricing = PricingEngine()
+        instance.analytics = None
+        instance.schedule_lock = threading.Lock()
+        instance.loading = False
+        instance.loaded = False
+        if preload:
+            instance.preload()
+        return instance
+        
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.load_lock:
+            if self.loaded or self.loading:
+                return
+            self.loading = True
+            try:
+                if self.sample_data:
+                    self.initialize_sample_data()
+                self.load_data(self.data_file)
+            finally:
+                self.loading = False
+                self.loaded = True
+                
+    def preload(self):
+        thread = threading.Thread(target=self.ensure_loaded, daemon=True)
+        thread.start()
+        return thread
+        
+    def mark_dirty(self, kind):
+        if self.loading:
+            return
+        with self.dirty_lock:
+            self.revision += 1
+            self.changed[kind] = self.revision
+        if self.autosaver:
+            self.autosaver.changed()
+            
+    def is_dirty(self):
+        return self.revision != self.saved_revision
+        
+    def dirty_kinds(self):
+        with self.dirty_lock:
+            return {kind for kind, revision in self.changed.items()
+                    if revision > self.saved_revision}
+            
+    def start_autosave(self, interval=1.0, max_delay=10.0):
+        self.stop_autosave()
+        self.autosaver = AutoSaver(self, interval, max_delay)
+        return self.autosaver
+        
+    def stop_autosave(self, flush=True):
+        autosaver, self.autosaver = self.autosaver, None
+        if autosaver:
+            autosaver.stop(flush)
+        
+    def enable_metrics(self, metrics=None):
+        self.disable_metrics()
+        self.metrics = metrics or self.metrics or Metrics()
+        classifiers = failure_classifiers(self)
+        for operation in INSTRUMENTED_OPERATIONS:
+            call = getattr(type(self), operation).__get__(self)
+            setattr(self, operation, self.metrics.wrap(call, 'cinema_operation',
+                                                       {'operation': operation},
+                                                       classifiers.get(operation)))
+        self.instrument_handler()
+        return self.metrics
+        
+    def disable_metrics(self):
+        for operation in INSTRUMENTED_OPERATIONS:
+            self.__dict__.pop(operation, None)
+        for call in INSTRUMENTED_IO:
+            self.data_handler.__dict__.pop(call, None)
+            
+    def metrics_enabled(self):
+        return 'buy_ticket' in self.__dict__
+            
+    def instrument_handler(self):
+        handler = self.data_handler
+        labels = {'handler': type(handler).__name__}
+        for call in INSTRUMENTED_IO:
+            if call not in handler.__dict__:
+                bound = getattr(type(handler), call).__get__(handler)
+                setattr(handler, call, self.metrics.wrap(bound, 'cinema_io_call',
+                                                         dict(labels, call=call)))
+                
+    def profile(self, operation, *args, **kwargs):
+        return profile_call(getattr(self, operation), *args, **kwargs)
+        
+    def intern_movie(self, movie):
+        return self.catalog.intern(movie) if self.catalog is not None else movie
+    
+    @property
+    def movies(self):
+        self.ensure_loaded()
+        return self._movies
+        
+    @movies.setter
+    def movies(self, movies):
+        self.ensure_loaded()
+        if self.catalog is not None:
+            movies = [self.catalog.intern(movie) for movie in movies]
+        self._movies = movies
+        self.mark_dirty('movies')
+        self.movies_by_title = {}
+        for movie in movies:
+            self.movies_by_title.setdefault(movie.title, movie)
+            
+    @property
+    def halls(self):
+        self.ensure_loaded()
+        return self._halls
+        
+    @halls.setter
+    def halls(self, halls):
+        self.ensure_loaded()
+        self._halls = halls
+        self.mark_dirty('halls')
+        self.halls_by_number = {}
+        for hall in halls:
+            self.halls_by_number.setdefault(hall_key(hall.hall_number), hall)
+            
+    @property
+    def screenings(self):
+        self.ensure_loaded()
+        return self._screenings
+        
+    @screenings.setter
+    def screenings(self, screenings):
+        self.ensure_loaded()
+        self._screenings = screenings
+        self.mark_dirty('screenings')
+        self.screenings_by_id = {s.id: s for s in screenings if s.id is not None}
+        self.screening_positions = {s.id: i for i, s in enumerate(screenings) if s.id is not None}
+        self.schedule = ScreeningSchedule(screenings)
+        if hasattr(self, 'pricing'):
+            self.pricing.invalidate()
+        if getattr(self, 'analytics', None):
+            self.analytics.rebuild(self)
+            
+    @property
+    def tickets(self):
+        self.ensure_loaded()
+        return self._tickets
+        
+    @tickets.setter
+    def tickets(self, tickets):
+        self.ensure_loaded()
+        self._tickets = tickets
+        self.ticket_index = None
+        self.mark_dirty('tickets')
+        
+    def get_movie(self, title):
+        self.ensure_loaded()
+        return self.movies_by_title.get(title)
+        
+    def get_hall(self, hall_number):
+        self.ensure_loaded()
+        return self.halls_by_number.get(hall_key(hall_number))
+        
+    def get_screening(self, screening_id):
+        self.ensure_loaded()
+        return self.screenings_by_id.get(screening_id)
+        
+    def screening_position(self, screening):
+        self.ensure_loaded()
+        if screening.id in self.screening_positions:
+            return self.screening_positions[screening.id]
+        return self.screenings.index(screening)
+        
+    def find_screenings(self, start=None, end=None, hall_number=None, movie_title=None):
+        self.ensure_loaded()
+        return self.schedule.find(start, end, hall_number, movie_title)
+    
+    def initialize_sample_data(self):
+        if not self.movies:
+            self.movies = [
+                Movie("The Matrix", 120, "Sci-Fi"),
+                Movie("Inception", 150, "Thriller"),
+                Movie("The Shawshank Redemption", 142, "Drama")
+            ]
+        
+        if not self.halls:
+            self.halls = [
+                CinemaHall(1, 50),
+                CinemaHall(2, 100)
+            ]
+        self.assign_ids()
+    
+    def calculate_ticket_price(self, screening):
+        return self.pricing.price(screening)
+        
+    def calculate_ticket_prices(self, screenings):
+        return self.pricing.prices(screenings)
+        
+    def load_pricing(self, filename):
+        self.pricing = PricingEngine.from_file(filename)
+        
+    def enable_analytics(self):
+        if self.analytics is None:
+            self.analytics = SalesAnalytics(self)
+        return self.analytics
+        
+    def sale_made(self, screening, price, tickets=1):
+        self.pricing.sale_made(screening)
+        if self.analytics:
+            self.analytics.sale(screening, price, tickets)
+    
+    def get_available_seats(self, screening):
+        self.expire_holds()
+        self.refresh_screening(screening)
+        return screening.free_seats()
+        
+    def refresh_screening(self, screening):
+        if not self.data_handler.live:
+            return
+        with screening.lock:
+            screening.reset_occupancy()
+            for seat_number in self.data_handler.sold_seats(screening.id, self.data_file):
+                if seat_number in screening.seat_index:
+                    screening.occupy_seat(seat_number)
+            for hold in list(screening.holds):
+                screening.occupy_seats([seat for seat in hold.seats if screening.is_seat_free(seat)],
+                                       HallLayout.HELD_SEAT)
+                
+    def list_screenings(self, start=None, end=None, hall_number=None, movie_title=None):
+        if start is None and end is None and hall_number is None and movie_title is None:
+            screenings = self.screenings
+        else:
+            screenings = self.find_screenings(start, end, hall_number, movie_title)
+        if self.data_handler.live:
+            counters = self.data_handler.screening_counters(self.data_file, start, end)
+            for screening in screenings:
+                if screening.id in counters:
+                    screening.available_seats, screening.tickets_sold = counters[screening.id]
+                    self.pricing.sale_made(screening)
+        return screenings
+    
+    def next_id(self, kind):
+        self.ensure_loaded()
+        return next(self.next_ids[kind])
+        
+    def assign_ids(self):
+        for kind in ENTITY_KINDS:
+            for entity in getattr(self, kind):
+                if entity.id is None:
+                    entity.id = self.next_id(kind)
+                    if kind == 'screenings':
+                        self.screenings_by_id[entity.id] = entity
+                        self.screening_positions[entity.id] = self.screenings.index(entity)
+    
+    def add_movie(self, title, duration, genre):
+        movie = Movie(title, duration, genre)
+        if self.catalog is not None:
+            movie = self.catalog.intern(movie)
+        else:
+            movie.id = self.next_id('movies')
+        self.movies.append(movie)
+        self.movies_by_title.setdefault(title, movie)
+        self.mark_dirty('movies')
+        self.record('add_movie', movie.to_record())
+        return movie
+        
+    def add_hall(self, hall_number, capacity, layout=None):
+        hall = CinemaHall(hall_number, capacity, layout)
+        hall.id = self.next_id('halls')
+        self.halls.append(hall)
+        self.halls_by_number.setdefault(hall_key(hall_number), hall)
+        self.mark_dirty('halls')
+        self.record('add_hall', hall.to_record())
+        return hall
+        
+    def add_screening(self, movie_title, screening_time, hall_number):
+        movie = self.get_movie(movie_title)
+        hall = self.get_hall(hall_number)
+        
+        if not movie or not hall:
+            return None
+            
+        screening = Screening(movie, screening_time, hall)
+        buffer = timedelta(minutes=self.cleaning_minutes)
+        with self.schedule_lock:
+            if self.schedule.conflict(hall.hall_number, screening_time,
+                                      screening_end(screening), buffer):
+                return None
+            screening.id = self.next_id('screenings')
+            self.screenings.append(screening)
+            self.screenings_by_id[screening.id] = screening
+            self.screening_positions[screening.id] = len(self.screenings) - 1
+            self.schedule.add(screening)
+        if self.analytics:
+            self.analytics.add_screening(screening)
+        self.mark_dirty('screenings')
+        self.record('add_screening', screening.to_record())
+        return screening
+        
+    def buy_ticket(self, screening_id, seat_number):
+        if screening_id < 0 or screening_id >= len(self.screenings):
+            return None
+            
+        return self.book_seat(self.screenings[screening_id], seat_number)
+        
+    def book_seat(self, screening, seat_number):
+        self.expire_holds()
+        if self.data_handler.live:
+            return self.book_seat_live(screening, seat_number)
+        
+        with screening.lock:
+            if not screening.is_seat_free(seat_number):
+                return None
+                
+            price = self.calculate_ticket_price(screening)
+            ticket = Ticket(screening, seat_number, price)
+            ticket.id = self.next_id('tickets')
+            screening.occupy_seat(seat_number)
+            self.store_tickets([ticket])
+            screening.available_seats -= 1
+            screening.tickets_sold += 1
+            self.sale_made(screening, price)
+        self.mark_dirty('tickets')
+        self.record('buy_ticket', ticket.to_record())
+        return ticket
+        
+    def book_seat_live(self, screening, seat_number):
+        index = screening.seat_index.get(seat_number)
+        if index is None or screening.occupancy[index] in (HallLayout.BLOCKED_SEAT, HallLayout.HELD_SEAT):
+            return None
+            
+        price = self.calculate_ticket_price(screening)
+        ticket = Ticket(screening, seat_number, price)
+        ticket.id = self.data_handler.insert_ticket(ticket.to_record(), self.data_file)
+        if ticket.id is None:
+            return None
+        with screening.lock:
+            screening.occupy_seat(seat_number)
+            screening.available_seats -= 1
+            screening.tickets_sold += 1
+            self.sale_made(screening, price)
+        return ticket
+        
+    def buy_tickets(self, screening_id, seats=None, party_size=None, split=False):
+        if screening_id < 0 or screening_id >= len(self.screenings):
+            return None
+        return self.book_seats(self.screenings[screening_id], seats, party_size, split)
+        
+    def book_seats(self, screening, seats=None, party_size=None, split=False):
+        self.expire_holds()
+        live = self.data_handler.live
+        if live:
+            self.refresh_screening(screening)
+            
+        with screening.lock:
+            seats = self.choose_seats(screening, seats, party_size, split)
+            if seats is None:
+                return None
+            tickets = self.sell_seats(screening, seats)
+        if tickets and not live:
+            self.recorded_sale(tickets)
+        return tickets
+        
+    def choose_seats(self, screening, seats, party_size, split):
+        if seats is None:
+            if not party_size or party_size < 1:
+                return None
+            seats = screening.find_block(party_size)
+            if seats is None and split:
+                seats = screening.fill_rows(party_size)
+            return seats
+        if (not seats or len(set(seats)) != len(seats)
+                or not all(screening.is_seat_free(seat) for seat in seats)):
+            return None
+        return seats
+        
+    def sell_seats(self, screening, seats):
+        live = self.data_handler.live
+        price = self.calculate_ticket_price(screening)
+        tickets = [Ticket(screening, seat, price) for seat in seats]
+        if live:
+            ids = self.data_handler.insert_tickets(
+                [t.to_record() for t in tickets], self.data_file)
+            if ids is None:
+                return None
+        else:
+            ids = [self.next_id('tickets') for _ in tickets]
+        for ticket, ticket_id in zip(tickets, ids):
+            ticket.id = ticket_id
+        screening.occupy_seats(seats)
+        if not live:
+            self.store_tickets(tickets)
+        screening.available_seats -= len(tickets)
+        screening.tickets_sold += len(tickets)
+        self.sale_made(screening, price, len(tickets))
+        return tickets
+        
+    def recorded_sale(self, tickets):
+        self.mark_dirty('tickets')
+        self.record('buy_tickets', {'tickets': [t.to_record() for t in tickets]})
+        
+    def hold_seats(self, screening, seats=None, party_size=None, split=False, ttl=None):
+        self.expire_holds()
+        if self.data_handler.live:
+            self.refresh_screening(screening)
+        expires = perf_counter() + (self.hold_ttl if ttl is None else ttl)
+        with screening.lock:
+            seats = self.choose_seats(screening, seats, party_size, split)
+            if seats is None:
+                return None
+            screening.occupy_seats(seats, HallLayout.HELD_SEAT)
+            hold = SeatHold(next(self.hold_ids), screening, tuple(seats), expires)
+            screening.holds.add(hold)
+        with self.hold_lock:
+            self.holds[hold.id] = hold
+            heapq.heappush(self.hold_heap, (hold.expires, hold.id))
+        return hold
+        
+    def take_hold(self, hold_id):
+        with self.hold_lock:
+            hold = self.holds.pop(hold_id, None)
+        if hold is not None and hold.expires <= perf_counter():
+            self.drop_hold(hold)
+            return None
+        return hold
+        
+    def drop_hold(self, hold):
+        with hold.screening.lock:
+            hold.screening.holds.discard(hold)
+            hold.screening.release_seats(hold.seats)
+            
+    def release_hold(self, hold_id):
+        hold = self.take_hold(hold_id)
+        if hold is None:
+            return False
+        self.drop_hold(hold)
+        return True
+        
+    def confirm_hold(self, hold_id):
+        hold = self.take_hold(hold_id)
+        if hold is None:
+            return None
+        screening = hold.screening
+        with screening.lock:
+            screening.holds.discard(hold)
+            screening.release_seats(hold.seats)
+            tickets = self.sell_seats(screening, list(hold.seats))
+        if tickets and not self.data_handler.live:
+            self.recorded_sale(tickets)
+        return tickets
+        
+    def store_tickets(self, tickets):
+        with self.ticket_lock:
+            store = self.tickets
+            store.extend(tickets)
+            if self.ticket_index is not None:
+                for position, ticket in enumerate(tickets, len(store) - len(tickets)):
+                    self.ticket_index[ticket.id] = position
+                    self.seat_tickets.setdefault(ticket.screening, {})[ticket.seat_number] = ticket.id
+                    
+    def index_tickets(self):
+        if self.ticket_index is not None:
+            return
+        store = self.tickets
+        seat_tickets = {}
+        if isinstance(store, TicketStore):
+            positions = dict(zip(store.ids, range(len(store))))
+            sold = store.seat_ids()
+        else:
+            positions = {}
+            sold = []
+            for position, ticket in enumerate(store):
+                positions[ticket.id] = position
+                sold.append((ticket.screening, ticket.seat_number, ticket.id))
+        for screening, seat_number, ticket_id in sold:
+            seat_tickets.setdefault(screening, {})[seat_number] = ticket_id
+        self.ticket_index, self.seat_tickets = positions, seat_tickets
+        
+    def get_ticket(self, ticket_id):
+        if self.data_handler.live:
+            record = self.data_handler.ticket_record(self.data_file, "id = ?", (ticket_id,))
+            return self.live_ticket(record)
+        with self.ticket_lock:
+            self.index_tickets()
+            position = self.ticket_index.get(ticket_id)
+            return None if position is None else self.tickets[position]
+            
+    def find_ticket(self, screening, seat_number):
+        if self.data_handler.live:
+            record = self.data_handler.ticket_record(
+                self.data_file, "screening_id = ? AND seat_number = ?", (screening.id, seat_number))
+            return self.live_ticket(record)
+        with self.ticket_lock:
+            self.index_tickets()
+            ticket_id = self.seat_tickets.get(screening, {}).get(seat_number)
+            return None if ticket_id is None else self.tickets[self.ticket_index[ticket_id]]
+            
+    def live_ticket(self, record):
+        if record is None or record['screening_id'] not in self.screenings_by_id:
+            return None
+        return Ticket.from_record(record, self.screenings_by_id)
+        
+    def cancel_ticket(self, ticket_id):
+        cancelled = self.cancel_tickets([ticket_id])
+        return cancelled[0] if cancelled else None
+        
+    def cancel_screening(self, screening):
+        if self.data_handler.live:
+            ids = self.data_handler.screening_ticket_ids(screening.id, self.data_file)
+        else:
+            with self.ticket_lock:
+                self.index_tickets()
+                ids = list(self.seat_tickets.get(screening, {}).values())
+        return self.cancel_tickets(ids)
+        
+    def cancel_tickets(self, ticket_ids):
+        if self.data_handler.live:
+            records = self.data_handler.cancel_tickets(ticket_ids, self.data_file)
+            tickets = [ticket for ticket in map(self.live_ticket, records) if ticket]
+        else:
+            tickets = [ticket for ticket in map(self.get_ticket, ticket_ids) if ticket]
+        by_screening = {}
+        for ticket in tickets:
+            by_screening.setdefault(ticket.screening, []).append(ticket)
+        cancelled = []
+        for screening, group in by_screening.items():
+            with screening.lock:
+                if not self.data_handler.live:
+                    group = self.remove_tickets(group)
+                screening.release_seats([t.seat_number for t in group], 1)
+                screening.available_seats += len(group)
+                screening.tickets_sold -= len(group)
+                for ticket in group:
+                    self.sale_made(screening, ticket.price, -1)
+            cancelled.extend(group)
+        if cancelled and not self.data_handler.live:
+            self.mark_dirty('tickets')
+            self.record('cancel_tickets', {'ids': [t.id for t in cancelled]})
+        return cancelled
+        
+    def remove_tickets(self, tickets):
+        removed = []
+        with self.ticket_lock:
+            self.index_tickets()
+            store = self.tickets
+            for ticket in tickets:
+                position = self.ticket_index.get(ticket.id)
+                if position is None:
+                    continue
+                current = store[position]
+                if (current.screening is not ticket.screening
+                        or current.seat_number != ticket.seat_number):
+                    continue
+                del self.ticket_index[ticket.id]
+                last = swap_remove(store, position)
+                if last is not None:
+                    self.ticket_index[last.id] = position
+                del self.seat_tickets[ticket.screening][ticket.seat_number]
+                removed.append(ticket)
+        return removed
+        
+    def exchange_ticket(self, ticket_id, seat_number, screening=None):
+        ticket = self.get_ticket(ticket_id)
+        if ticket is None:
+            return None
+        source = ticket.screening
+        target = screening or source
+        if self.data_handler.live:
+            self.refresh_screening(target)
+        with contextlib.ExitStack() as stack:
+            for locked in sorted({source, target}, key=id):
+                stack.enter_context(locked.lock)
+            index = target.seat_index.get(seat_number)
+            if index is None or target.occupancy[index]:
+                return None
+            exchanged = Ticket(target, seat_number, ticket.price)
+            exchanged.id = ticket.id
+            if self.data_handler.live:
+                if not self.data_handler.exchange_ticket(exchanged.to_record(), self.data_file):
+                    return None
+            elif not self.replace_ticket(ticket, exchanged):
+                return None
+            target.occupy_seat(seat_number)
+            source.release_seats([ticket.seat_number], 1)
+            if target is not source:
+                source.available_seats += 1
+                source.tickets_sold -= 1
+                target.available_seats -= 1
+                target.tickets_sold += 1
+                self.sale_made(source, ticket.price, -1)
+                self.sale_made(target, ticket.price)
+        if not self.data_handler.live:
+            self.mark_dirty('tickets')
+            self.record('exchange_ticket', exchanged.to_record())
+        return exchanged
+        
+    def replace_ticket(self, ticket, exchanged):
+        with self.ticket_lock:
+            self.index_tickets()
+            position = self.ticket_index.get(ticket.id)
+            if position is None:
+                return False
+            self.tickets[position] = exchanged
+            del self.seat_tickets[ticket.screening][ticket.seat_number]
+            self.seat_tickets.setdefault(exchanged.screening, {})[exchanged.seat_number] = ticket.id
+        return True
+        
+    def expire_holds(self):
+        if not self.hold_heap:
+            return 0
+        now = perf_counter()
+        expired = []
+        with self.hold_lock:
+            while self.hold_heap and self.hold_heap[0][0] <= now:
+                _, hold_id = heapq.heappop(self.hold_heap)
+                hold = self.holds.pop(hold_id, None)
+                if hold is not None:
+                    expired.append(hold)
+        for hold in expired:
+            self.drop_hold(hold)
+        return len(expired)
+        
+    def open_database(self, filename='cinema_data.db', live=True):
+        handler = SQLiteDataHandler(live=live)
+        if handler.load_data(filename) is None:
+            handler.save_data(self.snapshot(), filename)
+        self.data_handler = handler
+        if self.metrics_enabled():
+            self.instrument_handler()
+        self.load_data(filename)
+        
+    def record(self, op, record):
+        if self.data_handler.append_record(op, record, self.data_file):
+            self.request_compaction()
+            
+    def request_compaction(self):
+        if self.autosaver:
+            self.autosaver.compact()
+            return
+        with self.dirty_lock:
+            if self.compactor is not None and self.compactor.is_alive():
+                return
+            self.compactor = threading.Thread(target=self.persist, args=(self.data_file, True),
+                                              daemon=True)
+            self.compactor.start()
+        
+    def snapshot(self):
+        self.assign_ids()
+        with self.ticket_lock:
+            tickets = self.tickets.copy()
+        return {
+            'version': FORMAT_VERSION,
+            'movies': [m.to_record() for m in self.movies],
+            'halls': [h.to_record() for h in self.halls],
+            'screenings': [s.to_record() for s in self.screenings],
+            'tickets': sorted((t.to_record() for t in tickets), key=lambda record: record['id'])
+        }
+        
+    def persist(self, filename, force=False):
+        if (not force and not self.is_dirty() and filename == self.data_file
+                and os.path.exists(filename)):
+            return False
+        revisions = []
+        
+        def snapshot():
+            revisions.append(self.revision)
+            return self.snapshot()
+            
+        with self.save_lock:
+            self.data_handler.save_snapshot(snapshot, filename)
+        with self.dirty_lock:
+            if revisions:
+                self.saved_revision = max(self.saved_revision, revisions[0])
+        self.data_file = filename
+        return True
+        
+    def save_data(self, filename='cinema_data.json'):
+        self.persist(filename)
+        print(f"Duomenys sėkmingai išsaugoti į {filename}")
+        
+    def load_data(self, filename='cinema_data.json'):
+        data = self.data_handler.load_data(filename)
+        if data:
+            self.data_file = filename
+            self.restore(data)
+            print(f"Duomenys sėkmingai įkelti iš {filename}")
+            
+    def restore(self, data):
+        with self.load_lock:
+            loading, self.loading = self.loading, True
+            try:
+                self.restore_entities(data)
+            finally:
+                self.loading = loading
+            with self.dirty_lock:
+                self.saved_revision = self.revision
+        self.loaded = True
+        
+    def restore_entities(self, data):
+        version = data.get('version', 1)
+        if version == 1:
+            data = migrate_legacy_data(data)
+        elif version != FORMAT_VERSION:
+            raise ValueError(f"Nepalaikoma duomenų versija: {version}")
+            
+        movies = {m['id']: self.intern_movie(Movie.from_record(m)) for m in data['movies']}
+        halls = {h['id']: CinemaHall.from_record(h) for h in data['halls']}
+        screenings = {s['id']: Screening.from_record(s, movies, halls)
+                      for s in data['screenings']
+                      if s['movie_id'] in movies and s['hall_id'] in halls}
+        tickets = (Ticket.from_record(t, screenings) for t in data['tickets']
+                   if t['screening_id'] in screenings)
+        if isinstance(self.tickets, TicketStore):
+            self.tickets = TicketStore(t for t in tickets if t.seat_number in t.screening.seat_index)
+        elif isinstance(data['tickets'], MappedTickets):
+            self.tickets = data['tickets'].bind(screenings)
+        else:
+            self.tickets = list(tickets)
+        self.movies = list(movies.values())
+        self.halls = list(halls.values())
+        self.screenings = list(screenings.values())
+        next_ids = data.get('next_ids', {})
+        for kind in ENTITY_KINDS:
+            if kind in next_ids:
+                self.next_ids[kind] = count(next_ids[kind])
+            else:
+                self.next_ids[kind] = count(max(self.entity_ids(kind), default=0) + 1)
+        with self.hold_lock:
+            self.holds.clear()
+            self.hold_heap.clear()
+        if 'occupancy' in data:
+            self.load_occupancy(data['occupancy'])
+        else:
+            self.rebuild_occupancy()
+        
+    def entity_ids(self, kind):
+        entities = getattr(self, kind)
+        if isinstance(entities, TicketStore):
+            return entities.ids
+        return (e.id for e in entities)
+        
+    def use_ticket_store(self):
+        if not isinstance(self.tickets, TicketStore):
+            self.tickets = TicketStore(self.tickets)
+        return self.tickets
+            
+    def load_occupancy(self, occupancy):
+        for screening in self.screenings:
+            seats = occupancy.get(screening.id)
+            if seats is None or len(seats) != len(screening.layout.initial):
+                screening.occupancy = bytearray(screening.layout.initial)
+            else:
+                screening.occupancy = bytearray(seats)
+            screening.recount_runs()
+            
+    def rebuild_occupancy(self):
+        for screening in self.screenings:
+            screening.occupancy = bytearray(screening.layout.initial)
+        if isinstance(self.tickets, TicketStore):
+            for screening, seat in self.tickets.seat_positions():
+                screening.occupancy[seat] = 1
+        else:
+            for ticket in self.tickets:
+                seat = ticket.screening.seat_index.get(ticket.seat_number)
+                if seat is not None:
+                    ticket.screening.occupancy[seat] = 1
+        for screening in self.screenings:
+            screening.recount_runs()
+
+
+def migrate_legacy_data(data):
+    movies, halls, screenings, tickets = {}, {}, {}, []
+    
+    def movie_id(movie):
+        record = movies.setdefault(movie['title'], dict(movie, id=len(movies) + 1))
+        return record['id']
+        
+    def hall_id(hall):
+        key = str(hall['hall_number'])
+        record = halls.setdefault(key, dict(hall, id=len(halls) + 1))
+        return record['id']
+        
+    def screening_id(screening):
+        key = (screening['movie']['title'], screening['screening_time'],
+               str(screening['hall']['hall_number']))
+        if key not in screenings:
+            screenings[key] = {
+                'id': len(screenings) + 1,
+                'movie_id': movie_id(screening['movie']),
+                'screening_time': screening['screening_time'],
+                'hall_id': hall_id(screening['hall']),
+                'available_seats': screening['available_seats'],
+                'tickets_sold': screening['tickets_sold']
+            }
+        return screenings[key]['id']
+    
+    for movie in data.get('movies', []):
+        movie_id(movie)
+    for hall in data.get('halls', []):
+        hall_id(hall)
+    for screening in data.get('screenings', []):
+        screening_id(screening)
+    for ticket in data.get('tickets', []):
+        tickets.append({
+            'id': len(tickets) + 1,
+            'screening_id': screening_id(ticket['screening']),
+            'seat_number': ticket['seat_number'],
+            'price': ticket['price']
+        })
+        
+    return {
+        'version': FORMAT_VERSION,
+        'movies': list(movies.values()),
+        'halls': list(halls.values()),
+        'screenings': list(screenings.values()),
+        'tickets': tickets
+    }
+
+
+IMPORT_KINDS = ('movie', 'hall', 'screening', 'ticket')
+
+
+def read_import_rows(filename):
+    with open(filename, newline='', encoding='utf-8') as file:
+        if os.path.splitext(filename)[1].lower() == '.csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line, text in enumerate(file, 1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except ValueError:
+                yield line, None
+
+
+def import_kind(filename):
+    name = os.path.basename(filename).lower()
+    return next((kind for kind in IMPORT_KINDS if name.startswith(kind)), None)
+
+
+def import_field(row, name, convert=None, required=True):
+    value = row.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f"Trūksta lauko: {name}")
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+    if convert is None:
+        return value
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Neteisinga lauko {name} reikšmė: {value}") from None
+
+
+def import_time(value):
+    if not isinstance(value, str) or len(value) != 16:
+        raise ValueError(value)
+    return datetime.fromisoformat(value)
+
+
+class BatchImport:
+    def __init__(self, cinema):
+        if cinema.data_handler.live:
+            raise ValueError("Masinis importas galimas tik į failų saugyklą")
+        cinema.ensure_loaded()
+        self.cinema = cinema
+        self.movies = []
+        self.halls = []
+        self.screenings = []
+        self.tickets = []
+        self.errors = []
+        self.rows = 0
+        self.titles = dict(cinema.movies_by_title)
+        self.hall_numbers = dict(cinema.halls_by_number)
+        self.schedules = {}
+        self.by_time = None
+        self.taken = set()
+        self.buffer = timedelta(minutes=cinema.cleaning_minutes)
+        
+    def read(self, filename, kind=None):
+        for line, row in read_import_rows(filename):
+            self.rows += 1
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("Neteisingas eilutės formatas")
+                row_kind = str(row.get('type') or kind or '').strip().lower()
+                if row_kind not in IMPORT_KINDS:
+                    raise ValueError(f"Nežinomas įrašo tipas: {row_kind or '-'}")
+                getattr(self, 'stage_' + row_kind)(row)
+            except ValueError as error:
+                self.errors.append((filename, line, str(error)))
+                
+    def stage_movie(self, row):
+        title = import_field(row, 'title')
+        duration = import_field(row, 'duration', int)
+        if duration <= 0:
+            raise ValueError("Trukmė turi būti teigiama")
+        if title in self.titles:
+            raise ValueError(f"Filmas jau yra: {title}")
+        movie = Movie(title, duration, import_field(row, 'genre'))
+        self.titles[title] = movie
+        self.movies.append(movie)
+        
+    def stage_hall(self, row):
+        hall_number = import_field(row, 'hall_number')
+        capacity = import_field(row, 'capacity', int)
+        if capacity <= 0:
+            raise ValueError("Vietų skaičius turi būti teigiamas")
+        if hall_key(hall_number) in self.hall_numbers:
+            raise ValueError(f"Salė jau yra: {hall_number}")
+        hall = CinemaHall(hall_number, capacity, import_field(row, 'layout', required=False))
+        self.hall_numbers[hall_key(hall_number)] = hall
+        self.halls.append(hall)
+        
+    def hall_schedule(self, key):
+        schedule = self.schedules.get(key)
+        if schedule is None:
+            schedule = self.schedules[key] = HallSchedule()
+            existing = self.cinema.schedule.halls.get(key)
+            if existing is not None:
+                schedule.times = list(existing.times)
+                schedule.items = list(existing.items)
+                schedule.ends = list(existing.ends)
+        return schedule
+        
+    def stage_screening(self, row):
+        title = import_field(row, 'movie')
+        movie = self.titles.get(title)
+        if movie is None:
+            raise ValueError(f"Filmas nerastas: {title}")
+        hall_number = import_field(row, 'hall')
+        hall = self.hall_numbers.get(hall_key(hall_number))
+        if hall is None:
+            raise ValueError(f"Salė nerasta: {hall_number}")
+        screening_time = import_field(row, 'screening_time', import_time)
+        screening = Screening(movie, screening_time, hall)
+        schedule = self.hall_schedule(hall_key(hall.hall_number))
+        if schedule.conflict(screening_time, screening_end(screening), self.buffer):
+            raise ValueError(f"Salė {hall.hall_number} tuo metu užimta")
+        schedule.add(screening_time, screening)
+        self.screening_times()[hall_key(hall.hall_number), screening_time] = screening
+        self.screenings.append(screening)
+        
+    def screening_times(self):
+        if self.by_time is None:
+            self.by_time = {(hall_key(s.hall.hall_number), s.screening_time): s
+                            for s in self.cinema.screenings}
+        return self.by_time
+        
+    def stage_ticket(self, row):
+        screening_id = import_field(row, 'screening_id', int, required=False)
+        if screening_id is not None:
+            screening = self.cinema.get_screening(screening_id)
+        else:
+            key = (hall_key(import_field(row, 'hall')),
+                   import_field(row, 'screening_time', import_time))
+            screening = self.screening_times().get(key)
+        if screening is None:
+            raise ValueError("Seansas nerastas")
+        seat_number = import_field(row, 'seat', str).upper()
+        index = screening.seat_index.get(seat_number)
+        if index is None:
+            raise ValueError(f"Nėra vietos {seat_number}")
+        if screening.occupancy[index] or (screening, index) in self.taken:
+            raise ValueError(f"Vieta {seat_number} užimta")
+        price = import_field(row, 'price', float, required=False)
+        if price is not None and price < 0:
+            raise ValueError("Kaina negali būti neigiama")
+        self.taken.add((screening, index))
+        self.tickets.append((screening, seat_number, price))
+        
+    def apply(self):
+        cinema = self.cinema
+        with cinema.load_lock, cinema.schedule_lock:
+            if cinema.catalog is None:
+                for movie in self.movies:
+                    movie.id = cinema.next_id('movies')
+            for hall in self.halls:
+                hall.id = cinema.next_id('halls')
+            for screening in self.screenings:
+                screening.id = cinema.next_id('screenings')
+            if self.movies:
+                cinema.movies = cinema.movies + self.movies
+                for screening in self.screenings:
+                    screening.movie = cinema.intern_movie(screening.movie)
+            if self.halls:
+                cinema.halls = cinema.halls + self.halls
+            if self.screenings:
+                cinema.screenings = cinema.screenings + self.screenings
+                
+            sales = {}
+            for screening, seat_number, price in self.tickets:
+                sales.setdefault(screening, []).append((seat_number, price))
+            tickets = []
+            for screening, seats in sales.items():
+                with screening.lock:
+                    for seat_number, price in seats:
+                        if price is None:
+                            price = cinema.calculate_ticket_price(screening)
+                        ticket = Ticket(screening, seat_number, price)
+                        ticket.id = cinema.next_id('tickets')
+                        tickets.append(ticket)
+                        screening.available_seats -= 1
+                        screening.tickets_sold += 1
+                        cinema.sale_made(screening, price)
+                    screening.occupy_seats([seat_number for seat_number, _ in seats])
+            if tickets:
+                cinema.store_tickets(tickets)
+                cinema.mark_dirty('tickets')
+        return {'movies': len(self.movies), 'halls': len(self.halls),
+                'screenings': len(self.screenings), 'tickets': len(tickets)}
+
+
+def import_files(cinema, filenames, kind=None, strict=False):
+    started = perf_counter()
+    batch = BatchImport(cinema)
+    for filename in filenames:
+        batch.read(filename, kind or import_kind(filename))
+    counts = dict.fromkeys(('movies', 'halls', 'screenings', 'tickets'), 0)
+    if not (strict and batch.errors):
+        counts = batch.apply()
+        if any(counts.values()):
+            cinema.persist(cinema.data_file, force=True)
+    elapsed = perf_counter() - started
+    return {
+        'rows': batch.rows,
+        'imported': counts,
+        'errors': batch.errors,
+        'seconds': elapsed,
+        'rows_per_second': batch.rows / elapsed if elapsed else 0.0
+    }
+
+
+def display_movies(cinema):
+    print("\n=== FILMŲ SĄRAŠAS ===")
+    for i, movie in enumerate(cinema.movies, 1):
+        print(f"{i}. {movie.title} ({movie.duration} min.) - {movie.genre}")
+
+def display_halls(cinema):
+    print("\n=== SALĖS ===")
+    for hall in cinema.halls:
+        print(f"Salė {hall.hall_number}: {hall.capacity} vietų")
+
+def display_screenings(cinema, day=None):
+    print("\n=== SEANSAI ===")
+    if day is None:
+        screenings = cinema.list_screenings()
+    else:
+        screenings = cinema.list_screenings(day, day + timedelta(days=1))
+        if not screenings:
+            print(f"{day:%Y-%m-%d} seansų nėra")
+    for screening, price in zip(screenings, cinema.calculate_ticket_prices(screenings)):
+        i = cinema.screening_position(screening) + 1
+        print(f"{i}. {screening.movie.title} | {screening.screening_time} | "
+              f"Salė {screening.hall.hall_number} | Kaina: {price}€ | "
+              f"Laisvos vietos: {screening.available_seats}/{screening.hall.capacity}")
+
+def display_seat_map(cinema, screening_id):
+    if screening_id < 0 or screening_id >= len(cinema.screenings):
+        print("Neteisingas seanso ID!")
+        return
+        
+    screening = cinema.screenings[screening_id]
+    cinema.expire_holds()
+    cinema.refresh_screening(screening)
+    print(render_seat_map(screening))
+
+SEAT_SYMBOLS = ("O ", "X ", "# ", "R ")
+FREE_BITS = bytes.maketrans(bytes(range(4)), b"1000")
+
+def cached_render(screening, kind, render):
+    version = screening.version
+    cached = screening.rendered.get(kind)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    value = render(screening)
+    screening.rendered[kind] = (version, value)
+    return value
+
+def render_seat_map(screening):
+    return cached_render(screening, 'text', build_seat_map)
+
+def build_seat_map(screening):
+    layout = screening.layout
+    occupancy = bytes(screening.occupancy)
+    accessible = layout.accessible
+    label_width = len(row_label(len(layout.cells) - 1)) if layout.cells else 1
+    lines = [f"\n=== SALĖS {screening.hall.hall_number} PLANAS ===",
+             f"Filmas: {screening.movie.title}",
+             f"Laikas: {screening.screening_time}",
+             "",
+             " " * (label_width + 1) + " ".join(f"{i:2}" for i in range(1, layout.width + 1))]
+    for row, cells in enumerate(layout.cells):
+        lines.append(f"{row_label(row):<{label_width}}: " + "".join(
+            "  " if index is None else
+            "H " if not occupancy[index] and index in accessible else
+            SEAT_SYMBOLS[occupancy[index]]
+            for index in cells))
+    legend = "O - laisva, X - užimta, R - rezervuota"
+    if HallLayout.BLOCKED_SEAT in layout.initial:
+        legend += ", # - neparduodama"
+    if accessible:
+        legend += ", H - neįgaliesiems"
+    lines.extend(("", legend))
+    return "\n".join(lines)
+
+def packed_seat_map(screening):
+    return cached_render(screening, 'packed', pack_seat_map)
+
+def pack_seat_map(screening):
+    bits = bytes(screening.occupancy).translate(FREE_BITS)
+    if not bits:
+        return ""
+    bits += b"0" * (-len(bits) % 8)
+    return base64.b64encode(int(bits, 2).to_bytes(len(bits) // 8, 'big')).decode('ascii')
+
+def unpack_seat_map(packed, seats):
+    data = base64.b64decode(packed)
+    return [bool(data[i >> 3] & (0x80 >> (i & 7))) for i in range(seats)]
+
+REPORT_TITLES = {'movie': "Filmas", 'hall': "Salė", 'day': "Diena", 'hour': "Valanda"}
+
+def display_report(analytics, dimension='movie', top=5):
+    print(f"\n=== PARDAVIMAI PAGAL: {REPORT_TITLES[dimension].upper()} ===")
+    for row in analytics.group(dimension):
+        print(f"{REPORT_TITLES[dimension]} {row[dimension]} | Seansai: {row['screenings']} | "
+              f"Bilietai: {row['tickets']} | Pajamos: {row['revenue']:.2f}€ | "
+              f"Užimtumas: {row['occupancy']:.1%}")
+    if top:
+        print(f"\n=== {top} PELNINGIAUSI SEANSAI ===")
+        for row in analytics.top_screenings(top):
+            print(f"{row['movie']} | {row['screening_time']} | Salė {row['hall']} | "
+                  f"Bilietai: {row['tickets']} | Pajamos: {row['revenue']:.2f}€")
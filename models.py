@@ -0,0 +1,586 @@
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import count
+from math import isqrt
+
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def hall_key(hall_number):
+    return str(hall_number).strip()
+
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Movie:
+    __slots__ = ('__title', '__duration', '__genre', 'id')
+    
+    def __init__(self, title, duration, genre):
+        self.__title = intern_text(title)
+        self.__duration = duration
+        self.__genre = intern_text(genre)
+        self.id = None
+        
+    @property
+    def title(self):
+        return self.__title
+        
+    @title.setter
+    def title(self, value):
+        if not value:
+            raise ValueError("Pavadinimas negali būti tuščias")
+        self.__title = intern_text(value)
+        
+    @property
+    def duration(self):
+        return self.__duration
+        
+    @duration.setter
+    def duration(self, value):
+        if value <= 0:
+            raise ValueError("Trukmė turi būti teigiamas skaičius")
+        self.__duration = value
+        
+    @property
+    def genre(self):
+        return self.__genre
+        
+    @genre.setter
+    def genre(self, value):
+        self.__genre = intern_text(value)
+        
+    def to_dict(self):
+        return {
+            'title': self.__title,
+            'duration': self.__duration,
+            'genre': self.__genre
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['title'], data['duration'], data['genre'])
+        
+    def to_record(self):
+        return dict(self.to_dict(), id=self.id)
+        
+    @classmethod
+    def from_record(cls, data):
+        movie = cls.from_dict(data)
+        movie.id = data['id']
+        return movie
+
+
+def row_label(row):
+    label = ""
+    row += 1
+    while row:
+        row, letter = divmod(row - 1, 26)
+        label = chr(ord('A') + letter) + label
+    return label
+
+
+TAKEN_SEATS = bytes([0]) + bytes([1]) * 255
+
+
+def longest_free_run(seats):
+    return max(map(len, seats.translate(TAKEN_SEATS).split(b'\x01')))
+
+
+class HallLayout:
+    SEAT = 'O'
+    ACCESSIBLE = 'H'
+    BLOCKED = 'X'
+    GAPS = '. '
+    BLOCKED_SEAT = 2
+    HELD_SEAT = 3
+    
+    def __init__(self, rows, default=False):
+        self.rows = tuple(rows)
+        self.default = default
+        codes, cells, columns, initial, accessible = [], [], [], bytearray(), set()
+        blocks, block_rows = [], []
+        for row, spec in enumerate(self.rows):
+            label = row_label(row)
+            row_cells = []
+            seat_number = 0
+            block_start = None
+            for column, char in enumerate(spec + self.GAPS[0]):
+                if char in self.GAPS:
+                    if block_start is not None:
+                        blocks.append((block_start, len(codes)))
+                        block_rows.append(row)
+                        block_start = None
+                    row_cells.append(None)
+                    continue
+                if char not in (self.SEAT, self.ACCESSIBLE, self.BLOCKED):
+                    raise ValueError(f"Neteisingas salės plano simbolis: {char}")
+                if block_start is None:
+                    block_start = len(codes)
+                if char == self.ACCESSIBLE:
+                    accessible.add(len(codes))
+                initial.append(self.BLOCKED_SEAT if char == self.BLOCKED else 0)
+                seat_number += 1
+                row_cells.append(len(codes))
+                columns.append(column)
+                codes.append(f"{label}{seat_number}")
+            cells.append(tuple(row_cells[:-1]))
+            
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.cells = tuple(cells)
+        self.initial = bytes(initial)
+        self.accessible = frozenset(accessible)
+        self.capacity = initial.count(0)
+        self.width = max((len(row_cells) for row_cells in cells), default=0)
+        self.blocks = tuple(blocks)
+        self.initial_runs = tuple(longest_free_run(self.initial[first:last])
+                                  for first, last in blocks)
+        self.seat_blocks = tuple(block for block, (first, last) in enumerate(blocks)
+                                 for _ in range(first, last))
+        middle = (len(cells) - 1) / 2
+        
+        def preference(block):
+            first, last = blocks[block]
+            row = block_rows[block]
+            centre = (len(cells[row]) - 1) / 2
+            return abs(row - middle), abs((columns[first] + columns[last - 1]) / 2 - centre)
+            
+        self.block_order = tuple(sorted(range(len(blocks)), key=preference))
+        
+    @classmethod
+    @lru_cache(maxsize=None)
+    def default_for(cls, capacity):
+        width = 10 if capacity <= 100 else isqrt(capacity - 1) + 1
+        full_rows, rest = divmod(capacity, width)
+        rows = [cls.SEAT * width] * full_rows + ([cls.SEAT * rest] if rest else [])
+        return cls(rows, default=True)
+        
+    @classmethod
+    def parse(cls, rows):
+        if isinstance(rows, cls):
+            return rows
+        if isinstance(rows, str):
+            rows = rows.replace('\n', '/').split('/')
+        return cls.cached(tuple(row.upper() for row in rows))
+        
+    @classmethod
+    @lru_cache(maxsize=None)
+    def cached(cls, rows):
+        return cls(rows)
+
+
+class CinemaHall:
+    __slots__ = ('hall_number', 'capacity', 'id', 'layout')
+    
+    def __init__(self, hall_number, capacity, layout=None):
+        self.hall_number = intern_text(hall_number)
+        self.capacity = capacity
+        self.id = None
+        if layout:
+            self.layout = HallLayout.parse(layout)
+            if self.layout.capacity != capacity:
+                raise ValueError(f"Salės plane yra {self.layout.capacity} vietų, o ne {capacity}")
+        else:
+            self.layout = HallLayout.default_for(capacity)
+        
+    def to_dict(self):
+        data = {
+            'hall_number': self.hall_number,
+            'capacity': self.capacity
+        }
+        if not self.layout.default:
+            data['layout'] = list(self.layout.rows)
+        return data
+        
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['hall_number'], data['capacity'], data.get('layout'))
+        
+    def to_record(self):
+        return dict(self.to_dict(), id=self.id)
+        
+    @classmethod
+    def from_record(cls, data):
+        hall = cls.from_dict(data)
+        hall.id = data['id']
+        return hall
+
+
+class Screening:
+    __slots__ = ('movie', 'screening_time', 'hall', 'available_seats', 'tickets_sold', 'id',
+                 'layout', 'seat_codes', 'seat_index', 'lock', 'occupancy', 'free_runs', 'holds',
+                 'version', 'rendered')
+    
+    def __init__(self, movie, screening_time, hall):
+        self.movie = movie  
+        self.screening_time = screening_time
+        self.hall = hall
+        self.available_seats = hall.capacity
+        self.tickets_sold = 0
+        self.id = None
+        self.layout = hall.layout
+        self.seat_codes, self.seat_index = self.layout.codes, self.layout.index
+        self.lock = threading.Lock()
+        self.holds = set()
+        self.version = 0
+        self.rendered = {}
+        self.reset_occupancy()
+        
+    def reset_occupancy(self):
+        self.occupancy = bytearray(self.layout.initial)
+        self.free_runs = list(self.layout.initial_runs)
+        self.version += 1
+        
+    def recount_runs(self):
+        self.free_runs = [self.longest_run(*block) for block in self.layout.blocks]
+        self.version += 1
+        
+    def is_seat_free(self, seat_number):
+        index = self.seat_index.get(seat_number)
+        return index is not None and not self.occupancy[index]
+        
+    def occupy_seat(self, seat_number):
+        index = self.seat_index[seat_number]
+        self.occupancy[index] = 1
+        block = self.layout.seat_blocks[index]
+        self.free_runs[block] = self.longest_run(*self.layout.blocks[block])
+        self.version += 1
+        
+    def occupy_seats(self, seat_numbers, state=1):
+        blocks = set()
+        for seat_number in seat_numbers:
+            index = self.seat_index[seat_number]
+            self.occupancy[index] = state
+            blocks.add(self.layout.seat_blocks[index])
+        for block in blocks:
+            self.free_runs[block] = self.longest_run(*self.layout.blocks[block])
+        self.version += 1
+            
+    def release_seats(self, seat_numbers, state=HallLayout.HELD_SEAT):
+        blocks = set()
+        for seat_number in seat_numbers:
+            index = self.seat_index[seat_number]
+            if self.occupancy[index] == state:
+                self.occupancy[index] = 0
+                blocks.add(self.layout.seat_blocks[index])
+        for block in blocks:
+            self.free_runs[block] = self.longest_run(*self.layout.blocks[block])
+        self.version += 1
+        
+    def longest_run(self, start, end):
+        return longest_free_run(self.occupancy[start:end])
+        
+    def find_block(self, party_size):
+        for block in self.layout.block_order:
+            if self.free_runs[block] < party_size:
+                continue
+            start, end = self.layout.blocks[block]
+            centre = (start + end - 1) / 2
+            best = None
+            run_start = None
+            for index in range(start, end + 1):
+                if index < end and not self.occupancy[index]:
+                    if run_start is None:
+                        run_start = index
+                    continue
+                if run_start is not None and index - run_start >= party_size:
+                    first = round(centre - (party_size - 1) / 2)
+                    first = min(max(first, run_start), index - party_size)
+                    distance = abs(first + (party_size - 1) / 2 - centre)
+                    if best is None or distance < best[0]:
+                        best = (distance, first)
+                run_start = None
+            return [self.seat_codes[i] for i in range(best[1], best[1] + party_size)]
+        return None
+        
+    def fill_rows(self, party_size):
+        seats = []
+        for block in self.layout.block_order:
+            start, end = self.layout.blocks[block]
+            seats.extend(self.seat_codes[i] for i in range(start, end) if not self.occupancy[i])
+            if len(seats) >= party_size:
+                return seats[:party_size]
+        return None
+        
+    def free_seats(self):
+        return [code for code, taken in zip(self.seat_codes, self.occupancy)
+                if not taken]
+        
+    def to_dict(self):
+        return {
+            'movie': self.movie.to_dict(),
+            'screening_time': self.screening_time.strftime(TIME_FORMAT),
+            'hall': self.hall.to_dict(),
+            'available_seats': self.available_seats,
+            'tickets_sold': self.tickets_sold
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        movie = Movie.from_dict(data['movie'])
+        hall = CinemaHall.from_dict(data['hall'])
+        screening_time = datetime.strptime(data['screening_time'], TIME_FORMAT)
+        screening = cls(movie, screening_time, hall)
+        screening.available_seats = data['available_seats']
+        screening.tickets_sold = data['tickets_sold']
+        return screening
+        
+    def to_record(self):
+        return {
+            'id': self.id,
+            'movie_id': self.movie.id,
+            'screening_time': self.screening_time.strftime(TIME_FORMAT),
+            'hall_id': self.hall.id,
+            'available_seats': self.available_seats,
+            'tickets_sold': self.tickets_sold
+        }
+        
+    @classmethod
+    def from_record(cls, data, movies, halls):
+        screening_time = data['screening_time']
+        if isinstance(screening_time, str):
+            screening_time = datetime.strptime(screening_time, TIME_FORMAT)
+        screening = cls(movies[data['movie_id']], screening_time, halls[data['hall_id']])
+        screening.id = data['id']
+        screening.available_seats = data['available_seats']
+        screening.tickets_sold = data['tickets_sold']
+        return screening
+
+
+def screening_end(screening):
+    return screening.screening_time + timedelta(minutes=screening.movie.duration)
+
+
+class TimeIndex:
+    def __init__(self):
+        self.times = []
+        self.items = []
+        
+    def __len__(self):
+        return len(self.items)
+        
+    def add(self, when, item):
+        position = bisect_right(self.times, when)
+        self.times.insert(position, when)
+        self.items.insert(position, item)
+        return position
+        
+    def between(self, start=None, end=None):
+        low = 0 if start is None else bisect_left(self.times, start)
+        high = len(self.times) if end is None else bisect_left(self.times, end)
+        return self.items[low:high]
+
+
+class HallSchedule(TimeIndex):
+    def __init__(self):
+        super().__init__()
+        self.ends = []
+        
+    def add(self, when, item, end=None):
+        position = super().add(when, item)
+        self.ends.insert(position, end or screening_end(item))
+        return position
+        
+    def conflict(self, start, end, buffer=timedelta(0)):
+        position = bisect_right(self.times, start)
+        if position > 0 and self.ends[position - 1] + buffer > start:
+            return self.items[position - 1]
+        if position < len(self.times) and self.times[position] < end + buffer:
+            return self.items[position]
+        return None
+
+
+class ScreeningSchedule:
+    def __init__(self, screenings=()):
+        self.all = TimeIndex()
+        self.halls = {}
+        self.movies = {}
+        for screening in sorted(screenings, key=lambda s: s.screening_time):
+            self.add(screening)
+            
+    def add(self, screening):
+        when = screening.screening_time
+        self.all.add(when, screening)
+        self.halls.setdefault(hall_key(screening.hall.hall_number), HallSchedule()).add(when, screening)
+        self.movies.setdefault(screening.movie.title, TimeIndex()).add(when, screening)
+        
+    def conflict(self, hall_number, start, end, buffer=timedelta(0)):
+        schedule = self.halls.get(hall_key(hall_number))
+        return schedule.conflict(start, end, buffer) if schedule else None
+        
+    def find(self, start=None, end=None, hall_number=None, movie_title=None):
+        if hall_number is not None:
+            index = self.halls.get(hall_key(hall_number))
+        elif movie_title is not None:
+            index = self.movies.get(movie_title)
+        else:
+            index = self.all
+        if index is None:
+            return []
+        screenings = index.between(start, end)
+        if hall_number is not None and movie_title is not None:
+            screenings = [s for s in screenings if s.movie.title == movie_title]
+        return screenings
+
+
+class Ticket:
+    __slots__ = ('screening', 'seat_number', 'price', 'id')
+    
+    def __init__(self, screening, seat_number, price):
+        self.screening = screening  
+        self.seat_number = intern_text(seat_number)
+        self.price = price
+        self.id = None
+        
+    def to_dict(self):
+        return {
+            'screening': self.screening.to_dict(),
+            'seat_number': self.seat_number,
+            'price': self.price
+        }
+        
+    @classmethod
+    def from_dict(cls, data):
+        screening = Screening.from_dict(data['screening'])
+        return cls(screening, data['seat_number'], data['price'])
+        
+    def to_record(self):
+        return {
+            'id': self.id,
+            'screening_id': self.screening.id,
+            'seat_number': self.seat_number,
+            'price': self.price
+        }
+        
+    @classmethod
+    def from_record(cls, data, screenings):
+        ticket = cls(screenings[data['screening_id']], data['seat_number'], data['price'])
+        ticket.id = data['id']
+        return ticket
+
+
+class TicketStore:
+    def __init__(self, tickets=()):
+        self.screenings = []
+        self.screening_numbers = {}
+        self.prices = []
+        self.price_numbers = {}
+        self.screening_column = array('I')
+        self.seat_column = array('H')
+        self.price_column = array('H')
+        self.ids = array('q')
+        self.lock = threading.Lock()
+        self.extend(tickets)
+        
+    def __len__(self):
+        return len(self.ids)
+        
+    def __iter__(self):
+        for position in range(len(self.ids)):
+            yield self.view(position)
+            
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.view(i) for i in range(*position.indices(len(self.ids)))]
+        if position < 0:
+            position += len(self.ids)
+        if not 0 <= position < len(self.ids):
+            raise IndexError("bilieto indeksas už ribų")
+        return self.view(position)
+        
+    def __setitem__(self, position, ticket):
+        with self.lock:
+            self.screening_column[position] = self.number(self.screenings, self.screening_numbers,
+                                                          ticket.screening)
+            self.seat_column[position] = ticket.screening.seat_index[ticket.seat_number]
+            self.price_column[position] = self.number(self.prices, self.price_numbers,
+                                                      (type(ticket.price), ticket.price))
+            self.ids[position] = ticket.id
+            
+    def pop(self):
+        with self.lock:
+            if not self.ids:
+                raise IndexError("bilietų saugykla tuščia")
+            ticket = self.view(len(self.ids) - 1)
+            for column in (self.screening_column, self.seat_column, self.price_column, self.ids):
+                column.pop()
+            return ticket
+        
+    def copy(self):
+        with self.lock:
+            store = TicketStore()
+            store.screenings = list(self.screenings)
+            store.screening_numbers = dict(self.screening_numbers)
+            store.prices = list(self.prices)
+            store.price_numbers = dict(self.price_numbers)
+            for name in ('screening_column', 'seat_column', 'price_column', 'ids'):
+                setattr(store, name, getattr(self, name)[:])
+            return store
+        
+    def view(self, position):
+        screening = self.screenings[self.screening_column[position]]
+        ticket = Ticket(screening, screening.seat_codes[self.seat_column[position]],
+                        self.prices[self.price_column[position]][1])
+        ticket.id = self.ids[position]
+        return ticket
+        
+    def number(self, table, numbers, value):
+        number = numbers.get(value)
+        if number is None:
+            number = numbers[value] = len(table)
+            table.append(value)
+        return number
+        
+    def add(self, screening, seat_number, price, ticket_id):
+        with self.lock:
+            self.screening_column.append(
+                self.number(self.screenings, self.screening_numbers, screening))
+            self.seat_column.append(screening.seat_index[seat_number])
+            self.price_column.append(
+                self.number(self.prices, self.price_numbers, (type(price), price)))
+            self.ids.append(ticket_id)
+            
+    def append(self, ticket):
+        self.add(ticket.screening, ticket.seat_number, ticket.price, ticket.id)
+        
+    def extend(self, tickets):
+        for ticket in tickets:
+            self.append(ticket)
+            
+    def seat_positions(self):
+        screenings = self.screenings
+        for screening_number, seat in zip(self.screening_column, self.seat_column):
+            yield screenings[screening_number], seat
+            
+    def seat_ids(self):
+        screenings = self.screenings
+        for screening_number, seat, ticket_id in zip(self.screening_column, self.seat_column,
+                                                     self.ids):
+            screening = screenings[screening_number]
+            yield screening, screening.seat_codes[seat], ticket_id
+
+
+class MovieCatalog:
+    def __init__(self):
+        self.movies = {}
+        self.ids = count(1)
+        self.lock = threading.Lock()
+        
+    def __len__(self):
+        return len(self.movies)
+        
+    def intern(self, movie):
+        key = (movie.title, movie.duration, movie.genre)
+        with self.lock:
+            shared = self.movies.get(key)
+            if shared is None:
+                shared = self.movies[key] = movie
+                movie.id = next(self.ids)
+            return shared
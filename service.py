@@ -0,0 +1,443 @@
+import asyncio
+import json
+import random
+import re
+import urllib.parse
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from models import TIME_FORMAT
+from main import Metrics, packed_seat_map, render_seat_map
+
+
+HTTP_REASONS = {
+    200: 'OK',
+    201: 'Created',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    410: 'Gone',
+    500: 'Internal Server Error'
+}
+
+
+def http_response(status, payload, keep_alive=True):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        content_type = "application/json; charset=utf-8"
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def read_http_message(reader):
+    start_line = await reader.readline()
+    if not start_line:
+        return None, None, None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return start_line.decode('latin-1').strip(), headers, body
+
+
+def screening_info(cinema, screening, price=None):
+    return {
+        'index': cinema.screening_position(screening),
+        'id': screening.id,
+        'movie': screening.movie.title,
+        'screening_time': screening.screening_time.strftime(TIME_FORMAT),
+        'hall': screening.hall.hall_number,
+        'price': cinema.calculate_ticket_price(screening) if price is None else price,
+        'available_seats': screening.available_seats,
+        'capacity': screening.hall.capacity
+    }
+
+
+def ticket_info(ticket):
+    return {
+        'id': ticket.id,
+        'screening': ticket.screening.id,
+        'movie': ticket.screening.movie.title,
+        'screening_time': ticket.screening.screening_time.strftime(TIME_FORMAT),
+        'seat': ticket.seat_number,
+        'price': ticket.price
+    }
+
+
+class BookingService:
+    def __init__(self, cinema, autosave=True):
+        self.cinema = cinema
+        self.autosave = autosave
+        self.save_lock = asyncio.Lock()
+        self.save_pending = False
+        self.save_task = None
+        self.routes = [
+            ('GET', re.compile(r'/screenings$'), self.list_screenings),
+            ('POST', re.compile(r'/screenings$'), self.add_screening),
+            ('GET', re.compile(r'/screenings/(\d+)/seats$'), self.seat_map),
+            ('POST', re.compile(r'/screenings/(\d+)/tickets$'), self.buy_ticket),
+            ('GET', re.compile(r'/analytics/(movie|hall|day|hour|top)$'), self.analytics),
+            ('POST', re.compile(r'/screenings/(\d+)/holds$'), self.hold_seats),
+            ('POST', re.compile(r'/holds/(\d+)/confirm$'), self.confirm_hold),
+            ('DELETE', re.compile(r'/holds/(\d+)$'), self.release_hold),
+            ('GET', re.compile(r'/tickets/(\d+)$'), self.get_ticket),
+            ('DELETE', re.compile(r'/tickets/(\d+)$'), self.cancel_ticket),
+            ('POST', re.compile(r'/tickets/(\d+)/exchange$'), self.exchange_ticket),
+            ('DELETE', re.compile(r'/screenings/(\d+)/tickets$'), self.cancel_screening),
+            ('GET', re.compile(r'/metrics$'), self.metrics),
+            ('POST', re.compile(r'/save$'), self.save)
+        ]
+        
+    async def start(self, host='127.0.0.1', port=8080):
+        return await asyncio.start_server(self.handle_connection, host, port)
+        
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line, headers, body = await read_http_message(reader)
+                if request_line is None:
+                    break
+                method, path, _ = request_line.split(' ', 2)
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+            
+    async def dispatch(self, method, path, body):
+        path, _, query = path.partition('?')
+        status = 404, {'error': "Nerastas adresas"}
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            if route_method != method:
+                status = 405, {'error': "Neleistinas metodas"}
+                continue
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                return 400, {'error': "Neteisingas JSON"}
+            if not isinstance(data, dict):
+                return 400, {'error': "Neteisingas JSON"}
+            if query:
+                data.update(urllib.parse.parse_qsl(query))
+            try:
+                return await handler(data, *match.groups())
+            except Exception as error:
+                return 500, {'error': f"Vidinė serverio klaida: {error}"}
+        return status
+        
+    async def list_screenings(self, data):
+        try:
+            start = end = None
+            if data.get('date'):
+                start = datetime.strptime(data['date'], "%Y-%m-%d")
+                end = start + timedelta(days=1)
+            if data.get('from'):
+                start = datetime.strptime(data['from'], TIME_FORMAT)
+            if data.get('to'):
+                end = datetime.strptime(data['to'], TIME_FORMAT)
+        except ValueError:
+            return 400, {'error': "Neteisingas datos formatas"}
+        screenings = self.cinema.list_screenings(start, end, data.get('hall'), data.get('movie'))
+        prices = self.cinema.calculate_ticket_prices(screenings)
+        return 200, [screening_info(self.cinema, s, p) for s, p in zip(screenings, prices)]
+        
+    async def seat_map(self, data, screening_id):
+        screening = self.cinema.get_screening(int(screening_id))
+        if screening is None:
+            return 404, {'error': "Neteisingas seanso ID"}
+        if data.get('format') == 'text':
+            self.cinema.expire_holds()
+            self.cinema.refresh_screening(screening)
+            return 200, render_seat_map(screening)
+        if data.get('format') == 'packed':
+            self.cinema.expire_holds()
+            self.cinema.refresh_screening(screening)
+            return 200, {
+                'id': screening.id,
+                'layout': list(screening.layout.rows),
+                'seats': len(screening.seat_codes),
+                'free': packed_seat_map(screening)
+            }
+        return 200, {
+            'id': screening.id,
+            'capacity': screening.hall.capacity,
+            'layout': list(screening.layout.rows),
+            'available': self.cinema.get_available_seats(screening)
+        }
+        
+    async def buy_ticket(self, data, screening_id):
+        screening = self.cinema.get_screening(int(screening_id))
+        if screening is None:
+            return 404, {'error': "Neteisingas seanso ID"}
+        if 'seats' in data or 'party_size' in data:
+            return await self.buy_tickets(data, screening)
+        ticket = self.cinema.book_seat(screening, str(data.get('seat', '')).upper())
+        if ticket is None:
+            return 409, {'error': "Vieta užimta arba neteisinga"}
+        self.schedule_save()
+        return 201, {
+            'id': ticket.id,
+            'movie': ticket.screening.movie.title,
+            'seat': ticket.seat_number,
+            'price': ticket.price
+        }
+        
+    async def buy_tickets(self, data, screening):
+        seats = data.get('seats')
+        if seats is not None and not isinstance(seats, list):
+            return 400, {'error': "Neteisingas vietų sąrašas"}
+        if seats is not None:
+            seats = [str(seat).upper() for seat in seats]
+        try:
+            party_size = int(data.get('party_size') or 0)
+        except (TypeError, ValueError):
+            return 400, {'error': "Neteisingas žmonių skaičius"}
+        tickets = self.cinema.book_seats(screening, seats=seats, party_size=party_size,
+                                         split=bool(data.get('split')))
+        if not tickets:
+            return 409, {'error': "Vietos užimtos arba neteisingos"}
+        self.schedule_save()
+        return 201, {
+            'ids': [t.id for t in tickets],
+            'movie': tickets[0].screening.movie.title,
+            'seats': [t.seat_number for t in tickets],
+            'price': tickets[0].price,
+            'total': sum(t.price for t in tickets)
+        }
+        
+    async def add_screening(self, data):
+        try:
+            screening_time = datetime.strptime(data['screening_time'], TIME_FORMAT)
+        except (KeyError, TypeError, ValueError):
+            return 400, {'error': "Neteisingas datos formatas! Naudokite YYYY-MM-DD HH:MM"}
+        if (not self.cinema.get_movie(data.get('movie_title'))
+                or not self.cinema.get_hall(data.get('hall_number'))):
+            return 400, {'error': "Filmas arba salė nerasta"}
+        screening = self.cinema.add_screening(
+            data.get('movie_title'), screening_time, data.get('hall_number'))
+        if screening is None:
+            return 409, {'error': "Salė tuo metu užimta"}
+        self.schedule_save()
+        return 201, screening_info(self.cinema, screening)
+        
+    async def analytics(self, data, dimension):
+        analytics = self.cinema.enable_analytics()
+        try:
+            if dimension == 'top':
+                return 200, analytics.top_screenings(int(data.get('limit', 10)),
+                                                     data.get('by', 'revenue'))
+            return 200, analytics.group(dimension)
+        except ValueError as error:
+            return 400, {'error': str(error)}
+        
+    async def hold_seats(self, data, screening_id):
+        screening = self.cinema.get_screening(int(screening_id))
+        if screening is None:
+            return 404, {'error': "Neteisingas seanso ID"}
+        seats = data.get('seats')
+        if 'seat' in data:
+            seats = [data['seat']]
+        if seats is not None and not isinstance(seats, list):
+            return 400, {'error': "Neteisingas vietų sąrašas"}
+        if seats is not None:
+            seats = [str(seat).upper() for seat in seats]
+        try:
+            party_size = int(data.get('party_size') or 0)
+            ttl = float(data['ttl']) if 'ttl' in data else None
+        except (TypeError, ValueError):
+            return 400, {'error': "Neteisingi rezervacijos parametrai"}
+        if ttl is not None and not ttl > 0:
+            return 400, {'error': "Rezervacijos trukmė turi būti teigiama"}
+        hold = self.cinema.hold_seats(screening, seats=seats, party_size=party_size,
+                                      split=bool(data.get('split')), ttl=ttl)
+        if hold is None:
+            return 409, {'error': "Vietos užimtos arba neteisingos"}
+        return 201, {'id': hold.id, 'seats': list(hold.seats), 'expires_in': hold.remaining()}
+        
+    async def confirm_hold(self, data, hold_id):
+        tickets = self.cinema.confirm_hold(int(hold_id))
+        if not tickets:
+            return 410, {'error': "Rezervacija nebegalioja"}
+        self.schedule_save()
+        return 201, {
+            'ids': [t.id for t in tickets],
+            'movie': tickets[0].screening.movie.title,
+            'seats': [t.seat_number for t in tickets],
+            'price': tickets[0].price,
+            'total': sum(t.price for t in tickets)
+        }
+        
+    async def release_hold(self, data, hold_id):
+        if not self.cinema.release_hold(int(hold_id)):
+            return 404, {'error': "Rezervacija nerasta"}
+        return 200, {'released': int(hold_id)}
+        
+    async def get_ticket(self, data, ticket_id):
+        ticket = self.cinema.get_ticket(int(ticket_id))
+        if ticket is None:
+            return 404, {'error': "Bilietas nerastas"}
+        return 200, ticket_info(ticket)
+        
+    async def cancel_ticket(self, data, ticket_id):
+        ticket = self.cinema.cancel_ticket(int(ticket_id))
+        if ticket is None:
+            return 404, {'error': "Bilietas nerastas"}
+        self.schedule_save()
+        return 200, {'cancelled': ticket.id, 'refund': ticket.price}
+        
+    async def exchange_ticket(self, data, ticket_id):
+        screening = None
+        if data.get('screening') is not None:
+            try:
+                screening = self.cinema.get_screening(int(data['screening']))
+            except (TypeError, ValueError):
+                pass
+            if screening is None:
+                return 404, {'error': "Neteisingas seanso ID"}
+        ticket = self.cinema.exchange_ticket(int(ticket_id), str(data.get('seat', '')).upper(),
+                                             screening)
+        if ticket is None:
+            if self.cinema.get_ticket(int(ticket_id)) is None:
+                return 404, {'error': "Bilietas nerastas"}
+            return 409, {'error': "Vieta užimta arba neteisinga"}
+        self.schedule_save()
+        return 200, ticket_info(ticket)
+        
+    async def cancel_screening(self, data, screening_id):
+        screening = self.cinema.get_screening(int(screening_id))
+        if screening is None:
+            return 404, {'error': "Neteisingas seanso ID"}
+        tickets = self.cinema.cancel_screening(screening)
+        if tickets:
+            self.schedule_save()
+        return 200, {'cancelled': [t.id for t in tickets],
+                     'refund': sum(t.price for t in tickets)}
+        
+    async def metrics(self, data):
+        metrics = self.cinema.metrics or Metrics()
+        if data.get('format') == 'json':
+            return 200, metrics.snapshot()
+        return 200, metrics.to_prometheus()
+        
+    async def save(self, data):
+        await self.save_now()
+        return 200, {'saved': self.cinema.data_file}
+        
+    def schedule_save(self):
+        if self.autosave and not self.save_pending:
+            self.save_pending = True
+            self.save_task = asyncio.get_running_loop().create_task(self.save_now())
+            
+    async def save_now(self):
+        async with self.save_lock:
+            self.save_pending = False
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.cinema.persist, self.cinema.data_file)
+
+
+async def serve(cinema, host, port):
+    service = BookingService(cinema)
+    server = await service.start(host, port)
+    print(f"Paslauga veikia adresu http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+async def http_request(reader, writer, method, path, payload=None):
+    body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status_line, headers, body = await read_http_message(reader)
+    if not headers.get('content-type', '').startswith('application/json'):
+        return int(status_line.split()[1]), body.decode('utf-8')
+    return int(status_line.split()[1]), json.loads(body) if body else None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load_test(host, port, requests=1000, concurrency=10, seed=0):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, screenings = await http_request(reader, writer, 'GET', '/screenings')
+    seats = []
+    for screening in screenings:
+        _, seat_map = await http_request(reader, writer, 'GET',
+                                         f"/screenings/{screening['id']}/seats")
+        seats.append(seat_map['available'] or ['A1'])
+    writer.close()
+    
+    latencies = []
+    statuses = {}
+    remaining = iter(range(requests))
+    
+    async def client(number):
+        rng = random.Random(seed + number)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in remaining:
+                index = rng.randrange(len(screenings)) if screenings else 0
+                choice = rng.random()
+                if not screenings or choice < 0.2:
+                    request = ('GET', '/screenings', None)
+                elif choice < 0.6:
+                    request = ('GET', f"/screenings/{screenings[index]['id']}/seats", None)
+                else:
+                    request = ('POST', f"/screenings/{screenings[index]['id']}/tickets",
+                               {'seat': rng.choice(seats[index])})
+                started = perf_counter()
+                status, _ = await http_request(reader, writer, *request)
+                latencies.append(perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+            
+    started = perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'statuses': statuses
+    }
+
+
+async def load_test(cinema, host, port, requests, concurrency):
+    server = None
+    if port is None:
+        server = await BookingService(cinema, autosave=False).start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+    try:
+        return await run_load_test(host, port, requests, concurrency)
+    finally:
+        if server:
+            server.close()
+            await server.wait_closed()
@@ -0,0 +1,371 @@
+import contextlib
+import heapq
+import io
+import multiprocessing
+import os
+import threading
+from datetime import timedelta
+from itertools import count
+
+from models import hall_key
+from main import FORMAT_VERSION, CinemaManager, JSONDataHandler, packed_seat_map, render_seat_map
+from service import screening_info
+
+
+def shard_filename(data_file, shard):
+    root, extension = os.path.splitext(data_file)
+    return f"{root}.shard{shard}{extension or '.json'}"
+
+
+def split_snapshot(data, workers):
+    load = {hall['id']: 0 for hall in data['halls']}
+    for screening in data['screenings']:
+        if screening['hall_id'] in load:
+            load[screening['hall_id']] += 1
+    heap = [(0, shard) for shard in range(workers)]
+    owners = {}
+    for hall_id in sorted(load, key=lambda hall_id: -load[hall_id]):
+        total, shard = heapq.heappop(heap)
+        owners[hall_id] = shard
+        heapq.heappush(heap, (total + load[hall_id], shard))
+        
+    shards = [{'version': FORMAT_VERSION, 'movies': data['movies'], 'halls': [],
+               'screenings': [], 'tickets': []} for _ in range(workers)]
+    for hall in data['halls']:
+        shards[owners[hall['id']]]['halls'].append(hall)
+    screening_owners = {}
+    for screening in data['screenings']:
+        if screening['hall_id'] in owners:
+            screening_owners[screening['id']] = owners[screening['hall_id']]
+            shards[owners[screening['hall_id']]]['screenings'].append(screening)
+    for ticket in data['tickets']:
+        if ticket['screening_id'] in screening_owners:
+            shards[screening_owners[ticket['screening_id']]]['tickets'].append(ticket)
+    return shards
+
+
+def merge_shards(shards):
+    data = {'version': FORMAT_VERSION, 'movies': []}
+    movies = {}
+    for shard in shards:
+        for movie in shard['movies']:
+            movies.setdefault(movie['id'], movie)
+    data['movies'] = sorted(movies.values(), key=lambda movie: movie['id'])
+    for kind in ('halls', 'screenings', 'tickets'):
+        data[kind] = sorted((entry for shard in shards for entry in shard[kind]),
+                            key=lambda entry: entry['id'])
+    return data
+
+
+SHARDED_IDS = ('halls', 'screenings', 'tickets')
+
+
+class ShardWorker:
+    operations = ('routes', 'interleave_ids', 'list_screenings', 'add_movie', 'add_hall', 'add_screening',
+                  'buy_ticket', 'buy_tickets', 'buy_batch', 'cancel_tickets', 'seat_map', 'save')
+    
+    def __init__(self, cinema, shard):
+        self.cinema = cinema
+        self.shard = shard
+        
+    def run(self, connection):
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            operation, args = request
+            try:
+                if operation not in self.operations:
+                    raise ValueError(f"Nežinoma operacija: {operation}")
+                reply = ('ok', getattr(self, operation)(*args))
+            except Exception as error:
+                reply = ('error', str(error))
+            connection.send(reply)
+        self.cinema.stop_autosave(flush=False)
+        self.cinema.persist(self.cinema.data_file)
+        connection.close()
+        
+    def info(self, screening, price=None):
+        info = screening_info(self.cinema, screening, price)
+        del info['index']
+        info['shard'] = self.shard
+        return info
+        
+    def routes(self):
+        return ([screening.id for screening in self.cinema.screenings],
+                [hall.hall_number for hall in self.cinema.halls],
+                {kind: max(self.cinema.entity_ids(kind), default=0) for kind in SHARDED_IDS})
+        
+    def interleave_ids(self, first, workers):
+        for kind, start in first.items():
+            start += (self.shard - start) % workers
+            self.cinema.next_ids[kind] = count(start, workers)
+        
+    def list_screenings(self, start=None, end=None, hall_number=None, movie_title=None):
+        screenings = self.cinema.list_screenings(start, end, hall_number, movie_title)
+        prices = self.cinema.calculate_ticket_prices(screenings)
+        return [self.info(s, p) for s, p in zip(screenings, prices)]
+        
+    def add_movie(self, title, duration, genre):
+        return self.cinema.add_movie(title, duration, genre).to_record()
+        
+    def add_hall(self, hall_number, capacity, layout=None):
+        return self.cinema.add_hall(hall_number, capacity, layout).to_record()
+        
+    def add_screening(self, movie_title, screening_time, hall_number):
+        screening = self.cinema.add_screening(movie_title, screening_time, hall_number)
+        return self.info(screening) if screening else None
+        
+    def buy_ticket(self, screening_id, seat_number):
+        screening = self.cinema.get_screening(screening_id)
+        ticket = self.cinema.book_seat(screening, seat_number) if screening else None
+        return ticket.to_record() if ticket else None
+        
+    def buy_tickets(self, screening_id, seats=None, party_size=None, split=False):
+        screening = self.cinema.get_screening(screening_id)
+        if screening is None:
+            return None
+        tickets = self.cinema.book_seats(screening, seats, party_size, split)
+        return [ticket.to_record() for ticket in tickets] if tickets else None
+        
+    def buy_batch(self, orders):
+        results = []
+        for screening_id, seat_number in orders:
+            screening = self.cinema.get_screening(screening_id)
+            ticket = self.cinema.book_seat(screening, seat_number) if screening else None
+            results.append(ticket.id if ticket else None)
+        return results
+        
+    def cancel_tickets(self, ticket_ids):
+        return [ticket.to_record() for ticket in self.cinema.cancel_tickets(ticket_ids)]
+        
+    def seat_map(self, screening_id, form='text'):
+        screening = self.cinema.get_screening(screening_id)
+        if screening is None:
+            return None
+        self.cinema.expire_holds()
+        self.cinema.refresh_screening(screening)
+        if form == 'packed':
+            return {'id': screening.id, 'layout': list(screening.layout.rows),
+                    'seats': len(screening.seat_codes), 'free': packed_seat_map(screening)}
+        if form == 'available':
+            return screening.free_seats()
+        return render_seat_map(screening)
+        
+    def save(self):
+        return self.cinema.persist(self.cinema.data_file)
+
+
+def run_shard(data_file, shard, connection, autosave=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        cinema = CinemaManager.create(data_file, JSONDataHandler(), sample_data=False)
+        cinema.ensure_loaded()
+        if autosave:
+            cinema.start_autosave(autosave)
+        ShardWorker(cinema, shard).run(connection)
+
+
+class ShardedCinema:
+    def __init__(self, data_file='cinema_data.json', workers=2, sample_data=True, autosave=None):
+        self.data_file = data_file
+        self.workers = workers
+        self.sample_data = sample_data
+        self.autosave = autosave
+        self.connections = []
+        self.processes = []
+        self.locks = []
+        self.routes = {}
+        self.hall_shards = {}
+        
+    def shard_files(self):
+        return [shard_filename(self.data_file, shard) for shard in range(self.workers)]
+        
+    def has_shards(self):
+        if not all(os.path.exists(filename) for filename in self.shard_files()):
+            return False
+        if os.path.exists(shard_filename(self.data_file, self.workers)):
+            return False
+        if not os.path.exists(self.data_file):
+            return True
+        source = os.stat(self.data_file).st_mtime_ns
+        return all(os.stat(filename).st_mtime_ns >= source for filename in self.shard_files())
+        
+    def remove_shards(self, shard=0):
+        while os.path.exists(shard_filename(self.data_file, shard)):
+            os.remove(shard_filename(self.data_file, shard))
+            shard += 1
+        
+    def split(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            source = CinemaManager.create(self.data_file, JSONDataHandler(),
+                                          sample_data=self.sample_data)
+            data = source.snapshot()
+        handler = JSONDataHandler()
+        for filename, shard_data in zip(self.shard_files(), split_snapshot(data, self.workers)):
+            handler.save_data(shard_data, filename)
+        self.remove_shards(self.workers)
+            
+    def merge(self):
+        handler = JSONDataHandler()
+        shards = [handler.load_data(filename) for filename in self.shard_files()]
+        if all(shards):
+            handler.save_data(merge_shards(shards), self.data_file)
+            self.remove_shards()
+            
+    def start(self, split=None):
+        if split is None:
+            split = not self.has_shards()
+        if split:
+            self.split()
+        context = multiprocessing.get_context('spawn')
+        for shard in range(self.workers):
+            connection, child = context.Pipe()
+            process = context.Process(target=run_shard, daemon=True,
+                                      args=(shard_filename(self.data_file, shard), shard,
+                                            child, self.autosave))
+            process.start()
+            child.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+            self.locks.append(threading.Lock())
+        self.refresh_routes()
+        return self
+        
+    def close(self):
+        for connection, lock in zip(self.connections, self.locks):
+            with lock:
+                with contextlib.suppress(OSError):
+                    connection.send(None)
+                connection.close()
+        for process in self.processes:
+            process.join()
+        if self.processes:
+            self.merge()
+        self.connections, self.processes, self.locks = [], [], []
+        
+    def call(self, shard, operation, *args):
+        with self.locks[shard]:
+            self.connections[shard].send((operation, args))
+            status, result = self.connections[shard].recv()
+        if status == 'error':
+            raise ValueError(result)
+        return result
+        
+    def scatter(self, requests):
+        shards = sorted(requests)
+        for shard in shards:
+            self.locks[shard].acquire()
+        try:
+            for shard in shards:
+                self.connections[shard].send(requests[shard])
+            replies = {shard: self.connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self.locks[shard].release()
+        for status, result in replies.values():
+            if status == 'error':
+                raise ValueError(result)
+        return {shard: result for shard, (_, result) in replies.items()}
+        
+    def broadcast(self, operation, *args):
+        replies = self.scatter({shard: (operation, args) for shard in range(self.workers)})
+        return [replies[shard] for shard in range(self.workers)]
+        
+    def refresh_routes(self):
+        self.routes.clear()
+        self.hall_shards.clear()
+        first = dict.fromkeys(SHARDED_IDS, 1)
+        for shard, (screening_ids, hall_numbers, last_ids) in enumerate(self.broadcast('routes')):
+            self.routes.update(dict.fromkeys(screening_ids, shard))
+            self.hall_shards.update(dict.fromkeys(map(hall_key, hall_numbers), shard))
+            for kind, last in last_ids.items():
+                first[kind] = max(first[kind], last + 1)
+        self.broadcast('interleave_ids', first, self.workers)
+            
+    def list_screenings(self, start=None, end=None, hall_number=None, movie_title=None):
+        if hall_number is not None:
+            shard = self.hall_shards.get(hall_key(hall_number))
+            if shard is None:
+                return []
+            results = [self.call(shard, 'list_screenings', start, end, hall_number, movie_title)]
+        else:
+            results = self.broadcast('list_screenings', start, end, hall_number, movie_title)
+        return sorted((info for result in results for info in result),
+                      key=lambda info: (info['screening_time'], info['id']))
+        
+    def add_movie(self, title, duration, genre):
+        return self.broadcast('add_movie', title, duration, genre)[0]
+        
+    def add_hall(self, hall_number, capacity, layout=None):
+        if hall_key(hall_number) in self.hall_shards:
+            return None
+        owned = [0] * self.workers
+        for shard in self.hall_shards.values():
+            owned[shard] += 1
+        shard = owned.index(min(owned))
+        hall = self.call(shard, 'add_hall', hall_number, capacity, layout)
+        self.hall_shards[hall_key(hall_number)] = shard
+        return hall
+        
+    def add_screening(self, movie_title, screening_time, hall_number):
+        shard = self.hall_shards.get(hall_key(hall_number))
+        if shard is None:
+            return None
+        info = self.call(shard, 'add_screening', movie_title, screening_time, hall_number)
+        if info:
+            self.routes[info['id']] = shard
+        return info
+        
+    def buy_ticket(self, screening_id, seat_number):
+        shard = self.routes.get(screening_id)
+        return None if shard is None else self.call(shard, 'buy_ticket', screening_id, seat_number)
+        
+    def buy_tickets(self, screening_id, seats=None, party_size=None, split=False):
+        shard = self.routes.get(screening_id)
+        if shard is None:
+            return None
+        return self.call(shard, 'buy_tickets', screening_id, seats, party_size, split)
+        
+    def buy_batch(self, orders):
+        batches = {}
+        for position, (screening_id, seat_number) in enumerate(orders):
+            shard = self.routes.get(screening_id)
+            if shard is not None:
+                batches.setdefault(shard, ([], []))
+                batches[shard][0].append(position)
+                batches[shard][1].append((screening_id, seat_number))
+        replies = self.scatter({shard: ('buy_batch', (batch,))
+                                for shard, (_, batch) in batches.items()})
+        results = [None] * len(orders)
+        for shard, (positions, _) in batches.items():
+            for position, ticket_id in zip(positions, replies[shard]):
+                results[position] = ticket_id
+        return results
+        
+    def cancel_tickets(self, ticket_ids):
+        return [record for result in self.broadcast('cancel_tickets', list(ticket_ids))
+                for record in result]
+        
+    def seat_map(self, screening_id, form='text'):
+        shard = self.routes.get(screening_id)
+        return None if shard is None else self.call(shard, 'seat_map', screening_id, form)
+        
+    def save(self):
+        return self.broadcast('save')
+
+
+def display_sharded_screenings(coordinator, day=None):
+    print("\n=== SEANSAI ===")
+    if day is None:
+        screenings = coordinator.list_screenings()
+    else:
+        screenings = coordinator.list_screenings(day, day + timedelta(days=1))
+        if not screenings:
+            print(f"{day:%Y-%m-%d} seansų nėra")
+    for info in screenings:
+        print(f"{info['id']}. {info['movie']} | {info['screening_time']} | "
+              f"Salė {info['hall']} | Kaina: {info['price']}€ | "
+              f"Laisvos vietos: {info['available_seats']}/{info['capacity']}")
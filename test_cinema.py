@@ -1,6 +1,23 @@
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time as timer
 import unittest
 from datetime import datetime, time
-from main import Movie, CinemaHall, Screening, Ticket, CinemaManager # type: ignore
+from main import Movie, CinemaHall, Screening, Ticket, CinemaManager, JournalDataHandler, SQLiteDataHandler # type: ignore
+from models import MovieCatalog # type: ignore
+from main import BinarySnapshotHandler # type: ignore
+from main import HallLayout, PricingEngine, SalesAnalytics, TicketStore # type: ignore
+from service import BookingService, http_request, run_load_test # type: ignore
+from benchmarks import generate_cinema, run_benchmarks, compare_benchmarks, shard_benchmark # type: ignore
+from main import render_seat_map, packed_seat_map, unpack_seat_map # type: ignore
+from sharding import ShardedCinema, ShardWorker, shard_filename, split_snapshot # type: ignore
+from main import import_files # type: ignore
 
 class TestMovie(unittest.TestCase):
     def test_movie_creation(self):
@@ -40,6 +57,35 @@ class TestCinemaHall(unittest.TestCase):
         hall_dict = hall.to_dict()
         self.assertEqual(hall_dict['hall_number'], 2)
         self.assertEqual(hall_dict['capacity'], 50)
+        self.assertNotIn('layout', hall_dict)
+        
+    def test_large_default_layout(self):
+        """Testuojama, kad didelėje salėje parduodamos visos vietos"""
+        hall = CinemaHall("Didžioji", 350)
+        screening = Screening(Movie("Avatar", 162, "Adventure"), datetime(2024, 6, 20, 20, 0), hall)
+        seats = screening.free_seats()
+        self.assertEqual(len(seats), 350)
+        self.assertEqual(len(set(seats)), 350)
+        self.assertTrue(screening.is_seat_free("S8"))
+        self.assertFalse(screening.is_seat_free("S9"))
+        
+    def test_custom_layout(self):
+        """Testuojamas salės planas su praėjimais, blokuotomis ir pritaikytomis vietomis"""
+        hall = CinemaHall(5, 12, ["OOO.OOO", "HHX.OOOO"])
+        self.assertEqual(hall.layout.codes[:7], ("A1", "A2", "A3", "A4", "A5", "A6", "B1"))
+        self.assertEqual(hall.layout.index["B7"], 12)
+        self.assertEqual(hall.to_dict()['layout'], ["OOO.OOO", "HHX.OOOO"])
+        
+        screening = Screening(Movie("Avatar", 162, "Adventure"), datetime(2024, 6, 20, 20, 0), hall)
+        self.assertEqual(len(screening.free_seats()), 12)
+        self.assertFalse(screening.is_seat_free("B3"))
+        self.assertEqual(screening.find_block(4), ["B4", "B5", "B6", "B7"])
+        self.assertIsNone(screening.find_block(5))
+        
+        with self.assertRaises(ValueError):
+            CinemaHall(6, 10, ["OOO.OOO"])
+        with self.assertRaises(ValueError):
+            HallLayout.parse("OOZ")
 
 class TestScreening(unittest.TestCase):
     def setUp(self):
@@ -121,6 +167,21 @@ class TestCinemaManager(unittest.TestCase):
         )
         self.assertIsNone(bad_screening)
     
+    def test_lookup_indexes(self):
+        """Testuojamos filmų, salių ir seansų paieškos pagal raktą"""
+        self.assertIs(self.cinema.get_movie("Interstellar"), self.movie1)
+        self.assertIsNone(self.cinema.get_movie("Nonexistent Movie"))
+        self.assertIs(self.cinema.get_hall(2), self.hall2)
+        self.assertIs(self.cinema.get_hall("2"), self.hall2)
+        
+        screening = self.cinema.add_screening("The Dark Knight", datetime(2024, 6, 25, 21, 0), "1")
+        self.assertIs(screening.hall, self.hall1)
+        self.assertIs(self.cinema.get_screening(screening.id), screening)
+        
+        self.cinema.movies = []
+        self.assertIsNone(self.cinema.get_movie("Interstellar"))
+        self.assertIsNone(self.cinema.add_screening("Interstellar", datetime(2024, 6, 25, 21, 0), 1))
+    
     def test_buy_ticket(self):
         """Testuojamas bilieto pirkimas"""
         screening = self.cinema.add_screening(
@@ -183,6 +244,1505 @@ class TestCinemaManager(unittest.TestCase):
         self.assertEqual(len(new_cinema.screenings), 1)
         self.assertEqual(len(new_cinema.tickets), 1)
         self.assertEqual(new_cinema.screenings[0].movie.title, "Interstellar")
+        self.assertNotIn("A1", new_cinema.get_available_seats(new_cinema.screenings[0]))
+    
+    def test_get_available_seats(self):
+        """Testuojamas laisvų vietų sąrašas po pirkimo"""
+        screening = self.cinema.add_screening(
+            "Interstellar",
+            datetime(2024, 6, 29, 16, 0),
+            1
+        )
+        seats = self.cinema.get_available_seats(screening)
+        self.assertEqual(len(seats), 50)
+        self.assertEqual(seats[:3], ["A1", "A2", "A3"])
+        self.assertEqual(seats[-1], "E10")
+        
+        self.cinema.buy_ticket(0, "A2")
+        seats = self.cinema.get_available_seats(screening)
+        self.assertEqual(seats[:2], ["A1", "A3"])
+        self.assertIsNone(self.cinema.buy_ticket(0, "F1"))
+
+class TestManagerInstances(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filenames = [os.path.join(self.tmpdir.name, f"site{i}.json") for i in range(2)]
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_lazy_loading(self):
+        """Testuojama, kad duomenys įkeliami tik pirmą kartą jų prireikus"""
+        site = CinemaManager.create(self.filenames[0], sample_data=False)
+        site.add_movie("Up", 96, "Animation")
+        site.save_data(self.filenames[0])
+        
+        lazy = CinemaManager.create(self.filenames[0])
+        self.assertFalse(lazy.loaded)
+        self.assertEqual([m.title for m in lazy.movies], ["Up"])
+        self.assertTrue(lazy.loaded)
+        
+        preloaded = CinemaManager.create(self.filenames[0], preload=True)
+        self.assertIsNotNone(preloaded.get_movie("Up"))
+        self.assertIsNot(preloaded, CinemaManager())
+        
+    def test_shared_catalog(self):
+        """Testuojami keli nepriklausomi kino teatrai su bendru filmų katalogu"""
+        catalog = MovieCatalog()
+        sites = [CinemaManager.create(name, catalog=catalog, sample_data=False)
+                 for name in self.filenames]
+        for number, site in enumerate(sites, 1):
+            site.add_movie("Up", 96, "Animation")
+            site.add_hall(1, 50)
+            site.add_screening("Up", datetime(2024, 7, number, 12, 0), 1)
+        self.assertIs(sites[0].get_movie("Up"), sites[1].get_movie("Up"))
+        self.assertEqual(len(catalog), 1)
+        
+        sites[0].buy_ticket(0, "A1")
+        self.assertTrue(sites[1].screenings[0].is_seat_free("A1"))
+        self.assertEqual(len(sites[1].tickets), 0)
+        
+        sites[0].save_data(self.filenames[0])
+        reloaded = CinemaManager.create(self.filenames[0], catalog=catalog)
+        self.assertIs(reloaded.screenings[0].movie, sites[1].get_movie("Up"))
+        self.assertEqual(len(reloaded.tickets), 1)
+
+class TestPersistenceFormat(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_normalized_format(self):
+        """Testuojama, kad bilietai nurodo seansą pagal ID"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        screening = self.cinema.add_screening("Interstellar", datetime(2024, 7, 1, 18, 0), 1)
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.buy_ticket(0, "A2")
+        self.cinema.save_data(self.filename)
+        
+        with open(self.filename) as file:
+            data = json.load(file)
+        self.assertEqual(data['version'], 2)
+        self.assertEqual(data['screenings'][0]['movie_id'], data['movies'][0]['id'])
+        self.assertEqual([t['screening_id'] for t in data['tickets']], [screening.id] * 2)
+        self.assertNotIn('screening', data['tickets'][0])
+        
+        self.cinema.load_data(self.filename)
+        loaded = self.cinema.screenings[0]
+        self.assertIs(self.cinema.tickets[0].screening, loaded)
+        self.assertIs(self.cinema.tickets[1].screening, loaded)
+        self.assertEqual(self.cinema.get_available_seats(loaded)[:2], ["A3", "A4"])
+        
+    def test_legacy_format_migration(self):
+        """Testuojamas senojo įdėtinio formato įkėlimas"""
+        screening = Screening(Movie("The Matrix", 136, "Sci-Fi"),
+                              datetime(2025, 5, 9, 12, 10), CinemaHall("1", 100))
+        screening.available_seats = 99
+        screening.tickets_sold = 1
+        legacy = {
+            'movies': [screening.movie.to_dict()],
+            'halls': [screening.hall.to_dict()],
+            'screenings': [screening.to_dict()],
+            'tickets': [Ticket(screening, "B3", 12).to_dict()]
+        }
+        with open(self.filename, 'w') as file:
+            json.dump(legacy, file)
+            
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.movies), 1)
+        self.assertEqual(len(self.cinema.screenings), 1)
+        loaded = self.cinema.screenings[0]
+        self.assertIs(loaded.movie, self.cinema.movies[0])
+        self.assertIs(self.cinema.tickets[0].screening, loaded)
+        self.assertFalse(loaded.is_seat_free("B3"))
+        self.assertIsNone(self.cinema.buy_ticket(0, "B3"))
+        
+    def test_compact_ticket_store(self):
+        """Testuojama kompaktiška bilietų saugykla ir jos išsaugojimas"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 1, 18, 0), 1)
+        self.cinema.buy_ticket(0, "A1")
+        store = self.cinema.use_ticket_store()
+        self.assertIsInstance(store, TicketStore)
+        self.cinema.buy_tickets(0, seats=["B1", "B2"])
+        self.assertEqual([t.seat_number for t in store], ["A1", "B1", "B2"])
+        first = store[0].id
+        self.assertEqual([t.id for t in store], [first, first + 1, first + 2])
+        self.assertEqual(store[-1].price, self.cinema.calculate_ticket_price(self.cinema.screenings[0]))
+        self.assertFalse(hasattr(store[0], '__dict__'))
+        
+        self.cinema.save_data(self.filename)
+        self.cinema.load_data(self.filename)
+        self.assertIsInstance(self.cinema.tickets, TicketStore)
+        self.assertEqual(len(self.cinema.tickets), 3)
+        self.assertIs(self.cinema.tickets[0].screening, self.cinema.screenings[0])
+        self.assertFalse(self.cinema.screenings[0].is_seat_free("B2"))
+        self.assertEqual(self.cinema.buy_ticket(0, "C1").id, first + 3)
+
+class TestAutosave(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        self.cinema = CinemaManager.create(self.filename, sample_data=False)
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 1)
+        
+    def tearDown(self):
+        self.cinema.stop_autosave(flush=False)
+        self.tmpdir.cleanup()
+        
+    def test_dirty_tracking(self):
+        """Testuojama, kad nepakeisti duomenys iš naujo nerašomi"""
+        self.assertEqual(self.cinema.dirty_kinds(), {'movies', 'halls', 'screenings'})
+        self.assertTrue(self.cinema.persist(self.filename))
+        self.assertFalse(self.cinema.is_dirty())
+        self.assertFalse(self.cinema.persist(self.filename))
+        
+        self.cinema.buy_ticket(0, "A1")
+        self.assertEqual(self.cinema.dirty_kinds(), {'tickets'})
+        self.assertTrue(self.cinema.persist(self.filename))
+        self.assertFalse(os.path.exists(self.filename + ".tmp"))
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 1)
+            
+    def test_failed_write_keeps_old_file(self):
+        """Testuojama, kad nepavykęs rašymas nesugadina ankstesnio failo"""
+        self.cinema.persist(self.filename)
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.tickets[0].price = object()
+        with self.assertRaises(TypeError):
+            self.cinema.persist(self.filename)
+        with open(self.filename) as file:
+            self.assertEqual(json.load(file)['tickets'], [])
+        self.assertFalse(os.path.exists(self.filename + ".tmp"))
+        self.assertTrue(self.cinema.is_dirty())
+        
+    def test_background_autosave_coalesces(self):
+        """Testuojama, kad pakeitimų serija išsaugoma vienu rašymu"""
+        self.cinema.persist(self.filename)
+        autosaver = self.cinema.start_autosave(interval=0.05, max_delay=1.0)
+        for seat in ("A1", "A2", "A3", "A4"):
+            self.cinema.buy_ticket(0, seat)
+        deadline = timer.time() + 5
+        while not autosaver.saves and timer.time() < deadline:
+            timer.sleep(0.01)
+        timer.sleep(0.1)
+        self.assertEqual(autosaver.saves, 1)
+        self.assertFalse(self.cinema.is_dirty())
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 4)
+        self.cinema.stop_autosave()
+        self.assertEqual(autosaver.saves, 1)
+        
+    def test_autosaver_compacts_journal(self):
+        """Testuojama, kad žurnalo suspaudimą atlieka automatinio išsaugojimo gija"""
+        self.cinema.data_handler = JournalDataHandler(compact_every=2)
+        self.cinema.persist(self.filename)
+        autosaver = self.cinema.start_autosave(interval=60, max_delay=60)
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.buy_ticket(0, "A2")
+        deadline = timer.time() + 5
+        while not autosaver.saves and timer.time() < deadline:
+            timer.sleep(0.01)
+        self.assertEqual(autosaver.saves, 1)
+        self.assertIsNone(self.cinema.compactor)
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 2)
+        self.cinema.data_handler.close()
+
+class TestScreeningSchedule(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_movie("Toy Story", 81, "Animation")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_hall(2, 100)
+        
+    def tearDown(self):
+        self.cinema.cleaning_minutes = 0
+        
+    def test_overlap_rejected(self):
+        """Testuojamas persidengiančių seansų toje pačioje salėje atmetimas"""
+        self.assertIsNotNone(self.cinema.add_screening("Interstellar", datetime(2024, 7, 8, 18, 0), 1))
+        self.assertIsNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 20, 0), 1))
+        self.assertIsNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 17, 0), 1))
+        self.assertIsNotNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 20, 0), 2))
+        self.assertIsNotNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 20, 49), 1))
+        
+        self.cinema.cleaning_minutes = 15
+        self.assertIsNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 16, 30), 1))
+        self.assertIsNotNone(self.cinema.add_screening("Toy Story", datetime(2024, 7, 8, 16, 20), 1))
+        
+    def test_range_queries(self):
+        """Testuojamos seansų paieškos pagal laiką, salę ir filmą"""
+        for day in (8, 9):
+            for hour, hall, title in ((12, 1, "Toy Story"), (19, 1, "Interstellar"), (18, 2, "Toy Story")):
+                self.cinema.add_screening(title, datetime(2024, 7, day, hour, 0), hall)
+                
+        evening = self.cinema.find_screenings(datetime(2024, 7, 8, 18, 0), datetime(2024, 7, 8, 22, 0))
+        self.assertEqual([s.screening_time.hour for s in evening], [18, 19])
+        self.assertEqual(len(self.cinema.find_screenings(hall_number="1")), 4)
+        toy_story = self.cinema.find_screenings(datetime(2024, 7, 9), movie_title="Toy Story")
+        self.assertEqual([s.screening_time.hour for s in toy_story], [12, 18])
+        self.assertEqual(len(self.cinema.find_screenings(hall_number=2, movie_title="Interstellar")), 0)
+        
+        day = self.cinema.list_screenings(datetime(2024, 7, 9), datetime(2024, 7, 10))
+        self.assertEqual([self.cinema.screening_position(s) for s in day], [3, 5, 4])
+
+class TestPricingEngine(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Inception", 150, "Thriller")
+        self.cinema.add_movie("Toy Story", 81, "Animation")
+        self.cinema.add_hall(1, 10)
+        self.cinema.add_hall("VIP", 100)
+        self.original_pricing = self.cinema.pricing
+        
+    def tearDown(self):
+        self.cinema.pricing = self.original_pricing
+        
+    def test_default_rules(self):
+        """Testuojama, kad numatytosios taisyklės skaičiuoja kaip anksčiau"""
+        evening = self.cinema.add_screening("Inception", datetime(2024, 7, 10, 18, 30), "VIP")
+        noon = self.cinema.add_screening("Toy Story", datetime(2024, 7, 10, 18, 0), 1)
+        self.assertEqual(self.cinema.calculate_ticket_price(evening), 14)
+        self.assertEqual(self.cinema.calculate_ticket_price(noon), 8)
+        self.assertEqual(self.cinema.calculate_ticket_prices([noon, evening]), [8, 14])
+        
+    def test_configured_rules(self):
+        """Testuojamos konfigūruojamos taisyklės ir kainų atnaujinimas po pardavimo"""
+        self.cinema.pricing = PricingEngine({
+            'base_price': 6,
+            'rules': [
+                {'type': 'weekday', 'days': [5, 6], 'amount': 2},
+                {'type': 'time', 'after': "17:59", 'before': "22:00", 'amount': 1},
+                {'type': 'hall', 'halls': ["VIP"], 'amount': 5},
+                {'type': 'movie', 'titles': ["Toy Story"], 'amount': -1},
+                {'type': 'demand', 'thresholds': [
+                    {'occupancy': 0.5, 'amount': 2},
+                    {'occupancy': 0.8, 'amount': 4}
+                ]}
+            ]
+        })
+        saturday = self.cinema.add_screening("Toy Story", datetime(2024, 7, 13, 20, 0), 1)
+        vip = self.cinema.add_screening("Inception", datetime(2024, 7, 10, 23, 0), "VIP")
+        self.assertEqual(self.cinema.calculate_ticket_prices([saturday, vip]), [8, 11])
+        
+        prices = [self.cinema.buy_ticket(0, f"A{seat}").price for seat in range(1, 11)]
+        self.assertEqual(prices, [8] * 5 + [10] * 3 + [12] * 2)
+        self.assertEqual(self.cinema.calculate_ticket_price(saturday), 12)
+        
+        with self.assertRaises(ValueError):
+            PricingEngine({'rules': [{'type': 'moon_phase'}]})
+            
+    def test_load_from_file(self):
+        """Testuojamas taisyklių įkėlimas iš failo"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "pricing.json")
+            with open(filename, 'w') as file:
+                json.dump({'base_price': 5, 'rules': []}, file)
+            self.cinema.load_pricing(filename)
+        screening = self.cinema.add_screening("Inception", datetime(2024, 7, 10, 20, 0), 1)
+        self.assertEqual(self.cinema.calculate_ticket_price(screening), 5)
+
+class TestSalesAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Inception", 150, "Thriller")
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_hall(2, 20)
+        self.cinema.add_screening("Inception", datetime(2024, 7, 1, 20, 0), 1)
+        self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 2)
+        self.cinema.add_screening("Up", datetime(2024, 7, 2, 12, 0), 1)
+        self.cinema.buy_ticket(0, "A1")
+        
+    def tearDown(self):
+        self.cinema.analytics = None
+        
+    def test_incremental_aggregates(self):
+        """Testuojamos pardavimų suvestinės ir jų atnaujinimas perkant bilietus"""
+        analytics = self.cinema.enable_analytics()
+        self.cinema.buy_tickets(1, seats=["A1", "A2"])
+        self.cinema.buy_ticket(2, "B1")
+        prices = [self.cinema.calculate_ticket_price(s) for s in self.cinema.screenings]
+        
+        by_movie = {row['movie']: row for row in analytics.group('movie')}
+        self.assertEqual(by_movie["Inception"]['tickets'], 1)
+        self.assertEqual(by_movie["Up"]['tickets'], 3)
+        self.assertEqual(by_movie["Up"]['revenue'], 2 * prices[1] + prices[2])
+        self.assertEqual(by_movie["Up"]['capacity'], 70)
+        by_hall = {row['hall']: row for row in analytics.group('hall')}
+        self.assertAlmostEqual(by_hall["2"]['occupancy'], 2 / 20)
+        self.assertEqual([row['day'] for row in analytics.group('day')],
+                         ["2024-07-01", "2024-07-02"])
+        self.assertEqual({row['hour']: row['screenings'] for row in analytics.group('hour')},
+                         {12: 2, 20: 1})
+        self.assertEqual(analytics.top_screenings(1, by='tickets')[0]['id'],
+                         self.cinema.screenings[1].id)
+        with self.assertRaises(ValueError):
+            analytics.group('weekday')
+            
+    def test_rebuild_matches_incremental(self):
+        """Testuojama, kad perskaičiuota suvestinė sutampa su atnaujinta eigoje"""
+        analytics = self.cinema.enable_analytics()
+        self.cinema.add_screening("Inception", datetime(2024, 7, 3, 18, 0), 2)
+        self.cinema.buy_tickets(3, party_size=4)
+        incremental = analytics.group('movie')
+        self.cinema.use_ticket_store()
+        self.assertEqual(SalesAnalytics(self.cinema).group('movie'), incremental)
+        self.cinema.tickets = list(self.cinema.tickets)
+        self.assertEqual(SalesAnalytics(self.cinema).group('movie'), incremental)
+
+class TestJournalDataHandler(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.original_handler = self.cinema.data_handler
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        self.journal = os.path.join(self.tmpdir.name, "data.journal")
+        self.cinema.data_handler = JournalDataHandler(compact_every=100)
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.save_data(self.filename)
+        
+    def tearDown(self):
+        self.cinema.data_handler.close()
+        self.cinema.data_handler = self.original_handler
+        self.tmpdir.cleanup()
+        
+    def test_replay_after_crash(self):
+        """Testuojamas pardavimų atkūrimas iš žurnalo be save_data"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        self.cinema.buy_ticket(0, "C3")
+        self.cinema.buy_ticket(0, "C4")
+        
+        with open(self.journal) as file:
+            self.assertEqual(len(file.readlines()), 5)
+        
+        self.cinema.movies = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.load_data(self.filename)
+        screening = self.cinema.screenings[0]
+        self.assertEqual(len(self.cinema.tickets), 2)
+        self.assertEqual(screening.tickets_sold, 2)
+        self.assertEqual(screening.available_seats, 48)
+        self.assertFalse(screening.is_seat_free("C4"))
+        
+    def test_replay_cancellation(self):
+        """Testuojamas grąžinimų ir vietų keitimų atkūrimas iš žurnalo"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        first = self.cinema.buy_ticket(0, "C3")
+        second = self.cinema.buy_ticket(0, "C4")
+        self.cinema.buy_ticket(0, "C5")
+        self.cinema.cancel_ticket(first.id)
+        self.cinema.exchange_ticket(second.id, "D1")
+        
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.load_data(self.filename)
+        screening = self.cinema.screenings[0]
+        self.assertEqual(sorted(t.seat_number for t in self.cinema.tickets), ["C5", "D1"])
+        self.assertEqual((screening.tickets_sold, screening.available_seats), (2, 48))
+        self.assertTrue(screening.is_seat_free("C3"))
+        self.assertTrue(screening.is_seat_free("C4"))
+        
+    def test_compaction(self):
+        """Testuojamas žurnalo suspaudimas į momentinę kopiją"""
+        self.cinema.data_handler.compact_every = 3
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        self.cinema.compactor.join()
+        self.assertEqual(os.path.getsize(self.journal), 0)
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['screenings']), 1)
+            
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.tickets), 1)
+        self.assertEqual(self.cinema.screenings[0].tickets_sold, 1)
+        
+    def test_compaction_off_sale_path(self):
+        """Testuojama, kad pardavimas nelaukia vykstančio išsaugojimo suspaudžiant žurnalą"""
+        self.cinema.data_handler.compact_every = 1
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        self.cinema.compactor.join()
+        sold = threading.Event()
+        with self.cinema.save_lock:
+            threading.Thread(target=lambda: (self.cinema.buy_ticket(0, "A1"), sold.set())).start()
+            self.assertTrue(sold.wait(5))
+        self.cinema.compactor.join()
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 1)
+        
+    def test_cancel_during_snapshot(self):
+        """Testuojamas bilieto grąžinimas tuo metu, kai kuriama momentinė kopija"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        first = self.cinema.buy_ticket(0, "A1")
+        for seat in ("A2", "A3", "A4"):
+            self.cinema.buy_ticket(0, seat)
+        original = Ticket.to_record
+        
+        def to_record(ticket):
+            if ticket.id == first.id:
+                self.cinema.cancel_ticket(first.id)
+            return original(ticket)
+            
+        Ticket.to_record = to_record
+        try:
+            self.cinema.persist(self.filename, force=True)
+        finally:
+            Ticket.to_record = original
+            
+        self.cinema.tickets = []
+        self.cinema.load_data(self.filename)
+        self.assertEqual([t.seat_number for t in self.cinema.tickets], ["A2", "A3", "A4"])
+        self.assertEqual(self.cinema.screenings[0].tickets_sold, 3)
+        
+    def test_append_during_snapshot(self):
+        """Testuojama, kad pardavimai neblokuojami, kol rašoma momentinė kopija"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        handler = self.cinema.data_handler
+        appended = threading.Event()
+        
+        def snapshot():
+            data = self.cinema.snapshot()
+            threading.Thread(target=lambda: (self.cinema.buy_ticket(0, "A1"), appended.set())).start()
+            self.assertTrue(appended.wait(5))
+            return data
+            
+        handler.save_snapshot(snapshot, self.filename)
+        with open(self.filename) as file:
+            self.assertEqual(json.load(file)['tickets'], [])
+            
+        self.cinema.tickets = []
+        self.cinema.load_data(self.filename)
+        self.assertEqual([t.seat_number for t in self.cinema.tickets], ["A1"])
+        self.assertEqual(self.cinema.screenings[0].tickets_sold, 1)
+        
+    def test_concurrent_persist(self):
+        """Testuojamas vienu metu vykdomas duomenų išsaugojimas iš kelių gijų"""
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), 1)
+        self.cinema.buy_ticket(0, "A1")
+        errors = []
+        
+        def persist():
+            try:
+                for _ in range(10):
+                    self.cinema.persist(self.filename, force=True)
+            except OSError as error:
+                errors.append(error)
+                
+        threads = [threading.Thread(target=persist) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["data.journal", "data.json"])
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 1)
+
+class TestBinarySnapshotHandler(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.original_handler = self.cinema.data_handler
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        self.snapshot = os.path.join(self.tmpdir.name, "data.snap")
+        self.cinema.data_handler = BinarySnapshotHandler(JournalDataHandler())
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.save_data(self.filename)
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall("1", 11, "OOOO/HH.OO/XOOO")
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 2, 19, 0), "1")
+        self.cinema.buy_ticket(0, "A2")
+        self.cinema.buy_ticket(0, "B4")
+        self.cinema.save_data(self.filename)
+        
+    def tearDown(self):
+        self.cinema.data_handler.source_handler.close()
+        self.cinema.data_handler = self.original_handler
+        self.tmpdir.cleanup()
+        
+    def test_mapped_load(self):
+        """Testuojamas įkėlimas iš dvejetainės momentinės kopijos"""
+        self.assertTrue(os.path.exists(self.snapshot))
+        self.cinema.load_data(self.filename)
+        screening = self.cinema.screenings[0]
+        self.assertNotIsInstance(self.cinema.tickets, list)
+        self.assertEqual([t.seat_number for t in self.cinema.tickets], ["A2", "B4"])
+        self.assertIs(self.cinema.tickets[1].screening, screening)
+        self.assertEqual(screening.screening_time, datetime(2024, 7, 2, 19, 0))
+        self.assertEqual(screening.hall.hall_number, "1")
+        self.assertEqual(screening.layout.rows, ("OOOO", "HH.OO", "XOOO"))
+        self.assertFalse(screening.is_seat_free("B4"))
+        self.assertEqual(screening.tickets_sold, 2)
+        
+        ticket = self.cinema.buy_ticket(0, "A3")
+        self.assertEqual(ticket.id, self.cinema.tickets[1].id + 1)
+        self.assertEqual(len(self.cinema.tickets), 3)
+        self.assertEqual(self.cinema.snapshot()['tickets'][-1]['seat_number'], "A3")
+        
+    def test_stale_snapshot_rebuilt(self):
+        """Testuojama, kad pasenusi ar sugadinta kopija perkuriama iš šaltinio"""
+        self.cinema.buy_ticket(0, "C2")
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.tickets), 3)
+        self.assertFalse(self.cinema.screenings[0].is_seat_free("C2"))
+        
+        with open(self.snapshot, 'r+b') as file:
+            file.truncate(os.path.getsize(self.snapshot) - 1)
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.tickets), 3)
+        with open(self.snapshot, 'rb') as file:
+            self.assertEqual(file.read(8), b'CINESNAP')
+            
+    def test_snapshot_write_failure(self):
+        """Testuojamas pranešimas, kai momentinės kopijos įrašyti nepavyksta"""
+        os.remove(self.snapshot)
+        os.mkdir(self.snapshot)
+        self.cinema.buy_ticket(0, "C2")
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            self.cinema.save_data(self.filename)
+        self.assertIn("Nepavyko įrašyti momentinės kopijos", errors.getvalue())
+        self.assertEqual(os.listdir(self.snapshot), [])
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.tickets), 3)
+
+class TestSQLiteDataHandler(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.original_handler = self.cinema.data_handler
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "cinema.db")
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 3, 20, 0), 1)
+        self.cinema.buy_ticket(0, "A1")
+        
+    def tearDown(self):
+        self.cinema.data_handler.close()
+        self.cinema.data_handler = self.original_handler
+        self.tmpdir.cleanup()
+        
+    def test_save_and_load(self):
+        """Testuojamas pilnas išsaugojimas ir įkėlimas iš SQLite"""
+        self.cinema.data_handler = SQLiteDataHandler()
+        self.cinema.save_data(self.filename)
+        self.cinema.load_data(self.filename)
+        self.assertEqual(len(self.cinema.movies), 1)
+        self.assertEqual(len(self.cinema.tickets), 1)
+        self.assertIs(self.cinema.tickets[0].screening, self.cinema.screenings[0])
+        
+    def test_live_mode(self):
+        """Testuojamas darbas tiesiogiai su duomenų baze"""
+        self.cinema.open_database(self.filename)
+        self.assertEqual(self.cinema.tickets, [])
+        screening = self.cinema.screenings[0]
+        self.assertNotIn("A1", self.cinema.get_available_seats(screening))
+        
+        ticket = self.cinema.buy_ticket(0, "A2")
+        self.assertIsNotNone(ticket.id)
+        self.assertIsNone(self.cinema.buy_ticket(0, "A2"))
+        self.assertIsNone(self.cinema.buy_ticket(0, "Z1"))
+        self.assertEqual(self.cinema.tickets, [])
+        
+        handler = SQLiteDataHandler()
+        data = handler.load_data(self.filename)
+        handler.close()
+        self.assertEqual([t['seat_number'] for t in data['tickets']], ["A1", "A2"])
+        self.assertEqual(data['screenings'][0]['tickets_sold'], 2)
+        self.assertEqual(self.cinema.list_screenings()[0].available_seats, 48)
+        
+    def test_live_cancellation(self):
+        """Testuojamas bilietų grąžinimas ir keitimas tiesiogiai duomenų bazėje"""
+        self.cinema.open_database(self.filename)
+        screening = self.cinema.screenings[0]
+        ticket = self.cinema.buy_ticket(0, "A2")
+        self.assertEqual(self.cinema.find_ticket(screening, "A1").seat_number, "A1")
+        self.assertEqual(self.cinema.exchange_ticket(ticket.id, "B1").seat_number, "B1")
+        self.assertIsNone(self.cinema.exchange_ticket(ticket.id, "A1"))
+        self.assertEqual(self.cinema.cancel_ticket(ticket.id).seat_number, "B1")
+        self.assertIsNone(self.cinema.get_ticket(ticket.id))
+        self.assertIn("B1", self.cinema.get_available_seats(screening))
+        self.assertEqual(self.cinema.list_screenings()[0].available_seats, 49)
+        
+    def test_live_blocked_seats(self):
+        """Testuojama, kad užblokuotos vietos neparduodamos tiesiogiai iš duomenų bazės"""
+        self.cinema.add_hall(2, 3, "OXOO")
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 3, 23, 0), 2)
+        self.cinema.open_database(self.filename)
+        self.assertIsNone(self.cinema.buy_ticket(1, "A2"))
+        self.assertIsNone(self.cinema.buy_tickets(1, ["A1", "A2"]))
+        self.assertEqual(self.cinema.buy_ticket(1, "A3").seat_number, "A3")
+        self.assertEqual(self.cinema.get_available_seats(self.cinema.screenings[1]), ["A1", "A4"])
+        
+    def test_live_refresh_locks_screening(self):
+        """Testuojama, kad vietų atnaujinimas iš duomenų bazės laukia seanso užrakto"""
+        self.cinema.open_database(self.filename)
+        screening = self.cinema.screenings[0]
+        hold = self.cinema.hold_seats(screening, ["B1"])
+        result = []
+        with screening.lock:
+            thread = threading.Thread(
+                target=lambda: result.append(self.cinema.get_available_seats(screening)))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertNotIn("A1", result[0])
+        self.assertNotIn("B1", result[0])
+        self.cinema.release_hold(hold.id)
+
+class TestConcurrentBooking(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 100)
+        for hour in range(0, 24, 3):
+            self.cinema.add_screening("Interstellar", datetime(2024, 7, 4, hour, 0), 1)
+            
+    def run_threads(self, thread_count, worker):
+        barrier = threading.Barrier(thread_count)
+        
+        def run(index):
+            barrier.wait()
+            worker(index)
+            
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(thread_count)]
+        start = timer.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timer.perf_counter() - start
+        
+    def test_no_double_sale(self):
+        """Testuojama, kad ta pati vieta neparduodama du kartus"""
+        seats = self.cinema.get_available_seats(self.cinema.screenings[0])
+        sold = []
+        
+        def worker(index):
+            for seat in seats:
+                if self.cinema.buy_ticket(0, seat):
+                    sold.append(seat)
+                    
+        self.run_threads(8, worker)
+        screening = self.cinema.screenings[0]
+        self.assertEqual(sorted(sold), sorted(seats))
+        self.assertEqual(len(self.cinema.tickets), 100)
+        self.assertEqual(screening.tickets_sold, 100)
+        self.assertEqual(screening.available_seats, 0)
+        
+    def test_throughput(self):
+        """Testuojami lygiagretūs pardavimai didinant gijų skaičių"""
+        for thread_count in (1, 2, 4, 8):
+            self.setUp()
+            seats = self.cinema.get_available_seats(self.cinema.screenings[0])
+            
+            def worker(index):
+                screening_id = index % len(self.cinema.screenings)
+                for seat in seats:
+                    self.cinema.buy_ticket(screening_id, seat)
+                    
+            self.run_threads(thread_count, worker)
+            sold = sum(s.tickets_sold for s in self.cinema.screenings)
+            self.assertEqual(sold, len(self.cinema.tickets))
+            self.assertEqual(sold, min(thread_count, 8) * 100)
+            
+    def test_throughput_single_screening(self):
+        """Testuojami lygiagretūs pardavimai, kai visos gijos perka to paties seanso vietas"""
+        for thread_count in (1, 2, 4, 8):
+            self.setUp()
+            screening = self.cinema.screenings[0]
+            seats = self.cinema.get_available_seats(screening)
+            
+            def worker(index):
+                offset = index * len(seats) // thread_count
+                for seat in seats[offset:] + seats[:offset]:
+                    self.cinema.buy_ticket(0, seat)
+                    
+            self.run_threads(thread_count, worker)
+            sold_seats = [t.seat_number for t in self.cinema.tickets]
+            self.assertEqual(sorted(sold_seats), sorted(seats))
+            self.assertEqual((screening.tickets_sold, screening.available_seats), (100, 0))
+
+class TestGroupBooking(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.screening = self.cinema.add_screening("Interstellar", datetime(2024, 7, 5, 15, 0), 1)
+        
+    def test_party_size(self):
+        """Testuojamas geriausių gretimų vietų parinkimas grupei"""
+        tickets = self.cinema.buy_tickets(0, party_size=4)
+        self.assertEqual([t.seat_number for t in tickets], ["C4", "C5", "C6", "C7"])
+        self.assertEqual(self.screening.tickets_sold, 4)
+        self.assertEqual(len(self.cinema.tickets), 4)
+        
+        tickets = self.cinema.buy_tickets(0, party_size=6)
+        self.assertEqual([t.seat_number for t in tickets], ["B3", "B4", "B5", "B6", "B7", "B8"])
+        self.assertIsNone(self.cinema.buy_tickets(0, party_size=11))
+        
+    def test_explicit_seats_are_atomic(self):
+        """Testuojama, kad grupė perkama visa arba nieko"""
+        self.cinema.buy_ticket(0, "A3")
+        self.assertIsNone(self.cinema.buy_tickets(0, seats=["A1", "A2", "A3"]))
+        self.assertIsNone(self.cinema.buy_tickets(0, seats=["A1", "A1"]))
+        self.assertTrue(self.screening.is_seat_free("A1"))
+        self.assertEqual(self.screening.tickets_sold, 1)
+        
+        tickets = self.cinema.buy_tickets(0, seats=["A1", "A2"])
+        self.assertEqual(len(tickets), 2)
+        self.assertEqual(self.screening.available_seats, 47)
+        
+    def test_split_across_rows(self):
+        """Testuojamas didelės grupės paskirstymas per kelias eiles"""
+        tickets = self.cinema.buy_tickets(0, party_size=25, split=True)
+        self.assertEqual(len(tickets), 25)
+        self.assertEqual(self.screening.available_seats, 25)
+        self.assertEqual(len(self.cinema.get_available_seats(self.screening)), 25)
+        
+    def test_single_journal_record(self):
+        """Testuojama, kad grupės pirkimas įrašomas vienu žurnalo įrašu"""
+        original_handler = self.cinema.data_handler
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "data.json")
+            self.cinema.data_handler = JournalDataHandler()
+            try:
+                self.cinema.save_data(filename)
+                self.cinema.buy_tickets(0, party_size=5)
+                with open(os.path.join(tmpdir, "data.journal")) as file:
+                    self.assertEqual(len(file.readlines()), 1)
+                self.cinema.load_data(filename)
+                self.assertEqual(len(self.cinema.tickets), 5)
+                self.assertEqual(self.cinema.screenings[0].tickets_sold, 5)
+            finally:
+                self.cinema.data_handler.close()
+                self.cinema.data_handler = original_handler
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generated_cinema(self):
+        """Testuojamas atkuriamas sintetinio kino teatro generavimas"""
+        with tempfile.TemporaryDirectory() as directory:
+            first_file = os.path.join(directory, 'first.json')
+            second_file = os.path.join(directory, 'second.json')
+            first = generate_cinema(halls=3, movies=4, screenings=12, tickets=200, seed=7,
+                                    data_file=first_file)
+            second = generate_cinema(halls=3, movies=4, screenings=12, tickets=200, seed=7,
+                                     data_file=second_file)
+            self.assertEqual(len(first.screenings), 12)
+            self.assertEqual(len(first.tickets), 200)
+            self.assertEqual([t.to_record() for t in first.tickets],
+                             [t.to_record() for t in second.tickets])
+            self.assertFalse(os.path.exists(first_file))
+            
+    def test_generated_cinema_in_memory(self):
+        """Testuojama, kad generuojant be failo neįkeliami darbo katalogo duomenys"""
+        with tempfile.TemporaryDirectory() as directory:
+            previous = os.getcwd()
+            os.chdir(directory)
+            try:
+                with open('benchmark.json', 'w', encoding='utf-8') as file:
+                    file.write('{"movies": [{"title": "Svetimas", "duration": 90, "genre": "Drama"}]}')
+                cinema = generate_cinema(halls=2, movies=3, screenings=4, tickets=10, seed=1)
+            finally:
+                os.chdir(previous)
+        self.assertEqual(len(cinema.movies), 3)
+        self.assertNotIn("Svetimas", [movie.title for movie in cinema.movies])
+        self.assertEqual(len(cinema.tickets), 10)
+        
+    def test_run_and_compare(self):
+        """Testuojamas matavimų paleidimas ir regresijų palyginimas"""
+        result = run_benchmarks(halls=2, movies=3, screenings=6, tickets=50, operations=20)
+        self.assertEqual(set(result['results']), {
+            'buy_ticket', 'threaded_buy_ticket', 'get_available_seats', 'calculate_ticket_price',
+            'add_screening', 'display_seat_map', 'save_data', 'load_data'})
+        self.assertEqual(result['results']['buy_ticket']['calls'], 20)
+        self.assertEqual(result['results']['threaded_buy_ticket']['calls'], 20)
+        self.assertEqual(result['results']['threaded_buy_ticket']['threads'], 4)
+        json.dumps(result)
+        
+        slower = json.loads(json.dumps(result))
+        slower['results']['buy_ticket']['p50_us'] *= 2
+        rows = {row['name']: row for row in compare_benchmarks(result, slower)}
+        self.assertTrue(rows['buy_ticket']['regression'])
+        self.assertFalse(rows['load_data']['regression'])
+
+class TestSeatHolds(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cinema = CinemaManager.create(os.path.join(self.tmpdir.name, "data.json"),
+                                           sample_data=False)
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 20)
+        self.screening = self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 1)
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_hold_confirm_release(self):
+        """Testuojamas vietų rezervavimas, patvirtinimas ir atšaukimas"""
+        hold = self.cinema.hold_seats(self.screening, seats=["A1", "A2"])
+        self.assertEqual(hold.seats, ("A1", "A2"))
+        self.assertNotIn("A1", self.cinema.get_available_seats(self.screening))
+        self.assertIsNone(self.cinema.buy_ticket(0, "A1"))
+        self.assertIsNone(self.cinema.hold_seats(self.screening, seats=["A2", "A3"]))
+        self.assertEqual(self.screening.tickets_sold, 0)
+        
+        tickets = self.cinema.confirm_hold(hold.id)
+        self.assertEqual([t.seat_number for t in tickets], ["A1", "A2"])
+        self.assertEqual(self.screening.tickets_sold, 2)
+        self.assertIsNone(self.cinema.confirm_hold(hold.id))
+        self.assertFalse(self.screening.is_seat_free("A1"))
+        
+        group = self.cinema.hold_seats(self.screening, party_size=3)
+        self.assertEqual(len(group.seats), 3)
+        self.assertTrue(self.cinema.release_hold(group.id))
+        self.assertFalse(self.cinema.release_hold(group.id))
+        self.assertTrue(all(self.screening.is_seat_free(seat) for seat in group.seats))
+        
+    def test_expiry(self):
+        """Testuojama, kad pasibaigusios rezervacijos atlaisvina vietas"""
+        expired = self.cinema.hold_seats(self.screening, seats=["B1"], ttl=0.01)
+        kept = self.cinema.hold_seats(self.screening, seats=["B2"], ttl=60)
+        timer.sleep(0.02)
+        free = self.cinema.get_available_seats(self.screening)
+        self.assertIn("B1", free)
+        self.assertNotIn("B2", free)
+        self.assertEqual(len(self.cinema.holds), 1)
+        self.assertIsNone(self.cinema.confirm_hold(expired.id))
+        self.assertEqual(len(self.cinema.confirm_hold(kept.id)), 1)
+        self.assertIsNotNone(self.cinema.buy_ticket(0, "B1"))
+        
+    def test_concurrent_holds(self):
+        """Testuojama, kad tą pačią vietą rezervuoja ir nuperka tik vienas klientas"""
+        holds, tickets = [], []
+        barrier = threading.Barrier(8)
+        
+        def customer():
+            barrier.wait()
+            hold = self.cinema.hold_seats(self.screening, seats=["B3"])
+            if hold:
+                holds.append(hold)
+                
+        def confirm(hold_id):
+            barrier.wait()
+            result = self.cinema.confirm_hold(hold_id)
+            if result:
+                tickets.extend(result)
+                
+        threads = [threading.Thread(target=customer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(holds), 1)
+        
+        threads = [threading.Thread(target=confirm, args=(holds[0].id,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(tickets), 1)
+        self.assertEqual(len(self.cinema.tickets), 1)
+
+class TestSeatMapRendering(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cinema = CinemaManager.create(os.path.join(self.tmpdir.name, "data.json"),
+                                           sample_data=False)
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 20)
+        self.screening = self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 1)
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_render_cache(self):
+        """Testuojama, kad salės planas kešuojamas ir atnaujinamas po pardavimo ir rezervacijos"""
+        first = render_seat_map(self.screening)
+        self.assertIs(render_seat_map(self.screening), first)
+        self.assertIn("A: O O O O O O O O O O", first)
+        
+        self.cinema.buy_ticket(0, "A1")
+        sold = render_seat_map(self.screening)
+        self.assertIsNot(sold, first)
+        self.assertIn("A: X O O", sold)
+        
+        self.cinema.hold_seats(self.screening, seats=["A2"])
+        held = render_seat_map(self.screening)
+        self.assertIn("A: X R O", held)
+        
+    def test_packed_form(self):
+        """Testuojamas suglaudintas salės plano formatas"""
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.hold_seats(self.screening, seats=["B10"])
+        packed = packed_seat_map(self.screening)
+        self.assertIs(packed_seat_map(self.screening), packed)
+        free = unpack_seat_map(packed, len(self.screening.seat_codes))
+        self.assertEqual([code for code, bit in zip(self.screening.seat_codes, free) if bit],
+                         self.screening.free_seats())
+        self.assertFalse(free[self.screening.seat_index["A1"]])
+        self.assertFalse(free[self.screening.seat_index["B10"]])
+        self.assertEqual(sum(free), 18)
+
+
+class TestTicketCancellation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cinema = CinemaManager.create(os.path.join(self.tmpdir.name, "data.json"),
+                                           sample_data=False)
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 300)
+        self.first = self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 1)
+        self.second = self.cinema.add_screening("Up", datetime(2024, 7, 1, 18, 0), 1)
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_lookup_and_cancel(self):
+        """Testuojama bilieto paieška, grąžinimas ir skaitiklių atnaujinimas"""
+        tickets = self.cinema.book_seats(self.first, seats=["A1", "A2", "A3"])
+        self.assertEqual(self.cinema.get_ticket(tickets[1].id).seat_number, "A2")
+        self.assertEqual(self.cinema.find_ticket(self.first, "A3").id, tickets[2].id)
+        
+        cancelled = self.cinema.cancel_ticket(tickets[0].id)
+        self.assertEqual(cancelled.seat_number, "A1")
+        self.assertIsNone(self.cinema.cancel_ticket(tickets[0].id))
+        self.assertIsNone(self.cinema.get_ticket(tickets[0].id))
+        self.assertIsNone(self.cinema.find_ticket(self.first, "A1"))
+        self.assertEqual(self.cinema.get_ticket(tickets[2].id).seat_number, "A3")
+        self.assertEqual(len(self.cinema.tickets), 2)
+        self.assertEqual((self.first.tickets_sold, self.first.available_seats), (2, 298))
+        self.assertTrue(self.first.is_seat_free("A1"))
+        self.assertIsNotNone(self.cinema.book_seat(self.first, "A1"))
+        
+    def test_exchange(self):
+        """Testuojamas bilieto vietos ir seanso keitimas"""
+        ticket = self.cinema.book_seat(self.first, "A1")
+        self.cinema.book_seat(self.first, "A2")
+        self.assertIsNone(self.cinema.exchange_ticket(ticket.id, "A2"))
+        
+        moved = self.cinema.exchange_ticket(ticket.id, "B5")
+        self.assertEqual((moved.id, moved.seat_number), (ticket.id, "B5"))
+        self.assertTrue(self.first.is_seat_free("A1"))
+        self.assertFalse(self.first.is_seat_free("B5"))
+        
+        moved = self.cinema.exchange_ticket(ticket.id, "C1", self.second)
+        self.assertIs(self.cinema.get_ticket(ticket.id).screening, self.second)
+        self.assertEqual(self.cinema.find_ticket(self.second, "C1").id, ticket.id)
+        self.assertEqual((self.first.tickets_sold, self.second.tickets_sold), (1, 1))
+        self.assertTrue(self.first.is_seat_free("B5"))
+        
+    def test_cancel_screening(self):
+        """Testuojamas visų seanso bilietų grąžinimas"""
+        self.cinema.use_ticket_store()
+        sold = self.cinema.book_seats(self.first, party_size=300, split=True)
+        kept = self.cinema.book_seat(self.second, "A1")
+        self.assertEqual(len(sold), 300)
+        
+        cancelled = self.cinema.cancel_screening(self.first)
+        self.assertEqual(len(cancelled), 300)
+        self.assertEqual(sum(t.price for t in cancelled), sum(t.price for t in sold))
+        self.assertEqual((self.first.tickets_sold, self.first.available_seats), (0, 300))
+        self.assertEqual(len(self.first.free_seats()), 300)
+        self.assertEqual([t.id for t in self.cinema.tickets], [kept.id])
+        self.assertEqual(self.cinema.cancel_screening(self.first), [])
+
+
+class TestBatchImport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        self.cinema = CinemaManager.create(self.filename, sample_data=False)
+        self.write("movies.csv", "title,duration,genre\nUp,96,Animation\nBad,-5,Drama\nUp,90,Drama\n")
+        self.write("halls.jsonl", '{"hall_number": 1, "capacity": 20}\n'
+                                  '{"hall_number": 2, "capacity": 6, "layout": "OOO/OOO"}\n'
+                                  '{broken\n')
+        self.write("data.csv", "type,movie,hall,screening_time,seat\n"
+                               "screening,Up,1,2024-07-01 12:00,\n"
+                               "screening,Up,1,2024-07-01 13:00,\n"
+                               "screening,Up,2,2024-07-01 13:00,\n"
+                               "ticket,,1,2024-07-01 12:00,a1\n"
+                               "ticket,,1,2024-07-01 12:00,A1\n"
+                               "ticket,,2,2024-07-01 13:00,C9\n"
+                               "ticket,,2,2024-07-01 13:00,B3\n")
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def write(self, name, text):
+        with open(os.path.join(self.tmpdir.name, name), "w") as file:
+            file.write(text)
+            
+    def files(self):
+        return [os.path.join(self.tmpdir.name, name)
+                for name in ("movies.csv", "halls.jsonl", "data.csv")]
+        
+    def test_import(self):
+        """Testuojamas masinis importas su klaidingų eilučių ataskaita"""
+        result = import_files(self.cinema, self.files())
+        self.assertEqual(result['rows'], 13)
+        self.assertEqual(result['imported'],
+                         {'movies': 1, 'halls': 2, 'screenings': 2, 'tickets': 2})
+        self.assertEqual([(os.path.basename(f), line) for f, line, _ in result['errors']],
+                         [("movies.csv", 3), ("movies.csv", 4), ("halls.jsonl", 3),
+                          ("data.csv", 3), ("data.csv", 6), ("data.csv", 7)])
+        
+        screening = self.cinema.find_screenings(hall_number=2)[0]
+        self.assertEqual(screening.tickets_sold, 1)
+        self.assertFalse(screening.is_seat_free("B3"))
+        self.assertIsNone(self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 30), 1))
+        
+        reloaded = CinemaManager.create(self.filename, sample_data=False)
+        self.assertEqual(len(reloaded.screenings), 2)
+        self.assertEqual(len(reloaded.tickets), 2)
+        
+    def test_strict(self):
+        """Testuojama, kad griežtu režimu su klaidomis nieko neimportuojama"""
+        result = import_files(self.cinema, self.files(), strict=True)
+        self.assertEqual(len(result['errors']), 6)
+        self.assertFalse(any(result['imported'].values()))
+        self.assertEqual(self.cinema.movies, [])
+        self.assertFalse(os.path.exists(self.filename))
+
+
+class TestShardedCinema(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.json")
+        cinema = CinemaManager.create(self.filename, sample_data=False)
+        cinema.add_movie("Up", 96, "Animation")
+        for number in range(1, 5):
+            cinema.add_hall(number, 20)
+            cinema.add_screening("Up", datetime(2024, 7, number, 12, 0), number)
+        cinema.book_seat(cinema.screenings[0], "A1")
+        cinema.persist(self.filename)
+        self.data = cinema.snapshot()
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_split_snapshot(self):
+        """Testuojamas duomenų padalijimas pagal sales"""
+        shards = split_snapshot(self.data, 2)
+        self.assertEqual([len(shard['halls']) for shard in shards], [2, 2])
+        self.assertEqual(sum(len(shard['screenings']) for shard in shards), 4)
+        self.assertEqual(sum(len(shard['tickets']) for shard in shards), 1)
+        for shard in shards:
+            halls = {hall['id'] for hall in shard['halls']}
+            self.assertTrue(all(s['hall_id'] in halls for s in shard['screenings']))
+            self.assertEqual(len(shard['movies']), 1)
+            
+    def test_worker_survives_errors(self):
+        """Testuojama, kad netikėta operacijos klaida grąžinama ir darbininkas toliau aptarnauja"""
+        cinema = CinemaManager.create(self.filename, sample_data=False)
+        cinema.ensure_loaded()
+        worker = ShardWorker(cinema, 0)
+        worker.seat_map = lambda screening_id, form='text': 1 / 0
+        coordinator, connection = multiprocessing.Pipe()
+        thread = threading.Thread(target=worker.run, args=(connection,))
+        thread.start()
+        try:
+            coordinator.send(('seat_map', (1,)))
+            self.assertTrue(coordinator.poll(5))
+            failed = coordinator.recv()
+            coordinator.send(('buy_ticket', (1, "A2")))
+            self.assertTrue(coordinator.poll(5))
+            bought = coordinator.recv()
+        finally:
+            coordinator.send(None)
+            thread.join(5)
+        self.assertEqual(failed[0], 'error')
+        self.assertEqual((bought[0], bought[1]['seat_number']), ('ok', "A2"))
+        self.assertFalse(thread.is_alive())
+            
+    def test_routing(self):
+        """Testuojamas užklausų nukreipimas į procesus ir sąrašų sujungimas"""
+        coordinator = ShardedCinema(self.filename, workers=2, sample_data=False).start()
+        try:
+            screenings = coordinator.list_screenings()
+            self.assertEqual([s['hall'] for s in screenings], [1, 2, 3, 4])
+            self.assertEqual({s['shard'] for s in screenings}, {0, 1})
+            self.assertEqual(screenings[0]['available_seats'], 19)
+            
+            first = screenings[0]['id']
+            self.assertIsNone(coordinator.buy_ticket(first, "A1"))
+            ticket = coordinator.buy_ticket(first, "A2")
+            self.assertEqual(ticket['seat_number'], "A2")
+            self.assertIsNone(coordinator.buy_ticket(999, "A1"))
+            self.assertIn("A: X X O", coordinator.seat_map(first))
+            
+            results = coordinator.buy_batch([(s['id'], "B1") for s in screenings] + [(first, "B1")])
+            self.assertEqual(results.count(None), 1)
+            self.assertEqual(len(set(results[:4]) | {ticket['id']}), 5)
+            
+            coordinator.add_hall(5, 20)
+            added = coordinator.add_screening("Up", datetime(2024, 7, 5, 12, 0), 5)
+            self.assertNotIn(added['id'], [s['id'] for s in screenings])
+            self.assertEqual(len(coordinator.buy_tickets(added['id'], party_size=3)), 3)
+            self.assertEqual(len(coordinator.list_screenings(hall_number=5)), 1)
+        finally:
+            coordinator.close()
+            
+        with open(self.filename) as file:
+            tickets = json.load(file)['tickets']
+        self.assertEqual(len(tickets), 9)
+        self.assertEqual(len({t['id'] for t in tickets}), 9)
+        self.assertFalse(os.path.exists(shard_filename(self.filename, 0)))
+            
+    def test_restart(self):
+        """Testuojama, kad pardavimai išlieka po koordinatoriaus paleidimo iš naujo"""
+        coordinator = ShardedCinema(self.filename, workers=2, sample_data=False).start()
+        try:
+            screening_id = coordinator.list_screenings()[1]['id']
+            ticket = coordinator.buy_ticket(screening_id, "A1")
+        finally:
+            coordinator.close()
+            
+        coordinator = ShardedCinema(self.filename, workers=2, sample_data=False).start()
+        try:
+            screening = coordinator.list_screenings(hall_number=2)[0]
+            self.assertEqual(screening['available_seats'], 19)
+            self.assertIsNone(coordinator.buy_ticket(screening_id, "A1"))
+            self.assertNotEqual(coordinator.buy_ticket(screening_id, "A2")['id'], ticket['id'])
+        finally:
+            coordinator.close()
+            
+        for workers in (3, 2):
+            coordinator = ShardedCinema(self.filename, workers=workers, sample_data=False).start()
+            try:
+                sold = sum(s['capacity'] - s['available_seats']
+                           for s in coordinator.list_screenings())
+                self.assertEqual(sold, 3)
+            finally:
+                coordinator.close()
+        self.assertFalse(os.path.exists(shard_filename(self.filename, 2)))
+        
+    def test_sales_between_runs(self):
+        """Testuojama, kad pardavimai be koordinatoriaus neprarandami kitame paleidime"""
+        ShardedCinema(self.filename, workers=2, sample_data=False).start().close()
+        cinema = CinemaManager.create(self.filename, sample_data=False)
+        cinema.book_seat(cinema.screenings[0], "A2")
+        cinema.book_seat(cinema.screenings[1], "A1")
+        cinema.persist(self.filename)
+        
+        coordinator = ShardedCinema(self.filename, workers=2, sample_data=False).start()
+        try:
+            sold = sum(s['capacity'] - s['available_seats'] for s in coordinator.list_screenings())
+            self.assertEqual(sold, 3)
+        finally:
+            coordinator.close()
+        with open(self.filename) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 3)
+            
+    def test_stale_shards(self):
+        """Testuojama, kad senesnės už pagrindinį failą dalys perskirstomos iš naujo"""
+        coordinator = ShardedCinema(self.filename, workers=2, sample_data=False)
+        coordinator.split()
+        self.assertTrue(coordinator.has_shards())
+        cinema = CinemaManager.create(self.filename, sample_data=False)
+        cinema.book_seat(cinema.screenings[0], "A2")
+        cinema.persist(self.filename)
+        stamp = os.stat(self.filename).st_mtime_ns
+        for shard in range(2):
+            os.utime(shard_filename(self.filename, shard), ns=(stamp - 10**9, stamp - 10**9))
+        self.assertFalse(coordinator.has_shards())
+        
+        coordinator.start()
+        try:
+            screening = coordinator.list_screenings(hall_number=1)[0]
+            self.assertEqual(screening['available_seats'], 18)
+        finally:
+            coordinator.close()
+            
+    def test_shard_benchmark(self):
+        """Testuojama, kad kiekvienas procesų skaičius matuojamas su tais pačiais duomenimis"""
+        result = shard_benchmark((1, 2), halls=4, screenings=8, orders=300, batch=50)
+        self.assertEqual([r['sold'] for r in result['results'].values()], [300, 300])
+        self.assertEqual(result['results']['1']['speedup'], 1.0)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cinema = CinemaManager.create(os.path.join(self.tmpdir.name, "data.json"),
+                                           sample_data=False)
+        self.cinema.add_movie("Up", 96, "Animation")
+        self.cinema.add_hall(1, 5, "OOX/OOO")
+        self.cinema.add_screening("Up", datetime(2024, 7, 1, 12, 0), 1)
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def test_counters_and_failure_reasons(self):
+        """Testuojami operacijų skaitikliai ir nesėkmių priežastys"""
+        metrics = self.cinema.enable_metrics()
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.buy_ticket(0, "A1")
+        self.cinema.buy_ticket(0, "A3")
+        self.cinema.buy_ticket(0, "Z9")
+        self.cinema.buy_ticket(5, "A1")
+        self.cinema.buy_tickets(0, party_size=4)
+        self.cinema.add_screening("Up", datetime(2024, 7, 1, 13, 0), 1)
+        self.cinema.save_data(self.cinema.data_file)
+        
+        counters = {(c['name'], tuple(sorted(c['labels'].items()))): c['value']
+                    for c in metrics.snapshot()['counters']}
+        operation = lambda name, **labels: counters.get(
+            (name, tuple(sorted(labels.items()))), 0)
+        self.assertEqual(operation("cinema_operations_total", operation="buy_ticket",
+                                   outcome="ok"), 1)
+        self.assertEqual(operation("cinema_operations_total", operation="buy_ticket",
+                                   outcome="failed"), 4)
+        for reason in ("seat_taken", "blocked_seat", "invalid_seat", "invalid_screening"):
+            self.assertEqual(operation("cinema_failures_total", operation="buy_ticket",
+                                       reason=reason), 1)
+        self.assertEqual(operation("cinema_failures_total", operation="buy_tickets",
+                                   reason="no_block"), 1)
+        self.assertEqual(operation("cinema_failures_total", operation="add_screening",
+                                   reason="schedule_conflict"), 1)
+        self.assertEqual(operation("cinema_io_calls_total", handler="JSONDataHandler",
+                                   call="save_snapshot", outcome="ok"), 1)
+        
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE cinema_operation_seconds histogram", text)
+        self.assertIn('cinema_operation_seconds_count{operation="buy_ticket"} 5', text)
+        self.assertIn('le="+Inf"', text)
+        
+    def test_disable_and_profile(self):
+        """Testuojamas instrumentavimo išjungimas ir cProfile ataskaita"""
+        self.cinema.enable_metrics()
+        self.cinema.disable_metrics()
+        self.assertNotIn('buy_ticket', vars(self.cinema))
+        self.assertNotIn('save_data', vars(self.cinema.data_handler))
+        self.cinema.buy_ticket(0, "A1")
+        self.assertEqual(self.cinema.metrics.snapshot()['counters'], [])
+        
+        result, report = self.cinema.profile('buy_ticket', 0, "A2")
+        self.assertEqual(result.seat_number, "A2")
+        self.assertIn("book_seat", report)
+
+class TestBookingService(unittest.TestCase):
+    def setUp(self):
+        self.cinema = CinemaManager()
+        self.cinema.movies = []
+        self.cinema.halls = []
+        self.cinema.screenings = []
+        self.cinema.tickets = []
+        self.cinema.add_movie("Interstellar", 169, "Sci-Fi")
+        self.cinema.add_hall(1, 50)
+        self.cinema.add_screening("Interstellar", datetime(2024, 7, 5, 19, 0), 1)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_file = self.cinema.data_file
+        self.cinema.data_file = os.path.join(self.tmpdir.name, "data.json")
+        
+    def tearDown(self):
+        self.cinema.data_file = self.original_file
+        self.tmpdir.cleanup()
+        
+    def run_with_server(self, scenario):
+        async def run():
+            server = await BookingService(self.cinema).start('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await scenario(port)
+            finally:
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(run())
+        
+    def test_endpoints(self):
+        """Testuojami HTTP paslaugos adresai"""
+        screening_id = self.cinema.screenings[0].id
+        
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            tickets = f"/screenings/{screening_id}/tickets"
+            results = [
+                await http_request(reader, writer, 'GET', '/screenings'),
+                await http_request(reader, writer, 'POST', tickets, {'seat': 'a5'}),
+                await http_request(reader, writer, 'POST', tickets, {'seat': 'A5'}),
+                await http_request(reader, writer, 'GET', f"/screenings/{screening_id}/seats"),
+                await http_request(reader, writer, 'POST', '/screenings', {
+                    'movie_title': "Interstellar",
+                    'screening_time': "2024-07-06 21:00",
+                    'hall_number': 1
+                }),
+                await http_request(reader, writer, 'POST', '/screenings', {
+                    'movie_title': "Interstellar",
+                    'screening_time': "2024-07-06 22:00",
+                    'hall_number': 1
+                }),
+                await http_request(reader, writer, 'POST', '/screenings', {
+                    'movie_title': "Interstellar",
+                    'screening_time': "2024-07-07 21:00",
+                    'hall_number': 9
+                }),
+                await http_request(reader, writer, 'GET', '/screenings/0/seats'),
+                await http_request(reader, writer, 'POST', '/save'),
+                await http_request(reader, writer, 'GET', '/metrics')
+            ]
+            writer.close()
+            return results
+            
+        (listing, bought, taken, seats, added, overlapping, unknown,
+         missing, saved, metrics) = self.run_with_server(scenario)
+        self.assertEqual(listing[0], 200)
+        self.assertEqual(listing[1][0]['movie'], "Interstellar")
+        self.assertEqual(bought[0], 201)
+        self.assertEqual(bought[1]['seat'], "A5")
+        self.assertEqual(taken[0], 409)
+        self.assertNotIn("A5", seats[1]['available'])
+        self.assertEqual(added[0], 201)
+        self.assertEqual(overlapping, (409, {'error': "Salė tuo metu užimta"}))
+        self.assertEqual(unknown, (400, {'error': "Filmas arba salė nerasta"}))
+        self.assertEqual(len(self.cinema.screenings), 2)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(saved[0], 200)
+        with open(self.cinema.data_file) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 1)
+        self.assertEqual(metrics[0], 200)
+        self.assertIsInstance(metrics[1], str)
+            
+    def test_ticket_endpoints(self):
+        """Testuojami bilietų grąžinimo ir keitimo HTTP adresai"""
+        screening_id = self.cinema.screenings[0].id
+        
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            tickets = f"/screenings/{screening_id}/tickets"
+            _, bought = await http_request(reader, writer, 'POST', tickets, {'seats': ['A1', 'A2']})
+            first, second = bought['ids']
+            results = [
+                await http_request(reader, writer, 'GET', f"/tickets/{first}"),
+                await http_request(reader, writer, 'POST', f"/tickets/{first}/exchange", {'seat': 'a2'}),
+                await http_request(reader, writer, 'POST', f"/tickets/{first}/exchange", {'seat': 'b1'}),
+                await http_request(reader, writer, 'DELETE', f"/tickets/{first}"),
+                await http_request(reader, writer, 'DELETE', f"/tickets/{first}"),
+                await http_request(reader, writer, 'DELETE', tickets)
+            ]
+            writer.close()
+            return second, results
+            
+        second, results = self.run_with_server(scenario)
+        found, taken, exchanged, cancelled, missing, bulk = results
+        self.assertEqual((found[0], found[1]['seat']), (200, "A1"))
+        self.assertEqual(taken[0], 409)
+        self.assertEqual((exchanged[0], exchanged[1]['seat']), (200, "B1"))
+        self.assertEqual(cancelled[0], 200)
+        self.assertEqual(cancelled[1]['refund'], found[1]['price'])
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(bulk[1]['cancelled'], [second])
+        self.assertEqual(self.cinema.screenings[0].available_seats, 50)
+        
+    def test_invalid_requests(self):
+        """Testuojami neteisingi HTTP užklausų duomenys"""
+        screening_id = self.cinema.screenings[0].id
+        
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            tickets = f"/screenings/{screening_id}/tickets"
+            results = [
+                await http_request(reader, writer, 'POST', tickets, [1]),
+                await http_request(reader, writer, 'POST', tickets, "A1"),
+                await http_request(reader, writer, 'POST', tickets, {'seats': "A1"}),
+                await http_request(reader, writer, 'POST', f"/screenings/{screening_id}/holds",
+                                   {'seats': "A1"}),
+                await http_request(reader, writer, 'POST', f"/screenings/{screening_id}/holds",
+                                   {'seats': ["A2"], 'ttl': 0}),
+                await http_request(reader, writer, 'POST', f"/screenings/{screening_id}/holds",
+                                   {'seats': ["A2"], 'ttl': -1}),
+                await http_request(reader, writer, 'POST', '/screenings', {
+                    'movie_title': ["Interstellar"],
+                    'screening_time': "2024-07-06 21:00",
+                    'hall_number': 1
+                }),
+                await http_request(reader, writer, 'POST', tickets, {'seats': ["A1"]}),
+                await http_request(reader, writer, 'POST', '/save')
+            ]
+            writer.close()
+            return results
+            
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            results = self.run_with_server(scenario)
+        self.assertEqual([status for status, _ in results], [400, 400, 400, 400, 400, 400, 500, 201, 200])
+        self.assertIn('error', results[6][1])
+        self.assertEqual(results[7][1]['seats'], ["A1"])
+        self.assertNotIn(self.cinema.screenings[0],
+                         [hold.screening for hold in self.cinema.holds.values()])
+        self.assertEqual(len(self.cinema.screenings), 1)
+        self.assertEqual(output.getvalue(), "")
+        with open(self.cinema.data_file) as file:
+            self.assertEqual(len(json.load(file)['tickets']), 1)
+        
+    def test_load_generator(self):
+        """Testuojamas apkrovos generatorius"""
+        result = self.run_with_server(
+            lambda port: run_load_test('127.0.0.1', port, requests=200, concurrency=4))
+        self.assertEqual(result['requests'], 200)
+        self.assertGreater(result['requests_per_second'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file